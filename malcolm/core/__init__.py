@@ -17,7 +17,7 @@ from .errors import (
     YamlError,
 )
 from .future import Future
-from .hook import AHookable, Hook, Hookable
+from .hook import AHookable, Hook, Hookable, non_blocking
 from .info import Info
 from .loggable import Loggable
 from .models import (
@@ -68,6 +68,7 @@ from .process import (
 )
 from .request import Get, PathRequest, Post, Put, Request, Subscribe, Unsubscribe
 from .response import Delta, Error, Response, Return, Update
+from .snapshot import ProcessSnapshot
 from .stateset import StateSet
 from .table import Table
 from .tags import (
@@ -95,3 +95,7 @@ class Queue:
     def put(self, value):
         # In cothread's thread
         self._event_queue.Signal(value)
+
+    def qsize(self) -> int:
+        """Return how many values can be got without blocking"""
+        return len(self._event_queue)
@@ -1,3 +1,4 @@
+import heapq
 import logging
 import time
 import weakref
@@ -20,6 +21,21 @@ if TYPE_CHECKING:
 log = logging.getLogger(__name__)
 
 
+class Timer:
+    """A periodic side-action run by a `Context` while it waits for futures"""
+
+    def __init__(self, period: float, func: Callable, args: Tuple) -> None:
+        self.period = period
+        self.func = func
+        self.args = args
+        self.due = time.time() + period
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        """Stop the timer from firing again"""
+        self.cancelled = True
+
+
 class Context:
     """Helper allowing Future style access to Block Attributes and Methods"""
 
@@ -38,6 +54,16 @@ class Context:
         self._pending_unsubscribes: Dict[Future, Subscribe] = {}
         # If not None, wait for this before listening to STOPs
         self._sentinel_stop = None
+        # Incremented every time a future is resolved, so we can tell if
+        # a subscription callback resolved futures we are waiting for
+        self._resolved_count = 0
+        # How many responses we have serviced in total, and in the last call
+        # to wait_all_futures
+        self.responses_serviced = 0
+        self.last_wait_responses = 0
+        # Heap of (due, id, Timer) for periodic side-actions run while waiting
+        self._timers: List[Tuple[float, int, Timer]] = []
+        self._running_timers = False
 
     @property
     def mri_list(self) -> List[str]:
@@ -269,6 +295,25 @@ class Context:
         when.set_future_context(future, weakref.proxy(self))
         return future
 
+    def call_every(self, period: float, func: Callable, *args) -> Timer:
+        """Call func(*args) every period seconds while this context is waiting
+
+        The call is made from inside whichever wait (`wait_all_futures`,
+        `wait_any_futures`, `sleep`, etc.) is servicing futures when it falls
+        due, so anything it raises propagates out of that wait.
+
+        Args:
+            period: Time in seconds between calls
+            func: The function to call
+            *args: Arguments to pass to func
+
+        Returns:
+            Timer: a handle that can be cancelled when the action should stop
+        """
+        timer = Timer(period, func, args)
+        heapq.heappush(self._timers, (timer.due, self._get_next_id(), timer))
+        return timer
+
     def wait_all_futures(
         self,
         futures: Union[List[Future], Future, None],
@@ -287,6 +332,41 @@ class Context:
             event_timeout: maximum time in seconds to wait between each response
                 event, wait forever if None
         """
+        self._wait_futures(futures, timeout, event_timeout, wait_for_all=True)
+
+    def wait_any_futures(
+        self,
+        futures: Union[List[Future], Future, None],
+        timeout: float = None,
+        event_timeout: float = None,
+    ) -> List[Future]:
+        """Services all futures until at least one of the list 'futures' is
+        done then returns. Calls relevant subscription callbacks as they
+        come off the queue and raises an exception on abort
+
+        Args:
+            futures: a `Future` or list of futures that the caller wants to
+                wait for the first of
+            timeout: maximum total time in seconds to wait for responses, wait
+                forever if None
+            event_timeout: maximum time in seconds to wait between each response
+                event, wait forever if None
+
+        Returns:
+            list: The futures that are done, in the order they were passed
+        """
+        futures = self._wait_futures(
+            futures, timeout, event_timeout, wait_for_all=False
+        )
+        return [f for f in futures if f.done()]
+
+    def _wait_futures(
+        self,
+        futures: Union[List[Future], Future, None],
+        timeout: Union[float, None],
+        event_timeout: Union[float, None],
+        wait_for_all: bool,
+    ) -> List[Future]:
         if timeout is None:
             end = None
         else:
@@ -298,24 +378,44 @@ class Context:
             else:
                 futures = []
 
-        filtered_futures = []
+        # {future: None}, a dict so removal is cheap and ordering is kept
+        filtered_futures: Dict[Future, None] = {}
 
         for f in futures:
             if f.done():
                 if f.exception() is not None:
                     raise f.exception()
             else:
-                filtered_futures.append(f)
+                filtered_futures[f] = None
+
+        if not wait_for_all and len(filtered_futures) < len(futures):
+            # At least one is already done
+            return futures
 
         until: Union[float, None]
-        while filtered_futures:
-            if event_timeout is not None:
-                until = time.time() + event_timeout
-                if end is not None:
-                    until = min(until, end)
-            else:
-                until = end
-            self._service_futures(filtered_futures, until)
+        event_end: Union[float, None] = None
+        if event_timeout is not None:
+            event_end = time.time() + event_timeout
+        serviced_before = self.responses_serviced
+        pending = len(filtered_futures)
+        try:
+            while filtered_futures:
+                if event_end is None:
+                    until = end
+                elif end is None:
+                    until = event_end
+                else:
+                    until = min(event_end, end)
+                got_response = self._service_futures(filtered_futures, until)
+                if got_response and event_timeout is not None:
+                    # Only a response restarts the event timeout, waking up
+                    # to run a timer doesn't
+                    event_end = time.time() + event_timeout
+                if not wait_for_all and len(filtered_futures) < pending:
+                    break
+        finally:
+            self.last_wait_responses = self.responses_serviced - serviced_before
+        return futures
 
     def sleep(self, seconds):
         """Services all futures while waiting
@@ -326,7 +426,7 @@ class Context:
         until = time.time() + seconds
         try:
             while True:
-                self._service_futures([], until)
+                self._service_futures({}, until)
         except TimeoutError:
             return
 
@@ -366,24 +466,86 @@ class Context:
             return "[]"
 
     def _service_futures(self, futures, until=None):
-        """Service futures
+        """Service futures, handling every response that is already queued
 
         Args:
-            futures (list): The futures to service
+            futures (dict): {future: None} of the futures to service, those
+                that are resolved will be removed
             until (float): Timestamp to wait until
+
+        Returns:
+            bool: True if a response was serviced, False if we only woke up to
+                run timers
         """
-        if until is None:
+        wake = until
+        woken_for_timer = False
+        if self._timers and not self._running_timers:
+            waiting_for_futures = bool(futures)
+            self._run_due_timers(futures)
+            if waiting_for_futures and not futures:
+                # The timers resolved everything we were waiting for
+                return False
+            if self._timers and (wake is None or self._timers[0][0] < wake):
+                # Wake up early to run the next timer
+                wake = self._timers[0][0]
+                woken_for_timer = True
+        if wake is None:
             timeout = None
         else:
-            timeout = until - time.time()
+            timeout = wake - time.time()
             if timeout < 0:
                 timeout = 0
         try:
             response = self._q.get(timeout)
         except TimeoutError:
+            if woken_for_timer:
+                # A timer is due, it will be run on the next call
+                return False
             raise TimeoutError(
                 "Timeout waiting for %s" % self._describe_futures(futures)
             )
+        self._service_response(futures, response)
+        # Drain anything else that arrived while we were waiting, but stop
+        # if the caller's futures are all done so we return promptly
+        waiting_for_futures = bool(futures)
+        while self._q.qsize() and (futures or not waiting_for_futures):
+            self._service_response(futures, self._q.get())
+        return True
+
+    def _run_due_timers(self, futures):
+        """Run any timers that are due, rescheduling them for their next period
+
+        Args:
+            futures (dict): {future: None} of the futures being serviced, those
+                resolved by waits inside the timer funcs will be removed
+        """
+        now = time.time()
+        while self._timers and self._timers[0][0] <= now:
+            _, timer_id, timer = heapq.heappop(self._timers)
+            if timer.cancelled:
+                continue
+            timer.due += timer.period
+            if timer.due <= now:
+                # Don't try to catch up if we have fallen a period behind
+                timer.due = now + timer.period
+            heapq.heappush(self._timers, (timer.due, timer_id, timer))
+            resolved_count = self._resolved_count
+            self._running_timers = True
+            try:
+                timer.func(*timer.args)
+            finally:
+                self._running_timers = False
+            if resolved_count != self._resolved_count:
+                # func() may have waited on futures and so serviced responses
+                # for the futures we are waiting on, filter them out
+                for future in [f for f in futures if f not in self._requests]:
+                    del futures[future]
+        # Drop cancelled timers from the head so they don't cause wakeups
+        while self._timers and self._timers[0][2].cancelled:
+            heapq.heappop(self._timers)
+
+    def _service_response(self, futures, response):
+        self.responses_serviced += 1
         if response is self._sentinel_stop:
             self._sentinel_stop = None
         elif response is self.STOP:
@@ -395,34 +557,32 @@ class Context:
         elif isinstance(response, Update):
             # This is an update for a subscription
             if response.id in self._subscriptions:
+                resolved_count = self._resolved_count
                 func, args = self._subscriptions[response.id]
                 func(response.value, *args)
-            # func() may call wait_for_futures() which may call set_result on
-            # some futures that aren't known to it. This means that some of
-            # our futures list are now concluded, so filter them out. If we
-            # didn't do this we would hang forever
-            for future in futures:
-                if future not in self._requests:
-                    futures.remove(future)
+                if resolved_count != self._resolved_count:
+                    # func() may call wait_for_futures() which may call
+                    # set_result on some futures that aren't known to it.
+                    # This means that some of our futures are now concluded,
+                    # so filter them out. If we didn't do this we would hang
+                    # forever
+                    for future in [f for f in futures if f not in self._requests]:
+                        del futures[future]
         elif isinstance(response, Return):
             future = self._futures.pop(response.id)
             del self._requests[future]
             self._pending_unsubscribes.pop(future, None)
+            self._resolved_count += 1
             result = response.value
             future.set_result(result)
-            try:
-                futures.remove(future)
-            except ValueError:
-                pass
+            futures.pop(future, None)
         elif isinstance(response, Error):
             future = self._futures.pop(response.id)
             del self._requests[future]
+            self._resolved_count += 1
             future.set_exception(response.message)
-            try:
-                futures.remove(future)
-            except ValueError:
-                pass
-            else:
+            if future in futures:
+                del futures[future]
                 raise response.message
 
 
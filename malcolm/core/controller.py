@@ -106,6 +106,12 @@ class Controller(Hookable):
     def changes_squashed(self):
         return self._notifier.changes_squashed
 
+    @property
+    def value_changes(self) -> int:
+        """The number of times a field or Attribute value of our Block has
+        changed, so callers can cheaply tell if it is the same as before"""
+        return self._notifier.value_changes
+
     def block_view(self, context: Context = None) -> Block:
         if context is None:
             assert self.process, "No process for context."
@@ -32,6 +32,24 @@ T = TypeVar("T")
 
 Hooked = Callable[..., T]
 ArgsGen = Callable[[List[str]], List[str]]
+F = TypeVar("F", bound=Callable)
+
+
+def non_blocking(func: F) -> F:
+    """Decorate a hooked function that returns straight away without waiting
+    on anything, so a Hook can run it inline rather than spawning it"""
+    func.non_blocking = True  # type: ignore
+    return func
+
+
+class RanInline:
+    """Stands in for a Spawned when the hooked function was run inline"""
+
+    def wait(self, timeout: float = None) -> None:
+        pass
+
+    def ready(self) -> bool:
+        return True
 
 
 def make_args_gen(func: Callable) -> ArgsGen:
@@ -105,7 +123,9 @@ class Hook(Generic[T], WithCallTypes):
         self._kwargs = kwargs
         self._queue: Union[Queue, None] = None
         self._spawn: Union[Callable[..., Spawned], None] = None
-        self.spawned: Union[Spawned, None] = None
+        self.spawned: Union[Spawned, RanInline, None] = None
+        # Wall time in seconds that the hooked function took to run
+        self.duration: Union[float, None] = None
 
     @property
     def name(self):
@@ -139,11 +159,17 @@ class Hook(Generic[T], WithCallTypes):
             demanded
         ), "Hook demanded arguments %s, but only supplied %s" % (demanded, supplied)
         kwargs = {k: self._kwargs[k] for k in demanded}
-        assert self._spawn, "No spawned function"
-        self.spawned = self._spawn(self._run, func, kwargs)
+        if getattr(func, "non_blocking", False):
+            # Not worth a cothread, the result goes on the queue just the same
+            self.spawned = RanInline()
+            self._run(func, kwargs)
+        else:
+            assert self._spawn, "No spawned function"
+            self.spawned = self._spawn(self._run, func, kwargs)
 
     def _run(self, func: Callable[..., T], kwargs: Dict[str, Any]) -> None:
         result: Union[T, Exception]
+        start = time.time()
         try:
             result = func(**kwargs)
             result = self.validate_return(result)
@@ -155,6 +181,7 @@ class Hook(Generic[T], WithCallTypes):
                 "%s: %s(**%s) raised exception %s", self.child, func, kwargs, e
             )
             result = e
+        self.duration = time.time() - start
         assert self._queue, "No queue to put result"
         self._queue.put((self, result))
 
@@ -56,6 +56,9 @@ class Notifier(Loggable):
         # Incremented every time we do with changes_squashed
         self._squashed_count = 0
         self._squashed_changes: List[List] = []
+        # Incremented every time a field or Attribute value of the Block
+        # changes, but not when a Method is called
+        self.value_changes = 0
         self._subscription_keys: SubscriptionKeys = {}
 
     def handle_subscribe(self, request: Subscribe) -> "CallbackResponses":
@@ -90,6 +93,8 @@ class Notifier(Loggable):
         """
         assert self._squashed_count, "Called while not squashing changes"
         self._squashed_changes.append([path[1:], data])
+        if len(path) == 2 or path[-1] == "value":
+            self.value_changes += 1
 
     def add_squashed_delete(self, path: List[str]) -> None:
         """Register a squashed deletion of a particular path
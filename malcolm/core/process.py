@@ -1,15 +1,17 @@
-from typing import Any, Callable, List, Sequence, Set, TypeVar, Union
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, TypeVar, Union
 
 from annotypes import Anno, Array
 
 from malcolm.compat import OrderedDict
 
-from .concurrency import Spawned
+from .concurrency import Queue, Spawned
 from .controller import DEFAULT_TIMEOUT, Controller
 from .errors import TimeoutError
 from .hook import AHookable, Hook, start_hooks, wait_hooks
 from .info import Info
 from .loggable import Loggable
+from .snapshot import ProcessSnapshot
 
 T = TypeVar("T")
 
@@ -63,14 +65,24 @@ class ProcessStopHook(Hook):
 class Process(Loggable):
     """Hosts a number of Controllers and provides spawn capabilities"""
 
-    def __init__(self, name: str = "Process") -> None:
+    # How many controllers can run ProcessStartHook at once, None for no limit
+    max_concurrent_starts: Optional[int] = 32
+
+    def __init__(self, name: str = "Process", snapshot_path: str = "") -> None:
         self.set_logger(process_name=name)
         self.name = name
+        # Loaded at start() and saved at stop() so controllers can reuse
+        # expensive introspection results on restart
+        self.snapshot = ProcessSnapshot(snapshot_path)
         self._controllers = OrderedDict()  # mri -> Controller
         self._unpublished: Set[str] = set()  # [mri] for unpublishable controllers
         self.state = STOPPED
         self._spawned: List[Spawned] = []
         self._spawn_count = 0
+        # {mri: seconds} of how long each controller took to start
+        self.start_durations: Dict[str, float] = {}
+        # {hook_name: seconds} of how long start() spent running each hook
+        self.phase_durations: Dict[str, float] = {}
 
     def start(self, timeout=DEFAULT_TIMEOUT):
         """Start the process going
@@ -81,16 +93,21 @@ class Process(Loggable):
         """
         assert self.state == STOPPED, "Process already started"
         self.state = STARTING
+        self.snapshot.load()
+        start = time.time()
         should_publish = self._start_controllers(self._controllers.values(), timeout)
+        self.phase_durations[ProcessStartHook.__name__] = time.time() - start
         if should_publish:
+            start = time.time()
             self._publish_controllers(timeout)
+            self.phase_durations[ProcessPublishHook.__name__] = time.time() - start
         self.state = STARTED
 
     def _start_controllers(
         self, controller_list: List[Controller], timeout: float = None
     ) -> bool:
         # Start just the given controller_list
-        infos = self._run_hook(ProcessStartHook, controller_list, timeout=timeout)
+        infos = self._run_start_hooks(controller_list, timeout=timeout)
         info: UnpublishedInfo
         new_unpublished = set()
         for info in UnpublishedInfo.filter_values(infos):
@@ -101,6 +118,88 @@ class Process(Loggable):
         else:
             return False
 
+    def _run_start_hooks(
+        self, controller_list: List[Controller], timeout: float = None
+    ) -> Dict[str, Any]:
+        # Run ProcessStartHook on each controller after the controllers of its
+        # children have started, and at most max_concurrent_starts at a time
+        # Like _run_hook, errors are logged and returned rather than raised
+        mris = [c.mri for c in controller_list]
+        # {mri: {child_mri}} of the children in controller_list not yet started
+        waiting_for: Dict[str, Set[str]] = OrderedDict()
+        parents: Dict[str, List[str]] = {mri: [] for mri in mris}
+        for controller in controller_list:
+            children = set()
+            child_mris = [
+                getattr(part, "mri", None) for part in controller.parts.values()
+            ]
+            # A ProxyController waits for its comms to be ready while starting
+            child_mris.append(getattr(controller, "comms", None))
+            for child_mri in child_mris:
+                if child_mri in parents and child_mri != controller.mri:
+                    children.add(child_mri)
+                    parents[child_mri].append(controller.mri)
+            waiting_for[controller.mri] = children
+        hooks = {
+            c.mri: ProcessStartHook(c).set_spawn(self.spawn) for c in controller_list
+        }
+        hook_queue = Queue()
+        running: Dict[Hook, str] = {}
+        infos: Dict[str, Any] = OrderedDict()
+        start = time.time()
+
+        def started(mri: str) -> None:
+            for parent in parents[mri]:
+                if parent in waiting_for:
+                    waiting_for[parent].discard(mri)
+
+        while waiting_for or running:
+            ready = [mri for mri, children in waiting_for.items() if not children]
+            limit = self.max_concurrent_starts
+            if not ready and not running:
+                # Circular dependency, so just start the rest together
+                ready = list(waiting_for)
+                limit = None
+                self.log.warning("Circular child dependency between %s", ready)
+            for mri in ready:
+                if limit and len(running) >= limit:
+                    break
+                del waiting_for[mri]
+                hook = hooks[mri]
+                hook.set_queue(hook_queue)
+                hook.child.on_hook(hook)
+                if hook.spawned:
+                    running[hook] = mri
+                else:
+                    # Nothing hooked in, so it has already started
+                    started(mri)
+            if running:
+                hook, ret = hook_queue.get()
+                mri = running.pop(hook)
+                assert hook.spawned, "No spawned process"
+                hook.spawned.wait(timeout)
+                assert hook.duration is not None, "No duration"
+                self.start_durations[mri] = hook.duration
+                self.log.debug("Started %s in %.3fs", mri, hook.duration)
+                infos[mri] = ret
+                started(mri)
+
+        # Return in the order they were given, log the slowest
+        infos = OrderedDict((mri, infos[mri]) for mri in mris if mri in infos)
+        problems = [mri for mri, e in infos.items() if isinstance(e, Exception)]
+        if problems:
+            self.log.warning("Problem running ProcessStartHook on %s", problems)
+        slowest = sorted(infos, key=lambda m: self.start_durations[m], reverse=True)
+        self.log.info(
+            "Started %d controllers in %.3fs, slowest: %s",
+            len(infos),
+            time.time() - start,
+            ", ".join(
+                "%s (%.3fs)" % (mri, self.start_durations[mri]) for mri in slowest[:5]
+            ),
+        )
+        return infos
+
     def _publish_controllers(self, timeout):
         tree = OrderedDict()
         is_child = set()
@@ -166,23 +265,32 @@ class Process(Loggable):
         """
         assert self.state == STARTED, "Process not started"
         self.state = STOPPING
-        # Allow every controller a chance to clean up
-        self._run_hook(ProcessStopHook, timeout=timeout)
-        for s in self._spawned:
-            if not s.ready():
-                self.log.debug(
-                    "Waiting for %s *%s **%s", s._function, s._args, s._kwargs
-                )
-            try:
-                s.wait(timeout=timeout)
-            except TimeoutError:
-                self.log.warning(
-                    "Timeout waiting for %s *%s **%s", s._function, s._args, s._kwargs
-                )
-                raise
+        try:
+            # Allow every controller a chance to clean up
+            self._run_hook(ProcessStopHook, timeout=timeout)
+            for s in self._spawned:
+                if not s.ready():
+                    self.log.debug(
+                        "Waiting for %s *%s **%s", s._function, s._args, s._kwargs
+                    )
+                try:
+                    s.wait(timeout=timeout)
+                except TimeoutError:
+                    self.log.warning(
+                        "Timeout waiting for %s *%s **%s",
+                        s._function,
+                        s._args,
+                        s._kwargs,
+                    )
+                    raise
+        finally:
+            # Keep what we learnt this time even if something didn't stop
+            self.snapshot.save()
         self._spawned = []
         self._controllers = OrderedDict()
         self._unpublished = set()
+        self.start_durations = {}
+        self.phase_durations = {}
         self.state = STOPPED
         self.log.debug("Done process.stop()")
 
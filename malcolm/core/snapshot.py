@@ -0,0 +1,90 @@
+import os
+import pickle
+import threading
+import zlib
+from typing import Any, Dict, Tuple
+
+from .loggable import Loggable
+
+
+class ProcessSnapshot(Loggable):
+    """A compact on disk store of state that is expensive to get, like the
+    results of introspecting a device, so that the next start of the Process
+    can use it rather than asking the device again.
+
+    Each entry is stored with a stamp, a cheap to get value that identifies
+    the device (like its firmware version), and is only returned if the stamp
+    still matches. If path is empty then the snapshot is only held in memory
+    """
+
+    # Bump this if the format of the file changes
+    version = 1
+
+    def __init__(self, path: str = "") -> None:
+        self.set_logger(path=path)
+        self.path = path
+        self._lock = threading.Lock()
+        # {key: (stamp, value)}
+        self._entries: Dict[str, Tuple[Any, Any]] = {}
+        self._dirty = False
+
+    def load(self) -> None:
+        """Replace the entries with those in the snapshot file, starting
+        empty if it doesn't exist or can't be read"""
+        entries: Dict[str, Tuple[Any, Any]] = {}
+        if self.path:
+            try:
+                with open(self.path, "rb") as f:
+                    version, entries = pickle.loads(zlib.decompress(f.read()))
+                assert version == self.version, "Snapshot version %s != %s" % (
+                    version,
+                    self.version,
+                )
+            except FileNotFoundError:
+                entries = {}
+            except Exception as e:
+                self.log.warning("Ignoring unreadable snapshot: %s", e)
+                entries = {}
+            else:
+                self.log.debug("Loaded %d snapshot entries", len(entries))
+        with self._lock:
+            self._entries = entries
+            self._dirty = False
+
+    def save(self) -> None:
+        """Write the entries to the snapshot file if they have changed"""
+        with self._lock:
+            if not (self.path and self._dirty):
+                return
+            try:
+                data = pickle.dumps(
+                    (self.version, self._entries), pickle.HIGHEST_PROTOCOL
+                )
+            except Exception as e:
+                self.log.warning("Can't snapshot: %s", e)
+                return
+            # Write then rename so a crash never leaves a partial file
+            tmp_path = "%s.%d" % (self.path, os.getpid())
+            try:
+                with open(tmp_path, "wb") as f:
+                    f.write(zlib.compress(data))
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                self.log.warning("Can't write snapshot: %s", e)
+            else:
+                self._dirty = False
+
+    def get(self, key: str, stamp: Any) -> Any:
+        """Return the value stored for key if it was stored with an equal
+        stamp, otherwise None"""
+        with self._lock:
+            entry = self._entries.get(key, None)
+        if entry is not None and entry[0] == stamp:
+            return entry[1]
+        return None
+
+    def put(self, key: str, stamp: Any, value: Any) -> None:
+        """Store value for key, along with the stamp that identifies it"""
+        with self._lock:
+            self._entries[key] = (stamp, value)
+            self._dirty = True
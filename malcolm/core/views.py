@@ -1,4 +1,5 @@
-from typing import TYPE_CHECKING, Any
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Tuple
 
 from malcolm.compat import OrderedDict
 from malcolm.core.models import Model
@@ -51,16 +52,48 @@ def _make_get_property(cls, endpoint):
     setattr(cls, endpoint, make_child_view)
 
 
-def _make_view_subclass(cls, controller, context, data):
-    # Properties can only be set on classes, so make subclass that we can use
-    class ViewSubclass(cls):
-        pass
+def _make_async_method(cls, endpoint):
+    def post_async(self, *args, **kwargs):
+        child: Method = getattr(self, endpoint)
+        return child.post_async(*args, **kwargs)
+
+    setattr(cls, "%s_async" % endpoint, post_async)
+
 
-    for endpoint in data:
-        # make properties for the endpoints we know about
-        _make_get_property(ViewSubclass, endpoint)
+# How many View subclasses to keep before discarding the least recently used
+MAX_VIEW_SUBCLASSES = 1000
+# {(cls, endpoints, method_endpoints): ViewSubclass}
+_view_subclasses: Dict[Tuple, type] = OrderedDict()
+_view_subclasses_lock = threading.Lock()
 
-    view = ViewSubclass(controller, context, data)
+
+def _make_view_subclass(cls, controller, context, data):
+    # Classes are cached by the endpoints they have properties for, so a new
+    # one is only made when a Model with a different set of endpoints is seen
+    endpoints = tuple(data)
+    if issubclass(cls, Block):
+        methods = tuple(e for e in endpoints if isinstance(data[e], MethodModel))
+    else:
+        methods = ()
+    key = (cls, endpoints, methods)
+    with _view_subclasses_lock:
+        subclass = _view_subclasses.get(key, None)
+        if subclass is None:
+            # Properties can only be set on classes, so make subclass that we
+            # can use
+            subclass = type(cls.__name__, (cls,), {})
+            for endpoint in endpoints:
+                # make properties for the endpoints we know about
+                _make_get_property(subclass, endpoint)
+            for endpoint in methods:
+                # Add _async versions of method
+                _make_async_method(subclass, endpoint)
+            _view_subclasses[key] = subclass
+            if len(_view_subclasses) > MAX_VIEW_SUBCLASSES:
+                _view_subclasses.popitem(last=False)
+        else:
+            _view_subclasses.move_to_end(key)
+    view = subclass(controller, context, data)
     return view
 
 
@@ -141,13 +174,6 @@ class Method(View):
 class Block(View):
     """Object consisting of a number of Attributes and Methods"""
 
-    def __init__(self, controller, context, data):
-        super().__init__(controller, context, data)
-        for endpoint in self._data:
-            if isinstance(data[endpoint], MethodModel):
-                # Add _async versions of method
-                self._make_async_method(endpoint)
-
     def __getattr__(self, item: str) -> View:
         # Get the child of self._data. Needs to be done by the controller to
         # make sure lock is taken and we get consistent data
@@ -158,13 +184,6 @@ class Block(View):
     def mri(self):
         return self._data.path[0]
 
-    def _make_async_method(self, endpoint):
-        def post_async(*args, **kwargs):
-            child: Method = getattr(self, endpoint)
-            return child.post_async(*args, **kwargs)
-
-        object.__setattr__(self, "%s_async" % endpoint, post_async)
-
     def put_attribute_values_async(self, params):
         futures = []
         if type(params) is dict:
@@ -1,5 +1,6 @@
 import argparse
 import atexit
+import contextlib
 import getpass
 import json
 import logging.config
@@ -7,7 +8,9 @@ import os
 import queue
 import sys
 import threading
+import time
 from logging.handlers import QueueListener
+from typing import Dict, Optional
 
 
 def make_async_logging(log_config):
@@ -37,6 +40,66 @@ def make_async_logging(log_config):
     return listener
 
 
+class StartupProfile:
+    """Records how long each phase of startup took, and how long each controller
+    and its parts took to start, so they can be written to a JSON report"""
+
+    def __init__(self, yaml: Optional[str] = None) -> None:
+        self.yaml = yaml
+        self.start_time = time.time()
+        self.end_time: Optional[float] = None
+        # {phase_name: seconds}
+        self.phases: Dict[str, float] = {}
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.time() - start
+
+    def make_report(self, process) -> dict:
+        end_time = self.end_time
+        if end_time is None:
+            end_time = self.end_time = time.time()
+        phases = dict(self.phases)
+        phases.update(process.phase_durations)
+        controllers = {}
+        for mri in process.mri_list:
+            controller = process.get_controller(mri)
+            parts: Dict[str, float] = {}
+            hook_timings = getattr(controller, "hook_timings", None)
+            if hook_timings is not None and hook_timings.value is not None:
+                for hook, part, duration in hook_timings.value.rows():
+                    if hook == "InitHook":
+                        parts[part] = parts.get(part, 0.0) + duration
+            controllers[mri] = dict(
+                start=process.start_durations.get(mri, None), parts=parts
+            )
+        report = dict(
+            process=process.name,
+            yaml=self.yaml,
+            start_time=self.start_time,
+            total=end_time - self.start_time,
+            phases=phases,
+            controllers=controllers,
+        )
+        return report
+
+    def write(
+        self, dirname: str, process, profile_filename: Optional[str] = None
+    ) -> str:
+        """Write the report as JSON to dirname, returning the filename"""
+        report = self.make_report(process)
+        report["profile"] = profile_filename
+        start_date = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.start_time))
+        filename = "%s-%s-startup.json" % (start_date, process.name)
+        with open(os.path.join(dirname, filename), "w") as f:
+            json.dump(report, f, indent=2)
+        return filename
+
+
 def parse_args():
     parser = argparse.ArgumentParser(description="Interactive shell for malcolm")
     parser.add_argument(
@@ -51,6 +114,19 @@ def parse_args():
         default=False,
     )
     parser.add_argument("--logcfg", help="Logging dict config in JSON or YAML file")
+    parser.add_argument(
+        "--profile-startup",
+        help="Profile startup, writing a plop profile and a JSON report of how "
+        "long each phase, controller and part took into the profiler dir",
+        action="store_true",
+        default=False,
+    )
+    parser.add_argument(
+        "--snapshot",
+        help="File to load a snapshot of device introspection from at startup "
+        "and save it to at shutdown, making restarts faster",
+        default="",
+    )
     parser.add_argument(
         "yaml", nargs="?", help="The YAML file containing the blocks to be loaded"
     )
@@ -142,20 +218,29 @@ def make_logging_config(args):
     return log_config
 
 
-def prepare_locals(args):
-    from malcolm.core import Process
-    from malcolm.yamlutil import make_include_creator
+def prepare_locals(args, startup_profile=None):
+    if startup_profile is None:
+        startup_profile = StartupProfile(args.yaml)
+    with startup_profile.phase("imports"):
+        from malcolm.core import Process
+        from malcolm.yamlutil import make_include_creator
 
     if args.yaml:
         proc_name = os.path.basename(args.yaml).split(".")[-2]
-        proc = Process(proc_name)
-        controllers, parts = make_include_creator(args.yaml)()
+        proc = Process(proc_name, snapshot_path=args.snapshot)
+        with startup_profile.phase("parse_process_yaml"):
+            # Only the top level file, included YAML files are parsed as they
+            # are instantiated, so are part of construct
+            creator = make_include_creator(args.yaml).__wrapped__
+        with startup_profile.phase("construct"):
+            controllers, parts = creator()
         assert not parts, "%s defines parts" % (args.yaml,)
-        for controller in controllers:
-            proc.add_controller(controller)
+        with startup_profile.phase("add_controllers"):
+            for controller in controllers:
+                proc.add_controller(controller)
         proc_name = "%s - imalcolm" % proc_name
     else:
-        proc = Process("Process")
+        proc = Process("Process", snapshot_path=args.snapshot)
         proc_name = "imalcolm"
     # set terminal title
     sys.stdout.write("\x1b]0;%s\x07" % proc_name)
@@ -179,13 +264,13 @@ def prepare_locals(args):
     return proc
 
 
-def try_prepare_locals(q, args):
+def try_prepare_locals(q, args, startup_profile=None):
     # This will start cothread in this thread
     import cothread
 
     cothread.input_hook._install_readline_hook(False)
     try:
-        locals_d = prepare_locals(args)
+        locals_d = prepare_locals(args, startup_profile)
     except Exception as e:
         q.put(e)
         raise
@@ -210,7 +295,11 @@ def main():
 
     # Setup profiler dir
     profiler = Profiler()
-    # profiler.start()
+    if args.profile_startup:
+        startup_profile = StartupProfile(args.yaml)
+        profiler.start()
+    else:
+        startup_profile = None
 
     # If using p4p then set cothread to use the right ca libs before it is
     try:
@@ -220,12 +309,17 @@ def main():
 
     # Import the Malcolm process
     q = queue.Queue()
-    t = threading.Thread(target=try_prepare_locals, args=(q, args))
+    t = threading.Thread(target=try_prepare_locals, args=(q, args, startup_profile))
     t.start()
     process = q.get(timeout=65)
+    if startup_profile:
+        profile_filename = profiler.stop()
     if isinstance(process, Exception):
         # Startup failed, exit now
         sys.exit(1)
+    if startup_profile:
+        filename = startup_profile.write(profiler.dirname, process, profile_filename)
+        print("Wrote startup profile to %s" % os.path.join(profiler.dirname, filename))
 
     # Now its safe to import Malcolm and cothread
     import cothread
@@ -17,6 +17,7 @@ from malcolm.core import (
     PartRegistrar,
     TableMeta,
     config_tag,
+    non_blocking,
 )
 from malcolm.modules import builtin, scanning
 from malcolm.modules.scanning.infos import ExposureDeadtimeInfo
@@ -250,6 +251,7 @@ class DetectorDriverPart(builtin.parts.ChildPart):
             child = context.block_view(self.mri)
             child.attributesFile.put_value("")
 
+    @non_blocking
     @add_call_types
     def on_report_status(self) -> scanning.hooks.UInfos:
         ret: List[Info] = []
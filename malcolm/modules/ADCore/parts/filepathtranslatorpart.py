@@ -1,6 +1,14 @@
 from annotypes import Anno, add_call_types
 
-from malcolm.core import APartName, Part, PartRegistrar, StringMeta, Widget, config_tag
+from malcolm.core import (
+    APartName,
+    Part,
+    PartRegistrar,
+    StringMeta,
+    Widget,
+    config_tag,
+    non_blocking,
+)
 from malcolm.modules import scanning
 
 from ..infos import FilePathTranslatorInfo
@@ -58,6 +66,7 @@ class FilepathTranslatorPart(Part):
             "networkPrefix", self.network_prefix, self.network_prefix.set_value
         )
 
+    @non_blocking
     @add_call_types
     def on_report_status(self) -> scanning.hooks.UInfos:
         info = FilePathTranslatorInfo(
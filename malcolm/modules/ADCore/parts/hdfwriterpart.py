@@ -3,10 +3,10 @@ import time
 from typing import Dict, Iterator, List, Optional
 from xml.etree import cElementTree as ET
 
-from annotypes import Anno, add_call_types
+from annotypes import Anno, add_call_types, json_encode
 from scanpointgenerator import CompoundGenerator, Dimension
 
-from malcolm.compat import et_to_string
+from malcolm.compat import OrderedDict, et_to_string
 from malcolm.core import (
     APartName,
     Block,
@@ -30,8 +30,14 @@ from ..util import FRAME_TIMEOUT, APartRunsOnWindows, make_xml_filename
 
 PartInfo = Dict[str, List[Info]]
 
+# How often we flush in seconds while running
+FLUSH_PERIOD = 1.0
+
 SUFFIXES = "NXY3456789"
 
+# How many layout XMLs to keep for configure() to reuse
+LAYOUT_CACHE_SIZE = 4
+
 with Anno("Toggle writing of all ND attributes to HDF file"):
     AWriteAllNDAttributes = bool
 
@@ -337,6 +343,25 @@ def make_layout_xml(
     return xml
 
 
+def layout_xml_key(
+    generator: CompoundGenerator,
+    part_info: scanning.hooks.APartInfo,
+    write_all_nd_attributes: bool = False,
+) -> str:
+    """Serialize the things that make_layout_xml depends on, so identical
+    layouts can be cached"""
+    ranks = [info.rank for info in NDArrayDatasetInfo.filter_values(part_info)]
+    calcs = [
+        (info.name, info.attr)
+        for info in CalculatedNDAttributeDatasetInfo.filter_values(part_info)
+    ]
+    attrs = [
+        (info.name, info.attr)
+        for info in NDAttributeDatasetInfo.filter_values(part_info)
+    ]
+    return json_encode([generator, ranks[:1], calcs, attrs, write_all_nd_attributes])
+
+
 # We will set these attributes on the child block, so don't save them
 @builtin.util.no_save(
     "positionMode",
@@ -379,6 +404,14 @@ class HDFWriterPart(builtin.parts.ChildPart):
         self.uniqueid_offset = 0
         # The HDF5 layout file we write to say where the datasets go
         self.layout_filename: Optional[str] = None
+        # The contents of that file, so rearm can check it is still valid
+        self.layout_xml: Optional[str] = None
+        # {layout_xml_key: layout xml} for the most recently made layouts, so
+        # those made at precompute() can be reused at configure()
+        self.layout_cache: "OrderedDict[str, str]" = OrderedDict()
+        # How many times we have been rearmed since configure, appended to the
+        # file name so each run writes a new file
+        self.rearm_count = 0
         self.runs_on_windows = runs_on_windows
         # How long to wait between frame updates before error
         self.frame_timeout = 0.0
@@ -402,11 +435,14 @@ class HDFWriterPart(builtin.parts.ChildPart):
         if self.layout_filename and os.path.isfile(self.layout_filename):
             os.remove(self.layout_filename)
             child.xmlLayout.put_value("")
+        self.layout_xml = None
 
     def setup(self, registrar: PartRegistrar) -> None:
         super().setup(registrar)
         # Hooks
+        registrar.hook(scanning.hooks.PrecomputeHook, self.on_precompute)
         registrar.hook(scanning.hooks.ConfigureHook, self.on_configure)
+        registrar.hook(scanning.hooks.RearmHook, self.on_rearm)
         registrar.hook(
             (scanning.hooks.PostRunArmedHook, scanning.hooks.SeekHook), self.on_seek
         )
@@ -422,6 +458,29 @@ class HDFWriterPart(builtin.parts.ChildPart):
         # Tell the controller to expose some extra configure parameters
         registrar.report(scanning.hooks.ConfigureHook.create_info(self.on_configure))
 
+    @add_call_types
+    def on_precompute(
+        self,
+        part_info: scanning.hooks.APartInfo,
+        generator: scanning.hooks.AGenerator,
+    ) -> None:
+        # Making the set points for a large scan is slow, so do it now
+        self._make_layout_xml(generator, part_info)
+
+    def _make_layout_xml(
+        self, generator: CompoundGenerator, part_info: scanning.hooks.APartInfo
+    ) -> str:
+        write_all_nd_attributes = self.write_all_nd_attributes.value
+        key = layout_xml_key(generator, part_info, write_all_nd_attributes)
+        xml = self.layout_cache.get(key, None)
+        if xml is None:
+            xml = make_layout_xml(generator, part_info, write_all_nd_attributes)
+        self.layout_cache[key] = xml
+        self.layout_cache.move_to_end(key)
+        while len(self.layout_cache) > LAYOUT_CACHE_SIZE:
+            self.layout_cache.popitem(last=False)
+        return xml
+
     # Allow CamelCase as these parameters will be serialized
     # noinspection PyPep8Naming
     @add_call_types
@@ -436,6 +495,31 @@ class HDFWriterPart(builtin.parts.ChildPart):
         formatName: scanning.hooks.AFormatName = "det",
         fileTemplate: scanning.hooks.AFileTemplate = "%s.h5",
     ) -> scanning.hooks.UInfos:
+        self.rearm_count = 0
+        return self._configure(
+            context,
+            completed_steps,
+            steps_to_do,
+            part_info,
+            generator,
+            fileDir,
+            formatName,
+            fileTemplate,
+            file_name=formatName,
+        )
+
+    def _configure(
+        self,
+        context,
+        completed_steps,
+        steps_to_do,
+        part_info,
+        generator,
+        fileDir,
+        formatName,
+        fileTemplate,
+        file_name,
+    ):
         # On initial configure, expect to get the demanded number of frames
         self.done_when_reaches = completed_steps + steps_to_do
         self.uniqueid_offset = 0
@@ -456,7 +540,7 @@ class HDFWriterPart(builtin.parts.ChildPart):
             h5_file_dir = FilePathTranslatorInfo.translate_filepath(part_info, file_dir)
         else:
             h5_file_dir = file_dir
-        filename = fileTemplate % formatName
+        filename = fileTemplate % file_name
         assert "." in filename, "File extension for %r should be supplied" % filename
         futures = child.put_attribute_values_async(
             dict(
@@ -468,16 +552,17 @@ class HDFWriterPart(builtin.parts.ChildPart):
                 lazyOpen=True,
                 arrayCounter=0,
                 filePath=h5_file_dir + os.sep,
-                fileName=formatName,
+                fileName=file_name,
                 fileTemplate="%s" + fileTemplate,
             )
         )
         futures += set_dimensions(child, generator)
-        xml = make_layout_xml(generator, part_info, self.write_all_nd_attributes.value)
+        xml = self._make_layout_xml(generator, part_info)
         self.layout_filename = make_xml_filename(file_dir, self.mri, suffix="layout")
         assert self.layout_filename, "No layout filename"
         with open(self.layout_filename, "w") as f:
             f.write(xml)
+        self.layout_xml = xml
         layout_filename_pv_value = self.layout_filename
         if self.runs_on_windows:
             layout_filename_pv_value = FilePathTranslatorInfo.translate_filepath(
@@ -494,6 +579,60 @@ class HDFWriterPart(builtin.parts.ChildPart):
         context.wait_all_futures(futures)
         # Reset numCapture back to 0
         child.numCapture.put_value(0)
+        self._start(child)
+        # Return the dataset information
+        dataset_infos = list(
+            create_dataset_infos(formatName, part_info, generator, filename)
+        )
+        return dataset_infos
+
+    # Allow CamelCase as these parameters will be serialized
+    # noinspection PyPep8Naming
+    @add_call_types
+    def on_rearm(
+        self,
+        context: scanning.hooks.AContext,
+        completed_steps: scanning.hooks.ACompletedSteps,
+        steps_to_do: scanning.hooks.AStepsToDo,
+        part_info: scanning.hooks.APartInfo,
+        generator: scanning.hooks.AGenerator,
+        fileDir: scanning.hooks.AFileDir,
+        formatName: scanning.hooks.AFormatName = "det",
+        fileTemplate: scanning.hooks.AFileTemplate = "%s.h5",
+    ) -> scanning.hooks.UInfos:
+        # Write a new file each time so we don't overwrite the last run's
+        self.rearm_count += 1
+        file_name = "%s_%d" % (formatName, self.rearm_count)
+        xml = self._make_layout_xml(generator, part_info)
+        if xml != self.layout_xml:
+            # The datasets have changed, so we need to configure from scratch
+            return self._configure(
+                context,
+                completed_steps,
+                steps_to_do,
+                part_info,
+                generator,
+                fileDir,
+                formatName,
+                fileTemplate,
+                file_name=file_name,
+            )
+        # The file settings and layout are unchanged since configure, so just
+        # rewind the counters and start writing the new file
+        self.done_when_reaches = completed_steps + steps_to_do
+        self.uniqueid_offset = 0
+        child = context.block_view(self.mri)
+        child.put_attribute_values(
+            dict(arrayCounter=0, numCapture=0, fileName=file_name)
+        )
+        self._start(child)
+        filename = fileTemplate % file_name
+        dataset_infos = list(
+            create_dataset_infos(formatName, part_info, generator, filename)
+        )
+        return dataset_infos
+
+    def _start(self, child):
         # Start the plugin
         self.start_future = child.start_async()
         # Start a future waiting for the first array
@@ -501,11 +640,6 @@ class HDFWriterPart(builtin.parts.ChildPart):
             "arrayCounterReadback", greater_than_zero
         )
         self._check_xml_is_valid(child)
-        # Return the dataset information
-        dataset_infos = list(
-            create_dataset_infos(formatName, part_info, generator, filename)
-        )
-        return dataset_infos
 
     def _check_xml_is_valid(self, child):
         assert child.xmlLayoutValid.value, "%s: invalid XML layout file (%s)" % (
@@ -532,22 +666,23 @@ class HDFWriterPart(builtin.parts.ChildPart):
         child = context.block_view(self.mri)
         child.uniqueId.subscribe_value(self.update_completed_steps)
         f_done = child.when_value_matches_async("uniqueId", self.done_when_reaches)
-        while True:
-            try:
-                context.wait_all_futures(f_done, timeout=1)
-            except TimeoutError:
-                # This is ok, means we aren't done yet, so flush
-                self._flush_if_still_writing(child)
-                # Check it hasn't been too long
-                if self.last_id_update:
-                    if time.time() > self.last_id_update + self.frame_timeout:
-                        raise TimeoutError(
-                            "HDF writer stalled, last updated at %s"
-                            % (self.last_id_update)
-                        )
-                # TODO: what happens if we miss the last frame?
-            else:
-                return
+        # Return as soon as we are done, flushing periodically until then
+        timer = context.call_every(FLUSH_PERIOD, self._flush_and_check_stalled, child)
+        try:
+            context.wait_all_futures(f_done)
+        finally:
+            timer.cancel()
+        # TODO: what happens if we miss the last frame?
+
+    def _flush_and_check_stalled(self, child):
+        # We aren't done yet, so flush
+        self._flush_if_still_writing(child)
+        # Check it hasn't been too long
+        if self.last_id_update:
+            if time.time() > self.last_id_update + self.frame_timeout:
+                raise TimeoutError(
+                    "HDF writer stalled, last updated at %s" % (self.last_id_update)
+                )
 
     def _flush_if_still_writing(self, child):
         # Check that the start_future hasn't errored
@@ -1,4 +1,4 @@
-from typing import Tuple
+from typing import Optional, Tuple
 
 from annotypes import Any, add_call_types
 
@@ -25,6 +25,8 @@ class PositionLabellerPart(builtin.parts.ChildPart):
 
     # Stored generator for positions
     generator: AGenerator = None
+    # Cache of its points
+    points_cache: Optional[scanning.util.PointsCache] = None
     # The last index we have loaded
     end_index = None
     # Future for plugin run
@@ -93,10 +95,14 @@ class PositionLabellerPart(builtin.parts.ChildPart):
         completed_steps: scanning.hooks.ACompletedSteps,
         steps_to_do: scanning.hooks.AStepsToDo,
         generator: scanning.hooks.AGenerator,
+        points_cache: Optional[scanning.hooks.APointsCache] = None,
     ) -> None:
         # clear out old subscriptions
         context.unsubscribe_all()
         self.generator = generator
+        self.points_cache = scanning.util.PointsCache.for_generator(
+            generator, points_cache
+        )
         # Calculate how long to wait before marking this scan as stalled
         self.frame_timeout = FRAME_TIMEOUT
         if generator.duration > 0:
@@ -176,10 +182,13 @@ class PositionLabellerPart(builtin.parts.ChildPart):
         if end_index > self.generator.size:
             end_index = self.generator.size
 
-        for i in range(start_index, end_index):
-            point = self.generator.get_point(i)
+        self.points_cache = scanning.util.PointsCache.for_generator(
+            self.generator, self.points_cache
+        )
+        points = self.points_cache.get_points(start_index, end_index)
+        for indexes in points.indexes:
             xml += "<position"
-            for j, value in enumerate(point.indexes):
+            for j, value in enumerate(indexes):
                 xml += ' d%d="%s"' % (j, value)
             xml += " />"
 
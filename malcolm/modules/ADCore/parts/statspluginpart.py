@@ -4,7 +4,7 @@ from xml.etree import cElementTree as ET
 from annotypes import Anno, add_call_types
 
 from malcolm.compat import et_to_string
-from malcolm.core import APartName, PartRegistrar
+from malcolm.core import APartName, PartRegistrar, non_blocking
 from malcolm.modules import builtin, scanning
 
 from ..infos import CalculatedNDAttributeDatasetInfo, FilePathTranslatorInfo
@@ -45,6 +45,7 @@ class StatsPluginPart(builtin.parts.ChildPart):
         registrar.hook(scanning.hooks.ReportStatusHook, self.on_report_status)
         registrar.hook(scanning.hooks.ConfigureHook, self.on_configure)
 
+    @non_blocking
     @add_call_types
     def on_report_status(self) -> scanning.hooks.UInfos:
         return [
@@ -1,6 +1,6 @@
 from typing import List
 
-from malcolm.core import PartRegistrar
+from malcolm.core import PartRegistrar, non_blocking
 from malcolm.modules import ADCore, pandablocks, scanning
 
 from ..util import DatasetBitsTable, DatasetPositionsTable
@@ -47,6 +47,7 @@ class PandADatasetBussesPart(pandablocks.parts.PandABussesPart):
         )
         return pos_table
 
+    @non_blocking
     def on_report_status(self) -> scanning.hooks.UInfos:
         ret = []
         assert self.bits, "No bits"
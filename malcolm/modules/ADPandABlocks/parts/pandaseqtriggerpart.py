@@ -157,6 +157,7 @@ class PandASeqTriggerPart(builtin.parts.ChildPart):
         )
         # Stored generator for positions
         self.generator = None
+        self.points_cache: Optional[scanning.util.PointsCache] = None
         # The last index we have loaded
         self.loaded_up_to = 0
         # The last scan point index of the current run
@@ -266,8 +267,12 @@ class PandASeqTriggerPart(builtin.parts.ChildPart):
         part_info: scanning.hooks.APartInfo,
         generator: scanning.hooks.AGenerator,
         axesToMove: scanning.hooks.AAxesToMove,
+        points_cache: Optional[scanning.hooks.APointsCache] = None,
     ) -> None:
         self.generator = generator
+        self.points_cache = scanning.util.PointsCache.for_generator(
+            generator, points_cache
+        )
         self.loaded_up_to = completed_steps
         self.scan_up_to = completed_steps + steps_to_do
         self.loading = False
@@ -455,8 +460,8 @@ class PandASeqTriggerPart(builtin.parts.ChildPart):
         return rows
 
     def _fill_sequencer(self, seq_table: Attribute) -> None:
-        assert self.generator, "No generator"
-        points = self.generator.get_points(self.loaded_up_to, self.scan_up_to)
+        assert self.points_cache, "No generator"
+        points = self.points_cache.get_points(self.loaded_up_to, self.scan_up_to)
 
         if points is None or len(points) == 0:
             table = SequencerTable.from_rows([])
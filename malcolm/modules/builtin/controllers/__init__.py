@@ -10,8 +10,13 @@ from .managercontroller import (
     AMri,
     ATemplateDesigns,
     AUseGit,
+    DesignCache,
+    DesignIndex,
+    GitCommitter,
     ManagerController,
     check_git_version,
+    design_cache,
+    design_index,
 )
 from .proxycontroller import AComms, AMri, APublish, ProxyController
 from .servercomms import ADescription, AMri, ServerComms
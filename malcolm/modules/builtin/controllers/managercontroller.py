@@ -1,13 +1,20 @@
+import bisect
+import collections
+import hashlib
+import logging
 import os
 import socket
 import subprocess
-from typing import Dict, List, Sequence, Set, Tuple
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
 
 from annotypes import Anno, add_call_types, deserialize_object, json_decode, json_encode
 
 from malcolm.compat import OrderedDict
 from malcolm.core import (
     CAMEL_RE,
+    DEFAULT_TIMEOUT,
     Alarm,
     AlarmSeverity,
     AlarmStatus,
@@ -17,26 +24,51 @@ from malcolm.core import (
     ChoiceMeta,
     Context,
     Delta,
+    Hook,
+    Info,
     Part,
+    Queue,
+    Spawned,
     StringMeta,
     Subscribe,
     TableMeta,
+    TimeoutError,
     Unsubscribe,
     Widget,
     camel_to_title,
     config_tag,
     get_config_tag,
+    sleep,
     without_config_tags,
 )
+from malcolm.core.process import STOPPING
 from malcolm.core.tags import Port, without_group_tags
 
 from ..hooks import LayoutHook, LoadHook, SaveHook
-from ..infos import LayoutInfo, PartExportableInfo, PartModifiedInfo, PortInfo
-from ..util import ExportTable, LayoutTable, ManagerStates
+from ..infos import (
+    DesignChangeInfo,
+    LayoutInfo,
+    PartExportableInfo,
+    PartModifiedInfo,
+    PortInfo,
+)
+from ..util import (
+    HOOK_HISTOGRAM_BINS,
+    DesignChangeTable,
+    ExportTable,
+    HookHistogramTable,
+    HookTimingTable,
+    LayoutTable,
+    ManagerStates,
+    config_value_changed,
+)
 from .statefulcontroller import ADescription, AMri, StatefulController
 
 ss = ManagerStates
 
+# Create a module level logger
+log = logging.getLogger(__name__)
+
 
 with Anno("Directory to write save/load config to"):
     AConfigDir = str
@@ -46,6 +78,10 @@ with Anno("Use git to manage to saved config files"):
     AUseGit = bool
 with Anno("Name of design to save, if different from current design"):
     ASaveDesign = str
+with Anno("Name of design to compare with the current state"):
+    ACompareDesign = str
+with Anno("The attributes that loading the design would change"):
+    ADesignChangeTable = DesignChangeTable
 with Anno(
     "A directory of templates with which to initially populate designs "
     "Attribute. These cannot be saved over."
@@ -74,10 +110,217 @@ def check_git_version(required_version):
     return parse(version) >= parse(required_version)
 
 
+# {git_dir: Lock} so git commands in the same repo don't run concurrently
+_git_locks: Dict[str, threading.Lock] = {}
+_git_locks_lock = threading.Lock()
+
+
+def git_lock(git_dir: str) -> threading.Lock:
+    with _git_locks_lock:
+        lock = _git_locks.get(git_dir)
+        if lock is None:
+            lock = _git_locks[git_dir] = threading.Lock()
+        return lock
+
+
+class GitCommitter:
+    """Adds and commits saved design files to git in a background thread,
+    batching up any saves that are made while a commit is in progress"""
+
+    def __init__(self, run_git_cmd: Callable[..., Any]) -> None:
+        self._run_git_cmd = run_git_cmd
+        self._lock = threading.Lock()
+        # {filename: [msg]} of commits still to do
+        self._pending: Dict[str, List[str]] = OrderedDict()
+        self._thread: Optional[threading.Thread] = None
+
+    def commit(self, filename: str, msg: str) -> None:
+        """Schedule filename to be added and committed with msg"""
+        with self._lock:
+            self._pending.setdefault(filename, []).append(msg)
+            if self._thread is None:
+                # Not a daemon so we don't lose commits at exit
+                self._thread = threading.Thread(
+                    target=self._commit_pending, name="GitCommitter"
+                )
+                self._thread.start()
+
+    def _commit_pending(self) -> None:
+        try:
+            while True:
+                with self._lock:
+                    if not self._pending:
+                        self._thread = None
+                        return
+                    pending, self._pending = self._pending, OrderedDict()
+                filenames = list(pending)
+                msgs = []
+                for filename_msgs in pending.values():
+                    for msg in filename_msgs:
+                        if msg not in msgs:
+                            msgs.append(msg)
+                try:
+                    self._run_git_cmd("add", *filenames)
+                    self._run_git_cmd(
+                        "commit", "--allow-empty", "-m", "\n".join(msgs), *filenames
+                    )
+                except Exception:
+                    # Don't let one failure stop later commits
+                    log.exception("Failed to commit %s", filenames)
+        finally:
+            with self._lock:
+                if self._thread is threading.current_thread():
+                    # We didn't exit normally, so let the next commit() start
+                    # a new thread rather than queueing behind a dead one
+                    self._thread = None
+
+    def wait(self, timeout: float = None) -> None:
+        """Wait for any pending commits to be done. Polls rather than joining
+        the thread so other cothreads can run while we wait"""
+        with self._lock:
+            thread = self._thread
+        if thread is None:
+            return
+        end = None if timeout is None else time.time() + timeout
+        while thread.is_alive() and (end is None or time.time() < end):
+            sleep(0.01)
+
+
+# A file or directory modified this recently may be modified again without its
+# mtime changing on filesystems with coarse timestamps (like NFS), so don't
+# trust the mtime until it is this many seconds old
+RACY_INTERVAL = 2.0
+
+
+def _settled(mtime_ns: int) -> bool:
+    return time.time() - mtime_ns / 1e9 > RACY_INTERVAL
+
+
+class DesignIndex:
+    """The names of the .json design files in a directory, only listing the
+    directory again when its mtime changes"""
+
+    def __init__(self, dir_name: str) -> None:
+        self.dir_name = dir_name
+        self._lock = threading.Lock()
+        self._mtime_ns: Optional[int] = None
+        self._entries: List[str] = []
+        self._names: List[str] = []
+
+    def _update(self) -> bool:
+        # List the directory again if it has changed, returning whether it
+        # exists. Called with the lock taken
+        try:
+            mtime_ns = os.stat(self.dir_name).st_mtime_ns
+        except OSError:
+            self._mtime_ns = None
+            return False
+        if mtime_ns != self._mtime_ns:
+            self._entries = sorted(os.listdir(self.dir_name))
+            names = []
+            for f in self._entries:
+                path = os.path.join(self.dir_name, f)
+                if f.endswith(".json") and os.path.isfile(path):
+                    names.append(f[: -len(".json")])
+            self._names = names
+            # If the directory changed very recently then list it again
+            # next time in case there is another change in the same tick
+            self._mtime_ns = mtime_ns if _settled(mtime_ns) else None
+        return True
+
+    def entries(self) -> List[str]:
+        """Return the sorted names of everything in the directory, or an
+        empty list if the directory doesn't exist"""
+        with self._lock:
+            if self._update():
+                return list(self._entries)
+            return []
+
+    def names(self) -> List[str]:
+        """Return the sorted design names in the directory, without the .json
+        extension, or an empty list if the directory doesn't exist"""
+        with self._lock:
+            if self._update():
+                return list(self._names)
+            return []
+
+
+# {dir_name: DesignIndex} shared between all ManagerControllers
+_design_indexes: Dict[str, DesignIndex] = {}
+_design_indexes_lock = threading.Lock()
+
+
+def design_index(dir_name: str) -> DesignIndex:
+    with _design_indexes_lock:
+        index = _design_indexes.get(dir_name)
+        if index is None:
+            index = _design_indexes[dir_name] = DesignIndex(dir_name)
+        return index
+
+
+class DesignCache:
+    """Parsed design files shared between all ManagerControllers. Files are
+    only read again if their mtime or size changes, and only parsed again if
+    their contents differ from any parsed file still in the cache.
+
+    The returned structures are shared, so must not be modified"""
+
+    def __init__(self, max_structures: int = 256) -> None:
+        self.max_structures = max_structures
+        self._lock = threading.Lock()
+        # {filename: ((mtime_ns, size), digest)}
+        self._stamps: Dict[str, Tuple[Tuple[int, int], str]] = {}
+        # {digest: structure} in least recently used order
+        self._structures: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def load(self, filename: str) -> Dict[str, Any]:
+        """Return the parsed structure of the given design file"""
+        stat = os.stat(filename)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            stamp_digest = self._stamps.get(filename)
+            if stamp_digest and stamp_digest[0] == stamp:
+                structure = self._lookup(stamp_digest[1])
+                if structure is not None:
+                    return structure
+        with open(filename, "rb") as f:
+            text = f.read()
+        digest = hashlib.sha1(text).hexdigest()
+        with self._lock:
+            structure = self._lookup(digest)
+            if structure is None:
+                structure = json_decode(text.decode())
+                self._structures[digest] = structure
+                while len(self._structures) > self.max_structures:
+                    self._structures.popitem(last=False)
+            if _settled(stat.st_mtime_ns):
+                self._stamps[filename] = (stamp, digest)
+            else:
+                # Might change again without the stamp changing, so hash it
+                # again next time
+                self._stamps.pop(filename, None)
+        return structure
+
+    def _lookup(self, digest: str) -> Optional[Dict[str, Any]]:
+        structure = self._structures.get(digest)
+        if structure is not None:
+            self._structures.move_to_end(digest)
+        return structure
+
+
+# Shared between all ManagerControllers in the process
+design_cache = DesignCache()
+
+
 class ManagerController(StatefulController):
     """RunnableDevice implementer that also exposes GUI for child parts"""
 
     state_set = ss()
+    # How many of the most recent hook timings to keep in hookTimings
+    hook_timings_length = 100
+    # Minimum time in seconds between publishes of hookTimings and
+    # hookHistogram, timings recorded in between are published together
+    hook_timings_publish_period = 1.0
 
     def __init__(
         self,
@@ -107,17 +350,27 @@ class ManagerController(StatefulController):
                 )
             else:
                 self.git_config = ()
+        # Commits saved designs to git without blocking the controller
+        self.git_committer = GitCommitter(lambda *args: self._run_git_cmd(*args))
         # last saved layout and exports
         self.saved_visibility = None
         self.saved_exports = None
         # ((name, AttributeModel/MethodModel, setter, needs_context))
         self._current_part_fields = ()
-        self._subscriptions: List[Subscribe] = []
+        # {(mri, attr_name, export_name): (export, setter, Subscribe)}
+        self._export_fields: Dict[Tuple[str, str, str], Tuple] = OrderedDict()
         self.port_info: Dict[APartName, List[PortInfo]] = {}
         self.part_exportable: Dict[Part, Sequence[AAttributeName]] = {}
         # TODO: turn this into "exported attribute modified"
         self.context_modified: Dict[Part, Set[str]] = {}
         self.part_modified: Dict[Part, PartModifiedInfo] = {}
+        # The layout table the following were calculated from
+        self._modified_layout = None
+        # {part_name: index} of the visible parts in the layout table
+        self._visible_part_index: Dict[str, int] = {}
+        # {part_name: (index, [(message, modified_by_us)])} of visible parts
+        # that are modified
+        self._part_modified_messages: Dict[str, Tuple[int, List]] = {}
         # The attributes our part has published
         self.our_config_attributes: Dict[str, AttributeModel] = {}
         # The reportable infos we are listening for
@@ -168,20 +421,117 @@ class ManagerController(StatefulController):
             "Whether the design is modified", tags=[Widget.LED.tag()]
         ).create_attribute_model()
         self.field_registry.add_attribute_model("modified", self.modified)
+        # Create read-only tables of how long each part took to run each hook
+        self.hook_timings = TableMeta.from_table(
+            HookTimingTable, "Most recent wall times of each part running each hook"
+        ).create_attribute_model()
+        self.field_registry.add_attribute_model("hookTimings", self.hook_timings)
+        self.hook_histogram = TableMeta.from_table(
+            HookHistogramTable, "Cumulative wall times of each part running each hook"
+        ).create_attribute_model()
+        self.field_registry.add_attribute_model("hookHistogram", self.hook_histogram)
+        # Ring buffer of (hook, part, duration) rows for hook_timings
+        self._hook_timings: collections.deque = collections.deque(
+            maxlen=self.hook_timings_length
+        )
+        # {(hook, part): [count, total, maximum, *bin_counts]}
+        self._hook_histogram: Dict[Tuple[str, Optional[str]], List] = {}
+        # Whether there are recorded timings that haven't been published yet
+        self._hook_timings_dirty = False
+        self._hook_timings_published = 0.0
+        # Spawned function that will publish them, and a queue to wake it early
+        self._hook_timings_flush: Optional[Spawned] = None
+        self._hook_timings_wakeup = Queue()
         # Create the save method
         self.set_writeable_in(self.field_registry.add_method_model(self.save), ss.READY)
+        # And one to say what loading a design would change
+        self.set_writeable_in(
+            self.field_registry.add_method_model(
+                self.report_design_changes, "designChanges"
+            ),
+            ss.READY,
+        )
+
+    def wait_hooks(
+        self, hook_queue: Queue, hook_spawned: List[Hook]
+    ) -> Dict[str, List[Info]]:
+        try:
+            return super().wait_hooks(hook_queue, hook_spawned)
+        finally:
+            self.record_hook_timings(hook_spawned)
+
+    def record_hook_timings(self, hooks: List[Hook]) -> None:
+        # Only hooks that completed will have a duration, and there is nothing
+        # to publish if no parts were hooked
+        rows = [
+            (h.name, h.child.name, h.duration) for h in hooks if h.duration is not None
+        ]
+        if not rows:
+            return
+        for hook_name, part_name, duration in rows:
+            counts = self._hook_histogram.get((hook_name, part_name))
+            if counts is None:
+                counts = [0, 0.0, 0.0] + [0] * (len(HOOK_HISTOGRAM_BINS) + 1)
+                self._hook_histogram[(hook_name, part_name)] = counts
+            counts[0] += 1
+            counts[1] += duration
+            counts[2] = max(counts[2], duration)
+            counts[3 + bisect.bisect(HOOK_HISTOGRAM_BINS, duration)] += 1
+        self._hook_timings.extend(rows)
+        self._hook_timings_dirty = True
+        delay = (
+            self._hook_timings_published
+            + self.hook_timings_publish_period
+            - time.time()
+        )
+        assert self.process, "No process"
+        if delay <= 0 or self.process.state == STOPPING:
+            # Publish now so process.stop() doesn't wait for a flush
+            self.publish_hook_timings()
+        elif self._hook_timings_flush is None:
+            # Published too recently, so publish these and any more that
+            # arrive when the period is up
+            self._hook_timings_flush = self.process.spawn(
+                self._flush_hook_timings, delay
+            )
+
+    def _flush_hook_timings(self, delay: float) -> None:
+        try:
+            self._hook_timings_wakeup.get(timeout=delay)
+        except TimeoutError:
+            pass
+        self._hook_timings_flush = None
+        self.publish_hook_timings()
+
+    def publish_hook_timings(self) -> None:
+        """Publish any recorded hook timings to hookTimings and hookHistogram"""
+        if not self._hook_timings_dirty:
+            return
+        self._hook_timings_dirty = False
+        self._hook_timings_published = time.time()
+        with self.changes_squashed:
+            self.hook_timings.set_value(HookTimingTable.from_rows(self._hook_timings))
+            self.hook_histogram.set_value(
+                HookHistogramTable.from_rows(
+                    list(k) + v for k, v in sorted(self._hook_histogram.items())
+                )
+            )
 
     def _run_git_cmd(self, *args, **kwargs):
         # Run git command, don't care if it fails, logging the output
         cwd = kwargs.get("cwd", self.config_dir)
         if self.use_git:
             try:
-                output = subprocess.check_output(
-                    ("git",) + self.git_config + args, cwd=cwd
-                )
+                with git_lock(cwd):
+                    output = subprocess.check_output(
+                        ("git",) + self.git_config + args, cwd=cwd
+                    )
             except subprocess.CalledProcessError as e:
                 self.log.warning("Git command failed: %s\n%s", e, e.output)
                 return None
+            except OSError as e:
+                self.log.warning("Git command could not be run: %s", e)
+                return None
             else:
                 self.log.debug("Git command completed: %s", output)
                 return output
@@ -201,6 +551,14 @@ class ManagerController(StatefulController):
             # self._update_block_endpoints()
             self.set_default_layout()
 
+    def halt(self):
+        if self._hook_timings_flush:
+            # Publish any pending hook timings now rather than waiting
+            self._hook_timings_wakeup.put(None)
+        super().halt()
+        # Don't lose any saved designs that haven't been committed yet
+        self.git_committer.wait(timeout=DEFAULT_TIMEOUT)
+
     def set_default_layout(self):
         self.set_layout(LayoutTable([], [], [], [], []))
 
@@ -256,25 +614,35 @@ class ManagerController(StatefulController):
                 assert info, "No info to update part"
                 # Update the alarm for the given part
                 self.part_modified[part] = info
-            # Find the modified alarms for each visible part
+            layout = self.layout.value
+            if part is None or layout is not self._modified_layout:
+                # Layout may have changed, so recalculate every part
+                self._modified_layout = layout
+                self._visible_part_index = {
+                    part_name: i
+                    for i, (part_name, visible) in enumerate(
+                        zip(layout.name, layout.visible)
+                    )
+                    if visible
+                }
+                self._part_modified_messages = {}
+                for p in self.part_modified:
+                    self._update_part_modified_messages(p)
+            else:
+                # Only the given part has changed
+                self._update_part_modified_messages(part)
+            # Find the modified alarms for each visible part in layout order
             message_list = []
             only_modified_by_us = True
-            for part_name, visible in zip(
-                self.layout.value.name, self.layout.value.visible
+            for _, messages in sorted(
+                self._part_modified_messages.values(), key=lambda x: x[0]
             ):
-                part = self.parts[part_name]
-                info = self.part_modified.get(part, None)
-                if visible and info:
-                    for name, message in sorted(info.modified.items()):
-                        # Attribute flagged as been modified, is it by the
-                        # context we passed to the part?
-                        if name in self.context_modified.get(part, {}):
-                            message = "(We modified) %s" % (message,)
-                        else:
-                            only_modified_by_us = False
-                        message_list.append(message)
+                for message, modified_by_us in messages:
+                    message_list.append(message)
+                    if not modified_by_us:
+                        only_modified_by_us = False
             # Add in any modification messages from the layout and export tables
-            if self.layout.value.visible != self.saved_visibility:
+            if layout.visible != self.saved_visibility:
                 message_list.append("layout changed")
                 only_modified_by_us = False
             if self.exports.value != self.saved_exports:
@@ -285,50 +653,101 @@ class ManagerController(StatefulController):
                     severity = AlarmSeverity.NO_ALARM
                 else:
                     severity = AlarmSeverity.MINOR_ALARM
-                alarm = Alarm(
-                    severity, AlarmStatus.CONF_STATUS, "\n".join(message_list)
-                )
-                self.modified.set_value(True, alarm=alarm)
+                message = "\n".join(message_list)
             else:
-                self.modified.set_value(False)
+                severity, message = AlarmSeverity.NO_ALARM, ""
+            alarm = self.modified.alarm
+            if (
+                self.modified.value != bool(message_list)
+                or alarm.severity != severity
+                or alarm.message != message
+            ):
+                # Only notify if something has actually changed
+                if message_list:
+                    alarm = Alarm(severity, AlarmStatus.CONF_STATUS, message)
+                    self.modified.set_value(True, alarm=alarm)
+                else:
+                    self.modified.set_value(False)
+
+    def _update_part_modified_messages(self, part: Part) -> None:
+        index = self._visible_part_index.get(part.name, None)
+        info = self.part_modified.get(part, None)
+        if index is None or not info or not info.modified:
+            self._part_modified_messages.pop(part.name, None)
+            return
+        messages = []
+        for name, message in sorted(info.modified.items()):
+            # Attribute flagged as been modified, is it by the context we
+            # passed to the part?
+            modified_by_us = name in self.context_modified.get(part, {})
+            if modified_by_us:
+                message = "(We modified) %s" % (message,)
+            messages.append((message, modified_by_us))
+        self._part_modified_messages[part.name] = (index, messages)
 
     def update_exportable(
         self, part: Part = None, info: PartExportableInfo = None
     ) -> None:
         with self.changes_squashed:
+            changed_names: Set[str] = set()
             if part:
                 assert info, "No info to update part"
-                self.part_exportable[part] = info.names
                 self.port_info[part.name] = info.port_infos
+                old_names = self.part_exportable.get(part, [])
+                self.part_exportable[part] = info.names
+                changed_names = set(
+                    "%s.%s" % (part.name, attr_name)
+                    for attr_name in set(old_names).symmetric_difference(info.names)
+                )
+                if not changed_names:
+                    # Nothing exportable has changed, so nothing to update
+                    return
             # If we haven't saved visibility yet these have been called
             # during do_init, so don't update block endpoints yet, this will
             # be done as a batch at the end of do_init
             if self.saved_visibility is not None:
                 # Find the exportable fields for each visible part
                 names = []
-                for part in self.parts.values():
-                    fields = self.part_exportable.get(part, [])
+                for p in self.parts.values():
+                    fields = self.part_exportable.get(p, [])
                     for attr_name in fields:
-                        names.append("%s.%s" % (part.name, attr_name))
-                changed_names = set(names).symmetric_difference(
-                    self.exports.meta.elements["source"].choices
-                )
+                        names.append("%s.%s" % (p.name, attr_name))
+                source_meta = self.exports.meta.elements["source"]
+                if part is None:
+                    changed_names = set(names).symmetric_difference(source_meta.choices)
+                if names != list(source_meta.choices):
+                    source_meta.set_choices(names)
                 changed_exports = changed_names.intersection(self.exports.value.source)
-                self.exports.meta.elements["source"].set_choices(names)
                 # Update the block endpoints if anything currently exported is
                 # added or deleted
                 if changed_exports:
                     self.update_block_endpoints()
 
     def update_block_endpoints(self):
-        if self._current_part_fields:
-            for name, child, _, _ in self._current_part_fields:
+        new_fields = tuple(self._get_current_part_fields())
+        new_children = {name: child for name, child, _, _ in new_fields}
+        # The fields we can keep, in their existing order
+        kept = [
+            name
+            for name, child, _, _ in self._current_part_fields
+            if new_children.get(name, None) is child
+        ]
+        if [name for name, _, _, _ in new_fields[: len(kept)]] != kept:
+            # Fields have been reordered, so remove and add all of them to
+            # get the right order
+            kept = []
+        kept_set = set(kept)
+        # Remove the fields that have gone or changed
+        for name, child, _, _ in self._current_part_fields:
+            if name not in kept_set:
                 self._block.remove_endpoint(name)
                 for state, state_writeable in self._children_writeable.items():
                     state_writeable.pop(child, None)
-        self._current_part_fields = tuple(self._get_current_part_fields())
-        for name, child, writeable_func, needs_context in self._current_part_fields:
-            self.add_block_field(name, child, writeable_func, needs_context)
+        # Add the fields that are new
+        for name, child, writeable_func, needs_context in new_fields:
+            if name not in kept_set:
+                self.add_block_field(name, child, writeable_func, needs_context)
+        self._current_part_fields = new_fields
 
     def add_part(self, part: Part) -> None:
         super().add_part(part)
@@ -350,14 +769,6 @@ class ManagerController(StatefulController):
             self.add_block_field(name, child, writeable_func, needs_context)
 
     def _get_current_part_fields(self):
-        # Clear out the current subscriptions
-        for subscription in self._subscriptions:
-            controller = self.process.get_controller(subscription.path[0])
-            unsubscribe = Unsubscribe(subscription.id)
-            unsubscribe.set_callback(subscription.callback)
-            controller.handle_request(unsubscribe)
-        self._subscriptions = []
-
         # Find the mris of parts
         mris = {}
         invisible = set()
@@ -375,17 +786,31 @@ class ManagerController(StatefulController):
                 for data in self.field_registry.fields.get(part, []):
                     yield data
 
-        # Add exported fields from visible parts
+        # Find exported fields from visible parts
+        export_keys = []
         for source, export_name in self.exports.value.rows():
             part_name, attr_name = source.rsplit(".", 1)
             part = self.parts[part_name]
             # If part is visible, get its mri
             mri = mris.get(part_name, None)
             if mri and attr_name in self.part_exportable.get(part, []):
-                if not export_name:
-                    export_name = attr_name
-                export, setter = self._make_export_field(mri, attr_name, export_name)
-                yield export_name, export, setter, False
+                export_keys.append((mri, attr_name, export_name or attr_name))
+
+        # Unsubscribe from the ones that are no longer exported
+        for key in list(self._export_fields):
+            if key not in export_keys:
+                _, _, subscription = self._export_fields.pop(key)
+                controller = self.process.get_controller(subscription.path[0])
+                unsubscribe = Unsubscribe(subscription.id)
+                unsubscribe.set_callback(subscription.callback)
+                controller.handle_request(unsubscribe)
+
+        # Add exported fields, only subscribing to the new ones
+        for key in export_keys:
+            if key not in self._export_fields:
+                self._export_fields[key] = self._make_export_field(*key)
+            export, setter, _ = self._export_fields[key]
+            yield key[2], export, setter, False
 
     def _make_export_field(self, mri, attr_name, export_name):
         controller = self.process.get_controller(mri)
@@ -433,11 +858,10 @@ class ManagerController(StatefulController):
 
         subscription = Subscribe(path=path, delta=True)
         subscription.set_callback(update_field)
-        self._subscriptions.append(subscription)
         # When we have waited for the subscription, the first update_field
         # will have been called
         controller.handle_request(subscription).wait()
-        return ret["export"], ret["setter"]
+        return ret["export"], ret["setter"], subscription
 
     def create_part_contexts(self, only_visible=True):
         part_contexts = super().create_part_contexts()
@@ -493,27 +917,33 @@ class ManagerController(StatefulController):
         filename = self._validated_config_filename(design)
         if filename.startswith("/tmp"):
             self.log.warning("Saving to tmp directory %s" % filename)
-        with open(filename, "w") as f:
-            f.write(text)
-        # Run a sync command to make sure we flush this file to disk
-        subprocess.call("sync")
-        # Try and commit the file to git, don't care if it fails
-        self._run_git_cmd("add", filename)
-        msg = "Saved %s %s" % (self.mri, design)
-        self._run_git_cmd("commit", "--allow-empty", "-m", msg, filename)
+        try:
+            with open(filename, "r") as f:
+                unchanged = f.read() == text
+        except OSError:
+            unchanged = False
+        if unchanged:
+            self.log.debug("Design %s unchanged, not writing %s", design, filename)
+        else:
+            with open(filename, "w") as f:
+                f.write(text)
+                # Make sure we flush just this file to disk
+                f.flush()
+                os.fsync(f.fileno())
+            # Try and commit the file to git in the background, don't care if
+            # it fails
+            msg = "Saved %s %s" % (self.mri, design)
+            self.git_committer.commit(filename, msg)
         self._mark_clean(design)
 
     def _set_layout_names(self, extra_name=None):
         names = [""]
-        dir_name = self._make_config_dir()
-        for f in os.listdir(dir_name):
-            if os.path.isfile(os.path.join(dir_name, f)) and f.endswith(".json"):
-                names.append(f.split(".json")[0])
+        names += design_index(self._make_config_dir()).names()
         if extra_name and str(extra_name) not in names:
             names.append(str(extra_name))
         names.sort()
-        if os.path.isdir(self.template_designs):
-            for f in sorted(os.listdir(self.template_designs)):
+        if self.template_designs:
+            for f in design_index(self.template_designs).entries():
                 assert f.startswith("template_") and f.endswith(".json"), (
                     "Template design %s/%s should start with 'template_' "
                     "and end with .json" % (self.template_designs, f)
@@ -558,22 +988,84 @@ class ManagerController(StatefulController):
     def do_load(self, design: str, init: bool = False) -> None:
         """Load a design name, running the child LoadHooks.
 
+        Only the attributes that differ from their current values are put,
+        and the LayoutHook is only run if the layout has changed.
+
         Args:
             design: Name of the design json file, without extension
             init: Passed to the LoadHook to tell the children if this is being
                 run at Init or not
         """
+        attributes, children = self._read_design(design)
+        # Set the layout table
+        layout = self._design_layout(attributes)
+        if self.saved_visibility is None or self._layout_changes(layout):
+            self.set_layout(layout)
+        # Set the exports table
+        exports = self._design_exports(attributes)
+        if list(exports.rows()) != list(self.exports.value.rows()):
+            self.exports.set_value(exports)
+        # Set other attributes
+        our_values = self._our_value_changes(attributes)
+        if our_values:
+            block = self.block_view()
+            block.put_attribute_values(our_values)
+        # Run the load hook to get parts to load their own structure
+        self.run_hooks(
+            LoadHook(p, c, children.get(p.name, {}), init)
+            for p, c in self.create_part_contexts(only_visible=False).items()
+        )
+        self._mark_clean(design, init)
+
+    def design_changes(self, design: str) -> List[DesignChangeInfo]:
+        """Report what loading a design would change, without changing anything
+
+        Args:
+            design: Name of the design json file, without extension
+
+        Returns:
+            The attributes that would change, with part attributes named
+            part.attribute in the order they would be loaded
+        """
+        attributes, children = self._read_design(design)
+        changes = self._layout_changes(self._design_layout(attributes))
+        exports = self._design_exports(attributes)
+        if list(exports.rows()) != list(self.exports.value.rows()):
+            changes.append(DesignChangeInfo("exports", self.exports.value, exports))
+        for k, v in self._our_value_changes(attributes).items():
+            current = self.our_config_attributes[k].value
+            changes.append(DesignChangeInfo(k, current, v))
+        part_info = self.run_hooks(
+            LoadHook(p, c, children.get(p.name, {}), init=False, dry_run=True)
+            for p, c in self.create_part_contexts(only_visible=False).items()
+        )
+        for part_name, infos in DesignChangeInfo.filter_parts(part_info).items():
+            for info in infos:
+                name = "%s.%s" % (part_name, info.name)
+                changes.append(DesignChangeInfo(name, info.current, info.saved))
+        return changes
+
+    @add_call_types
+    def report_design_changes(self, design: ACompareDesign) -> ADesignChangeTable:
+        """Report what loading a design would change, without changing anything"""
+        return DesignChangeTable.from_rows(
+            (change.name, json_encode(change.current), json_encode(change.saved))
+            for change in self.design_changes(design)
+        )
+
+    def _read_design(self, design: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
         if design:
             filename = self._validated_config_filename(design)
-            with open(filename, "r") as f:
-                text = f.read()
-            structure = json_decode(text)
+            structure = design_cache.load(filename)
         else:
             structure = {}
         # Attributes and Children used to be merged, support this
         attributes = structure.get("attributes", structure)
         children = structure.get("children", structure)
-        # Set the layout table
+        return attributes, children
+
+    @staticmethod
+    def _design_layout(attributes: Dict[str, Any]) -> LayoutTable:
         name, mri, x, y, visible = [], [], [], [], []
         for part_name, d in attributes.get("layout", {}).items():
             name.append(part_name)
@@ -581,25 +1073,35 @@ class ManagerController(StatefulController):
             x.append(d["x"])
             y.append(d["y"])
             visible.append(d["visible"])
-        self.set_layout(LayoutTable(name, mri, x, y, visible))
-        # Set the exports table
+        return LayoutTable(name, mri, x, y, visible)
+
+    @staticmethod
+    def _design_exports(attributes: Dict[str, Any]) -> ExportTable:
         source, export = [], []
         for source_name, export_name in attributes.get("exports", {}).items():
             source.append(source_name)
             export.append(export_name)
-        self.exports.set_value(ExportTable(source, export))
-        # Set other attributes
-        our_values = {
-            k: v for k, v in attributes.items() if k in self.our_config_attributes
+        return ExportTable(source, export)
+
+    def _layout_changes(self, layout: LayoutTable) -> List[DesignChangeInfo]:
+        # Compare the x, y, visible of each part with the current layout
+        current = {
+            name: (x, y, visible) for name, _, x, y, visible in self.layout.value.rows()
+        }
+        saved = {name: (x, y, visible) for name, _, x, y, visible in layout.rows()}
+        return [
+            DesignChangeInfo("layout.%s" % name, current.get(name, None), saved_xyv)
+            for name, saved_xyv in saved.items()
+            if current.get(name, None) != saved_xyv
+        ]
+
+    def _our_value_changes(self, attributes: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            k: v
+            for k, v in attributes.items()
+            if k in self.our_config_attributes
+            and config_value_changed(self.our_config_attributes[k].value, v)
         }
-        block = self.block_view()
-        block.put_attribute_values(our_values)
-        # Run the load hook to get parts to load their own structure
-        self.run_hooks(
-            LoadHook(p, c, children.get(p.name, {}), init)
-            for p, c in self.create_part_contexts(only_visible=False).items()
-        )
-        self._mark_clean(design, init)
 
     def _mark_clean(self, design, init=False):
         with self.changes_squashed:
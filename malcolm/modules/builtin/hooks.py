@@ -5,7 +5,7 @@ from annotypes import Anno, Array
 
 from malcolm.core import Context, Hook, Part
 
-from .infos import LayoutInfo, PortInfo
+from .infos import DesignChangeInfo, LayoutInfo, PortInfo
 from .util import LayoutTable
 
 with Anno("The part that has attached to the Hook"):
@@ -79,15 +79,32 @@ class LayoutHook(ControllerHook):
 
 with Anno("The serialized structure to load"):
     AStructure = Union[Mapping[str, Any]]
+with Anno("Whether to just report what would change rather than changing it"):
+    ADryRun = bool
+with Anno("The attributes that would be changed by the load"):
+    ADesignChangeInfos = Union[Array[DesignChangeInfo]]
+UDesignChangeInfos = Union[
+    ADesignChangeInfos, Sequence[DesignChangeInfo], DesignChangeInfo, None
+]
 
 
 class LoadHook(ControllerHook):
-    """Called at load() to load child settings from a structure"""
+    """Called at load() to load child settings from a structure, or to report
+    what would change if dry_run"""
 
     def __init__(
-        self, part: APart, context: AContext, structure: AStructure, init: AInit
+        self,
+        part: APart,
+        context: AContext,
+        structure: AStructure,
+        init: AInit,
+        dry_run: ADryRun = False,
     ) -> None:
-        super().__init__(part, context, structure=structure, init=init)
+        super().__init__(part, context, structure=structure, init=init, dry_run=dry_run)
+
+    def validate_return(self, ret: UDesignChangeInfos) -> ADesignChangeInfos:
+        """Check that all returned infos are DesignChangeInfos"""
+        return ADesignChangeInfos(ret)
 
 
 class SaveHook(ControllerHook):
@@ -115,6 +115,21 @@ class PartModifiedInfo(Info):
         self.modified = modified
 
 
+class DesignChangeInfo(Info):
+    """Info about an attribute that loading a design would change
+
+    Args:
+        name: The name of the attribute that would change
+        current: Its current value
+        saved: The value it would be set to from the design
+    """
+
+    def __init__(self, name: str, current: Any, saved: Any) -> None:
+        self.name = name
+        self.current = current
+        self.saved = saved
+
+
 class RequestInfo(Info):
     """Info saying that the part has received a request that needs servicing.
     Reporting this will send to the correct controller, but not wait for
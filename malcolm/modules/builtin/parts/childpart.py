@@ -34,6 +34,7 @@ from malcolm.core import (
 
 from ..hooks import (
     AContext,
+    ADryRun,
     AInit,
     ALayoutTable,
     APortMap,
@@ -45,9 +46,11 @@ from ..hooks import (
     LoadHook,
     ResetHook,
     SaveHook,
+    UDesignChangeInfos,
     ULayoutInfos,
 )
 from ..infos import (
+    DesignChangeInfo,
     LayoutInfo,
     PartExportableInfo,
     PartModifiedInfo,
@@ -55,7 +58,7 @@ from ..infos import (
     SinkPortInfo,
     SourcePortInfo,
 )
-from ..util import StatefulStates, wait_for_stateful_block_init
+from ..util import StatefulStates, config_value_changed, wait_for_stateful_block_init
 
 TP = TypeVar("TP", bound=PortInfo)
 
@@ -208,8 +211,12 @@ class ChildPart(Part):
 
     @add_call_types
     def on_load(
-        self, context: AContext, structure: AStructure, init: AInit = False
-    ) -> None:
+        self,
+        context: AContext,
+        structure: AStructure,
+        init: AInit = False,
+        dry_run: ADryRun = False,
+    ) -> UDesignChangeInfos:
         child = context.block_view(self.mri)
         iterations: Dict[int, Dict[str, Tuple[Attribute, Any]]] = {}
         for k, v in structure.items():
@@ -229,6 +236,15 @@ class ChildPart(Part):
                     iterations.setdefault(iteration, {})[k] = (attr, v)
                 else:
                     self.log.warning(f"Attr {k} is not config tagged, not restoring")
+        if dry_run:
+            # Report what would change, assuming each iteration is applied
+            # in order
+            return [
+                DesignChangeInfo(k, attr.value, v)
+                for _, params in sorted(iterations.items())
+                for k, (attr, v) in params.items()
+                if config_value_changed(attr.value, v)
+            ]
         # Do this first so that any callbacks that happen in the put know
         # not to notify controller
         self.saved_structure = structure
@@ -237,12 +253,14 @@ class ChildPart(Part):
             # ones that need to change
             to_set = {}
             for k, (attr, v) in params.items():
-                if attr.value != v:
+                if config_value_changed(attr.value, v):
                     to_set[k] = v
-            child.put_attribute_values(to_set)
+            if to_set:
+                child.put_attribute_values(to_set)
         if init and "design" in child:
             # We might not have cleared the changes so report here
             self.send_modified_info_if_not_equal("design", child.design.value)
+        return []
 
     @add_call_types
     def on_save(self, context: AContext) -> AStructure:
@@ -1,8 +1,9 @@
 import collections.abc
-from typing import TYPE_CHECKING, Iterable, Sequence, Type, Union
+import copy
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Sequence, Tuple, Type, Union
 from xml.etree import cElementTree as ET
 
-from annotypes import Anno, Array
+from annotypes import Anno, Array, json_encode
 
 from malcolm.compat import et_to_string
 from malcolm.core import (
@@ -19,6 +20,9 @@ from malcolm.core import (
 if TYPE_CHECKING:
     from .parts import ChildPart  # noqa: F401
 
+# Types that can be compared directly with values decoded from JSON
+SIMPLE_TYPES = (str, int, float, bool, type(None))
+
 with Anno("Is the attribute writeable?"):
     AWriteable = bool
 with Anno(
@@ -114,6 +118,119 @@ class ExportTable(Table):
         self.export = AExportNameArray(export)
 
 
+with Anno("Name of the hook that was run"):
+    AHookNameArray = Union[Array[str]]
+with Anno("Name of the part that the hook was run on"):
+    AHookPartArray = Union[Array[str]]
+with Anno("Wall time in seconds that the part took to run the hook"):
+    ADurationArray = Union[Array[float]]
+UHookNameArray = Union[AHookNameArray, Sequence[str]]
+UHookPartArray = Union[AHookPartArray, Sequence[str]]
+UDurationArray = Union[ADurationArray, Sequence[float]]
+
+
+class HookTimingTable(Table):
+    def __init__(
+        self, hook: UHookNameArray, part: UHookPartArray, duration: UDurationArray
+    ) -> None:
+        self.hook = AHookNameArray(hook)
+        self.part = AHookPartArray(part)
+        self.duration = ADurationArray(duration)
+
+
+# Upper edges in seconds of the bins of HookHistogramTable, with an extra bin
+# for anything slower than the last edge
+HOOK_HISTOGRAM_BINS = (0.01, 0.1, 1.0, 10.0)
+
+with Anno("Number of times the part has run the hook"):
+    ACountArray = Union[Array[int]]
+with Anno("Total wall time in seconds the part has spent running the hook"):
+    ATotalArray = Union[Array[float]]
+with Anno("Longest wall time in seconds the part has taken to run the hook"):
+    AMaximumArray = Union[Array[float]]
+with Anno("Number of runs that took less than 10ms"):
+    AUnder10msArray = Union[Array[int]]
+with Anno("Number of runs that took between 10ms and 100ms"):
+    AUnder100msArray = Union[Array[int]]
+with Anno("Number of runs that took between 100ms and 1s"):
+    AUnder1sArray = Union[Array[int]]
+with Anno("Number of runs that took between 1s and 10s"):
+    AUnder10sArray = Union[Array[int]]
+with Anno("Number of runs that took 10s or more"):
+    AOver10sArray = Union[Array[int]]
+UCountArray = Union[ACountArray, Sequence[int]]
+UTotalArray = Union[ATotalArray, Sequence[float]]
+UMaximumArray = Union[AMaximumArray, Sequence[float]]
+UUnder10msArray = Union[AUnder10msArray, Sequence[int]]
+UUnder100msArray = Union[AUnder100msArray, Sequence[int]]
+UUnder1sArray = Union[AUnder1sArray, Sequence[int]]
+UUnder10sArray = Union[AUnder10sArray, Sequence[int]]
+UOver10sArray = Union[AOver10sArray, Sequence[int]]
+
+
+class HookHistogramTable(Table):
+    def __init__(
+        self,
+        hook: UHookNameArray,
+        part: UHookPartArray,
+        count: UCountArray,
+        total: UTotalArray,
+        maximum: UMaximumArray,
+        under10ms: UUnder10msArray,
+        under100ms: UUnder100msArray,
+        under1s: UUnder1sArray,
+        under10s: UUnder10sArray,
+        over10s: UOver10sArray,
+    ) -> None:
+        self.hook = AHookNameArray(hook)
+        self.part = AHookPartArray(part)
+        self.count = ACountArray(count)
+        self.total = ATotalArray(total)
+        self.maximum = AMaximumArray(maximum)
+        self.under10ms = AUnder10msArray(under10ms)
+        self.under100ms = AUnder100msArray(under100ms)
+        self.under1s = AUnder1sArray(under1s)
+        self.under10s = AUnder10sArray(under10s)
+        self.over10s = AOver10sArray(over10s)
+
+
+with Anno("Name of the attribute that loading the design would change"):
+    AChangeNameArray = Union[Array[str]]
+with Anno("JSON encoded current value of the attribute"):
+    ACurrentValueArray = Union[Array[str]]
+with Anno("JSON encoded value that loading the design would set"):
+    ASavedValueArray = Union[Array[str]]
+UChangeNameArray = Union[AChangeNameArray, Sequence[str]]
+UCurrentValueArray = Union[ACurrentValueArray, Sequence[str]]
+USavedValueArray = Union[ASavedValueArray, Sequence[str]]
+
+
+class DesignChangeTable(Table):
+    def __init__(
+        self,
+        name: UChangeNameArray,
+        current: UCurrentValueArray,
+        saved: USavedValueArray,
+    ) -> None:
+        self.name = AChangeNameArray(name)
+        self.current = ACurrentValueArray(current)
+        self.saved = ASavedValueArray(saved)
+
+
+def config_value_changed(current: Any, saved: Any) -> bool:
+    """Whether a saved config value differs from the current value. Tables and
+    arrays are compared by their serialized form so they match the value that
+    was decoded from a saved design
+
+    Args:
+        current: The current value of the attribute
+        saved: The value from the design
+    """
+    if isinstance(current, SIMPLE_TYPES) and isinstance(saved, SIMPLE_TYPES):
+        return current != saved
+    return json_encode(current) != json_encode(saved)
+
+
 def wait_for_stateful_block_init(context, mri, timeout=DEFAULT_TIMEOUT):
     """Wait until a Block backed by a StatefulController has initialized
 
@@ -201,27 +318,52 @@ def no_save(*attribute_names):
     return decorator
 
 
-class SVGIcon:
-    """Helper object for working with SVG icons"""
+# {svg_text: parsed root element}, never modified, only ever copied
+_svg_templates: Dict[str, ET.Element] = {}
 
-    def __init__(self, svg_text: str) -> None:
+
+def _svg_template(svg_text: str) -> ET.Element:
+    try:
+        root = _svg_templates[svg_text]
+    except KeyError:
         # https://stackoverflow.com/a/8998773
         ET.register_namespace("", "http://www.w3.org/2000/svg")
-        self.root = ET.fromstring(svg_text)
+        root = _svg_templates[svg_text] = ET.fromstring(svg_text)
+    return root
+
+
+class SVGIcon:
+    """Helper object for working with SVG icons. The svg_text is only parsed
+    the first time it is seen, subsequent icons patch a copy of it"""
+
+    def __init__(self, svg_text: str) -> None:
+        self.root = copy.deepcopy(_svg_template(svg_text))
+        # {id: (parent, child)} for the first element with each id
+        self._elements: Dict[str, Tuple[ET.Element, ET.Element]] = {}
+        for parent in self.root.iter():
+            for child in parent:
+                id = child.get("id")
+                if id is not None and id not in self._elements:
+                    self._elements[id] = (parent, child)
 
     def find_parent_child(self, id):
-        child = None
         # Find the first parent which has a child with id i
-        parent = self.root.find(".//*[@id=%r]/.." % id)
-        # Find the child and remove it
-        if parent:
-            child = parent.find("./*[@id=%r]" % id)
-        return parent, child
+        return self._elements.get(id, (None, None))
 
     def remove_elements(self, ids: Iterable[str]) -> None:
         for i in ids:
-            parent, child = self.find_parent_child(i)
-            parent.remove(child)
+            self._remove(i)
+
+    def _remove(self, id: str) -> None:
+        parent, child = self._elements[id]
+        parent.remove(child)
+        # Forget the child and everything below it
+        for element in child.iter():
+            element_id = element.get("id")
+            if element_id in self._elements and (
+                self._elements[element_id][1] is element
+            ):
+                del self._elements[element_id]
 
     def add_text(
         self, text, x=0, y=0, anchor="left", transform=None, style="font: 10px sans"
@@ -239,7 +381,7 @@ class SVGIcon:
         if parent is not None:
             if "level" in edge:
                 # Remove it
-                parent.remove(child)
+                self._remove(id)
             elif "rising" in edge:
                 # Remove the falling marker
                 del child.attrib["marker-end"]
@@ -20,6 +20,7 @@ class CABooleanPart(Part):
         group: util.AGroup = None,
         config: util.AConfig = True,
         throw: util.AThrow = True,
+        rbv_wait: util.ARbvWait = 0.0,
     ) -> None:
         super().__init__(name)
         self.caa = util.CAAttribute(
@@ -35,6 +36,7 @@ class CABooleanPart(Part):
             group,
             config,
             throw=throw,
+            rbv_wait=rbv_wait,
         )
 
     def caput(self, value):
@@ -19,6 +19,7 @@ class CAChoicePart(Part):
         widget: util.AWidget = None,
         group: util.AGroup = None,
         config: util.AConfig = True,
+        rbv_wait: util.ARbvWait = 0.0,
     ) -> None:
         super().__init__(name)
         self.meta = ChoiceMeta(description)
@@ -35,6 +36,7 @@ class CAChoicePart(Part):
             group,
             config,
             self.on_connect,
+            rbv_wait=rbv_wait,
         )
 
     def on_connect(self, value):
@@ -21,6 +21,7 @@ class CADoublePart(Part):
         config: util.AConfig = True,
         display_from_pv: util.AGetLimits = True,
         throw: util.AThrow = True,
+        rbv_wait: util.ARbvWait = 0.0,
     ) -> None:
         super().__init__(name)
         self.display_from_pv = display_from_pv
@@ -38,6 +39,7 @@ class CADoublePart(Part):
             config,
             on_connect=self._update_display,
             throw=throw,
+            rbv_wait=rbv_wait,
         )
 
     def _update_display(self, connected_pv):
@@ -31,6 +31,7 @@ class CAStringPart(Part):
         port_badge_mri: AMri = None,
         port_badge_attr: ABadgeAttr = None,
         port_badge_display: ABadgeDisplay = None,
+        rbv_wait: util.ARbvWait = 0.0,
     ) -> None:
         super().__init__(name)
         port_badge = None
@@ -54,6 +55,7 @@ class CAStringPart(Part):
             config,
             throw=throw,
             port_badge=port_badge,
+            rbv_wait=rbv_wait,
         )
 
     def setup(self, registrar: PartRegistrar) -> None:
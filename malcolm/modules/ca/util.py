@@ -1,6 +1,19 @@
+import collections
 import time
-from typing import Any, Callable, Optional, Sequence, Type, Union
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
 
+import cothread
 from annotypes import Anno, Array
 
 from malcolm.core import (
@@ -12,6 +25,8 @@ from malcolm.core import (
     Hook,
     Loggable,
     PartRegistrar,
+    Queue,
+    TimeoutError,
     TimeStamp,
     VMeta,
     sleep,
@@ -60,6 +75,78 @@ with Anno("Get limits from PV (HOPR & LOPR)"):
     AGetLimits = bool
 with Anno("throw error if PV not found"):
     AThrow = bool
+with Anno(
+    "If >0, after a put wait up to this long for the rbv monitor to match the "
+    "demand rather than doing a caget of the rbv"
+):
+    ARbvWait = float
+
+
+class CAConnector(Loggable):
+    """Batches the initial FORMAT_CTRL cagets of CA attributes that reconnect
+    at the same time into one caget per datatype. All the CA parts of a Block
+    are reconnected in the same InitHook or ResetHook, so this turns dozens of
+    sequential connects into a single parallel one"""
+
+    def __init__(self) -> None:
+        self.set_logger()
+        # {datatype: [(pvs, result_queue)]}
+        self._pending: Dict[Any, List[Tuple[Sequence[str], Queue]]] = {}
+        # [(number of pvs, seconds taken)] of the most recent batched cagets,
+        # individual pvs in a batch aren't timed as they are all waited on
+        # together
+        self.batch_times: Deque[Tuple[int, float]] = collections.deque(maxlen=100)
+
+    def caget_ctrl(self, pvs: Sequence[str], datatype: Any, throw: bool) -> List:
+        """Caget pvs with FORMAT_CTRL along with any other pvs of the same
+        datatype that are requested before the caget is issued"""
+        result_queue = Queue()
+        requests = self._pending.setdefault(datatype, [])
+        requests.append((pvs, result_queue))
+        if len(requests) == 1:
+            # We are first, so let everyone else spawned by this hook add
+            # their pvs before we issue the caget for all of them
+            sleep(0)
+            self._caget_requests(self._pending.pop(datatype), datatype, throw)
+        result = result_queue.get()
+        if isinstance(result, Exception):
+            raise result
+        return assert_connected(result, throw)
+
+    def _caget_requests(
+        self,
+        requests: List[Tuple[Sequence[str], Queue]],
+        datatype: Any,
+        throw: bool,
+    ) -> None:
+        if len(requests) == 1:
+            # Nobody else joined, so do exactly what we were asked
+            all_pvs = requests[0][0]
+        else:
+            # Others joined, so don't let a bad pv fail anyone else's caget,
+            # each caller checks its own values in assert_connected
+            all_pvs = [pv for pvs, _ in requests for pv in pvs]
+            throw = False
+        start = time.time()
+        try:
+            values = catools.caget(
+                all_pvs, format=catools.FORMAT_CTRL, datatype=datatype, throw=throw
+            )
+        except Exception as e:
+            for _, result_queue in requests:
+                result_queue.put(e)
+            return
+        duration = time.time() - start
+        self.log.debug("Connected %d pvs in %ss", len(all_pvs), duration)
+        self.batch_times.append((len(all_pvs), duration))
+        i = 0
+        for pvs, result_queue in requests:
+            result_queue.put(values[i : i + len(pvs)])
+            i += len(pvs)
+
+
+# There is only one CA context per process, so one connector to batch it
+connector = CAConnector()
 
 
 class CABase(Loggable):
@@ -91,11 +178,17 @@ class CABase(Loggable):
         self.attr = meta.create_attribute_model()
         # Camonitor subscription
         self.monitor = None
-        self._update_after = 0
+        self._update_after = 0.0
         self._local_value: Optional[CATable] = None
         self._user_callback = callback
+        # Latest monitor value waiting for the end of the min_delta window
+        self._pending_value: Any = None
+        self._flush_timer: Any = None
+        # How many monitor updates were conflated away by min_delta
+        self.dropped_updates = 0
 
     def disconnect(self):
+        self._cancel_flush()
         if self.monitor is not None:
             if hasattr(self.monitor, "__len__"):
                 for monitor in self.monitor:
@@ -153,28 +246,43 @@ class CABase(Loggable):
         )
 
     def _monitor_callback(self, value, value_index=None):
-        now = time.time()
-        delta = now - self._update_after
         if value_index is not None and hasattr(self, "name_list"):
             value_key = self.name_list[value_index]
             self._local_value[value_key] = value
             self._local_value.raw_stamp = getattr(value, "raw_stamp", (None, None))
             self._local_value.ok = self._local_value.ok or value.ok
             self._local_value.severity = max(self._local_value.severity, value.severity)
-            self._update_value(self._local_value)
-        else:
+            value = self._local_value
+        now = time.time()
+        if now >= self._update_after or not value.ok:
+            # Outside the min_delta window, or a disconnect that should be
+            # shown straight away, so update now
+            self._cancel_flush()
             self._update_value(value)
-        # See how long to sleep for to make sure we don't get more than one
-        # update at < min_delta interval
-        if delta > self.min_delta:
-            # If we were more than min_delta late then reset next update time
             self._update_after = now + self.min_delta
-        elif delta < 0:
-            # If delta is less than zero sleep for a bit
-            sleep(-delta)
         else:
-            # If we were within the delta window just increment next update
-            self._update_after += self.min_delta
+            # Too soon after the last update, so hold onto the latest value
+            # and update with it at the end of the window. Don't sleep here
+            # as that would delay the callbacks of every other PV
+            if self._flush_timer is None:
+                self._flush_timer = cothread.Timer(
+                    self._update_after - now, self._flush_pending_value
+                )
+            else:
+                self.dropped_updates += 1
+            self._pending_value = value
+
+    def _flush_pending_value(self):
+        self._flush_timer = None
+        value, self._pending_value = self._pending_value, None
+        self._update_after = time.time() + self.min_delta
+        self._update_value(value)
+
+    def _cancel_flush(self):
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+            self._pending_value = None
 
 
 class CAAttribute(CABase):
@@ -195,6 +303,7 @@ class CAAttribute(CABase):
         throw: AThrow = True,
         callback: Callable[[Any], None] = None,
         port_badge: APortBadge = None,
+        rbv_wait: ARbvWait = 0.0,
     ) -> None:
         self.set_logger(pv=pv, rbv=rbv)
         writeable = bool(pv)
@@ -222,8 +331,40 @@ class CAAttribute(CABase):
                 rbv = pv
         self.pv = pv
         self.rbv = rbv
+        self.rbv_wait = rbv_wait
         # Camonitor subscription
         self.monitor = None
+        # Queues to signal when the monitor updates the attribute
+        self._rbv_waiters: List[Queue] = []
+
+    def _update_value(self, value):
+        super()._update_value(value)
+        for queue in self._rbv_waiters:
+            queue.put(None)
+
+    def _wait_for_rbv(self, demand: Any) -> bool:
+        """Wait up to rbv_wait for the monitor to make the attribute match
+        demand, returning whether it did"""
+        try:
+            expected = self.attr.meta.validate(demand)
+        except Exception:
+            # Can't compare it, so will have to caget
+            return False
+        deadline = time.time() + self.rbv_wait
+        queue = Queue()
+        self._rbv_waiters.append(queue)
+        try:
+            while builtin.util.config_value_changed(self.attr.value, expected):
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                try:
+                    queue.get(timeout=remaining)
+                except TimeoutError:
+                    return False
+            return True
+        finally:
+            self._rbv_waiters.remove(queue)
 
     def reconnect(self):
         # release old monitor
@@ -232,15 +373,7 @@ class CAAttribute(CABase):
         pvs = [self.rbv]
         if self.pv and self.pv != self.rbv:
             pvs.append(self.pv)
-        ca_values = assert_connected(
-            catools.caget(
-                pvs,
-                format=catools.FORMAT_CTRL,
-                datatype=self.datatype,
-                throw=self.throw,
-            ),
-            self.throw,
-        )
+        ca_values = connector.caget_ctrl(pvs, self.datatype, self.throw)
 
         if self.on_connect:
             self.on_connect(ca_values[0])
@@ -263,6 +396,11 @@ class CAAttribute(CABase):
         catools.caput(
             self.pv, value, wait=True, timeout=timeout, datatype=self.datatype
         )
+        if self.rbv_wait > 0 and self.monitor is not None:
+            # The monitor will update the attribute, so save a round trip
+            if self._wait_for_rbv(value):
+                return
+            self.log.debug("Rbv didn't match %s in %ss", value, self.rbv_wait)
         # now do a caget
         value = catools.caget(
             self.rbv,
@@ -334,15 +472,7 @@ class WaveformTableAttribute(CABase):
         # release old monitor
         self.disconnect()
         # make the connection in cothread's thread, use caget for initial
-        ca_values = assert_connected(
-            catools.caget(
-                self.pv_list,
-                format=catools.FORMAT_CTRL,
-                datatype=self.datatype,
-                throw=self.throw,
-            ),
-            self.throw,
-        )
+        ca_values = connector.caget_ctrl(self.pv_list, self.datatype, self.throw)
 
         for ind, value in enumerate(ca_values):
             if self.on_connect:
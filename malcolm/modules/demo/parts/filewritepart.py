@@ -1,5 +1,6 @@
 import os
 import time
+from typing import Optional
 
 import h5py
 import numpy as np
@@ -42,6 +43,7 @@ class FileWritePart(Part):
         # Configure args and progress info
         self._exposure = 0.0
         self._generator: scanning.hooks.AGenerator = None
+        self._points_cache: Optional[scanning.util.PointsCache] = None
         self._completed_steps = 0
         self._steps_to_do = 0
         # How much to offset uid value from generator point
@@ -73,12 +75,16 @@ class FileWritePart(Part):
         exposure: scanning.hooks.AExposure = 0.0,
         formatName: scanning.hooks.AFormatName = "det",
         fileTemplate: scanning.hooks.AFileTemplate = "%s.h5",
+        points_cache: Optional[scanning.hooks.APointsCache] = None,
     ) -> scanning.hooks.UInfos:
         """On `ConfigureHook` create HDF file with datasets"""
         # Store args
         self._completed_steps = completed_steps
         self._steps_to_do = steps_to_do
         self._generator = generator
+        self._points_cache = scanning.util.PointsCache.for_generator(
+            generator, points_cache
+        )
         self._uid_offset = 0
         self._exposure = exposure
         # Work out where to write the file
@@ -96,28 +102,33 @@ class FileWritePart(Part):
         """On `RunHook` record where to next take data"""
         # Start time so everything is relative
         end_of_exposure = time.time() + self._exposure
-        last_flush = end_of_exposure
         assert self.registrar, "Part has no registrar"
-        for i in range(
-            self._completed_steps, self._completed_steps + self._steps_to_do
-        ):
+        assert self._points_cache, "No generator"
+        start = self._completed_steps
+        points = self._points_cache.get_points(start, start + self._steps_to_do)
+        # Flush the datasets periodically while we wait for each exposure
+        timer = context.call_every(FLUSH_PERIOD, self._flush_datasets)
+        try:
+            self._write_points(context, points, start, end_of_exposure)
+        finally:
+            timer.cancel()
+        # Do one last flush and then we're done
+        self._flush_datasets()
+
+    def _write_points(self, context, points, start, end_of_exposure):
+        assert self.registrar, "Part has no registrar"
+        for i in range(start, start + self._steps_to_do):
             # Get the point we are meant to be scanning
-            point = self._generator.get_point(i)
+            point = points[i - start]
             # Simulate waiting for an exposure and writing the data
             wait_time = end_of_exposure - time.time()
             context.sleep(wait_time)
             self.log.debug(f"Writing data for point {i}")
             self._write_data(point, i)
-            # Flush the datasets if it is time to
-            if time.time() - last_flush > FLUSH_PERIOD:
-                last_flush = time.time()
-                self._flush_datasets()
             # Schedule the end of the next exposure
             end_of_exposure += point.duration
             # Update the point as being complete
             self.registrar.report(scanning.infos.RunProgressInfo(i + 1))
-        # Do one last flush and then we're done
-        self._flush_datasets()
 
     @add_call_types
     def on_seek(
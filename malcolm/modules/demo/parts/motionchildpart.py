@@ -33,6 +33,8 @@ class MotionChildPart(builtin.parts.ChildPart):
 
     # Generator instance
     _generator: scanning.hooks.AGenerator = None
+    # Cache of its points
+    _points_cache: Optional[scanning.util.PointsCache] = None
     # Where to start
     _completed_steps: int = 0
     # How many steps to do
@@ -73,17 +75,21 @@ class MotionChildPart(builtin.parts.ChildPart):
         generator: scanning.hooks.AGenerator,
         axesToMove: scanning.hooks.AAxesToMove,
         exceptionStep: AExceptionStep = 0,
+        points_cache: Optional[scanning.hooks.APointsCache] = None,
     ) -> None:
         child = context.block_view(self.mri)
         # Store the generator and place we need to start
         self._generator = generator
+        self._points_cache = scanning.util.PointsCache.for_generator(
+            generator, points_cache
+        )
         self._completed_steps = completed_steps
         self._steps_to_do = steps_to_do
         self._exception_step = exceptionStep
         self._axes_to_move = axesToMove
         self._movers = {axis: MaybeMover(child, axis) for axis in axesToMove}
         # Move to start (instantly)
-        first_point = generator.get_point(completed_steps)
+        first_point = self._points_cache.get_point(completed_steps)
         fs: List[Future] = []
         for axis, mover in self._movers.items():
             mover.maybe_move_async(fs, first_point.lower[axis])
@@ -93,11 +99,12 @@ class MotionChildPart(builtin.parts.ChildPart):
     def on_run(self, context: scanning.hooks.AContext) -> None:
         # Start time so everything is relative
         point_time = time.time()
-        for i in range(
-            self._completed_steps, self._completed_steps + self._steps_to_do
-        ):
+        assert self._points_cache, "No generator"
+        start = self._completed_steps
+        points = self._points_cache.get_points(start, start + self._steps_to_do)
+        for i in range(start, start + self._steps_to_do):
             # Get the point we are meant to be scanning
-            point = self._generator.get_point(i)
+            point = points[i - start]
             # Update when the next point is due and how long motor moves take
             point_time += point.duration
             move_duration = point_time - time.time()
@@ -135,9 +135,7 @@ class PandABlockController(builtin.controllers.BasicController):
                         field_part = self.field_parts[key]
                         if field_part:
                             d[key] = field_part.attr.value
-                icon = builtin.util.SVGIcon(self.icon_part.svg_text)
-                self.icon_part.update_icon(icon, d)
-                self.icon_part.attr.set_value(str(icon), ts=ts)
+                self.icon_part.attr.set_value(self.icon_part.render_icon(d), ts=ts)
 
     def _handle_mux_update(self, mux_meta, v):
         # Mux changed its value, update its link to a different
@@ -1,13 +1,21 @@
 import time
-from typing import Any, Dict, Sequence, Set, Tuple
+from typing import Any, Dict, Optional, Sequence, Set, Tuple
 
 from annotypes import Anno
 from cothread.cosocket import socket
 
-from malcolm.core import Display, NumberMeta, Queue, TimeoutError, TimeStamp, Widget
+from malcolm.core import (
+    Display,
+    NumberMeta,
+    Queue,
+    Spawned,
+    TimeoutError,
+    TimeStamp,
+    Widget,
+)
 from malcolm.modules import builtin
 
-from ..pandablocksclient import PandABlocksClient
+from ..pandablocksclient import BlockData, PandABlocksClient
 from ..parts.pandaactionpart import PandAActionPart
 from ..parts.pandabussespart import PandABussesPart
 from ..util import DOC_URL_BASE, ADocUrlBase
@@ -73,6 +81,8 @@ class PandAManagerController(builtin.controllers.ManagerController):
         # Filled in on reset
         self._stop_queue = None
         self._poll_spawned = None
+        # Checking the introspection we got from the process snapshot
+        self._reconcile_spawned: Optional[Spawned] = None
         # Poll period reporting
         self.last_poll_period = NumberMeta(
             "float64",
@@ -152,6 +162,10 @@ class PandAManagerController(builtin.controllers.ManagerController):
             self._stop_queue.put(None)
             self._poll_spawned.wait()
             self._poll_spawned = None
+        if self._reconcile_spawned:
+            # Let it finish while the client is still running
+            self._reconcile_spawned.wait()
+            self._reconcile_spawned = None
         if self._client.started:
             self._client.stop()
 
@@ -160,7 +174,7 @@ class PandAManagerController(builtin.controllers.ManagerController):
         controllers = []
         child_parts = []
         pos_names = []
-        blocks_data = self._client.get_blocks_data()
+        blocks_data, pcap_bit_fields = self._introspect()
         for block_rootname, block_data in blocks_data.items():
             block_names = []
             if block_data.number == 1:
@@ -189,7 +203,6 @@ class PandAManagerController(builtin.controllers.ManagerController):
             self.add_part(part)
 
         # Create the busses from their initial sets of values
-        pcap_bit_fields = self._client.get_pcap_bits_fields()
         self.busses.create_busses(pcap_bit_fields, pos_names)
         # Handle the pos_names that busses needs
         self._bus_fields = set(pos_names)
@@ -211,6 +224,56 @@ class PandAManagerController(builtin.controllers.ManagerController):
             "There are still bit_out changes %s" % self._bit_out_changes
         )
 
+    def _introspect(self) -> Tuple[Dict[str, BlockData], Dict[str, Sequence[str]]]:
+        """Get the blocks data and pcap bits fields of the PandA, from the
+        process snapshot if the PandA identifies itself as it did last time"""
+        assert self.process, "No process"
+        snapshot = self.process.snapshot
+        if not snapshot.path:
+            # No snapshot to compare against, so don't ask the PandA who it is
+            return self._live_introspection()
+        key = "%s:%s:%s" % (
+            type(self).__name__,
+            self._client.hostname,
+            self._client.port,
+        )
+        try:
+            stamp = self._client.get_idn()
+        except Exception as e:
+            self.log.warning("Can't get PandA identity, not using snapshot: %s", e)
+            return self._live_introspection()
+        introspection = snapshot.get(key, stamp)
+        if introspection is None:
+            introspection = self._live_introspection()
+            snapshot.put(key, stamp, introspection)
+        else:
+            # Check the snapshot against the PandA in the background
+            self._reconcile_spawned = self.process.spawn(
+                self._reconcile_introspection, key, stamp, introspection
+            )
+        return introspection
+
+    def _live_introspection(
+        self,
+    ) -> Tuple[Dict[str, BlockData], Dict[str, Sequence[str]]]:
+        return (
+            self._client.get_blocks_data(),
+            self._client.get_pcap_bits_fields(),
+        )
+
+    def _reconcile_introspection(self, key, stamp, introspection):
+        assert self.process, "No process"
+        try:
+            live = self._live_introspection()
+        except Exception as e:
+            self.log.warning("Can't check snapshot against PandA: %s", e)
+            return
+        if live != introspection:
+            self.log.warning(
+                "PandA blocks differ from the snapshot, restart to pick them up"
+            )
+            self.process.snapshot.put(key, stamp, live)
+
     def _make_busses(self) -> PandABussesPart:
         return PandABussesPart("busses", self._client)
 
@@ -180,6 +180,11 @@ class PandABlocksClient:
                 log.exception("Exception receiving message")
                 raise
 
+    def get_idn(self):
+        """Get the identity of the PandA, including its software and FPGA
+        versions"""
+        return strip_ok(self.send_recv("*IDN?\n"))
+
     def _get_block_numbers(self):
         block_numbers = OrderedDict()
         for line in self.send_recv("*BLOCKS?\n"):
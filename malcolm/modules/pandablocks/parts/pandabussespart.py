@@ -31,6 +31,23 @@ def update_column(
     return column_value
 
 
+def update_cell(
+    column_changes: Dict[str, List[Any]],
+    column: str,
+    table_value: Table,
+    index: int,
+    value: Any,
+) -> None:
+    # Only copy the column if the cell is actually changing, so a poll that
+    # reports unchanged values doesn't make a new table
+    try:
+        current = column_changes[column][index]
+    except KeyError:
+        current = getattr(table_value, column)[index]
+    if current != value:
+        update_column(column_changes, column, table_value)[index] = value
+
+
 def make_updated_table(old_value: Table, column_changes: Dict[str, List[Any]]) -> Table:
     # Create new table from the old and changes
     d = {k: column_changes.get(k, getattr(old_value, k)) for k in old_value}
@@ -199,7 +216,7 @@ class PandABussesPart(Part):
         assert self.bits, "No bits"
         if i is not None:
             # It's a bit, update the table changes
-            update_column(column_changes, "value", self.bits.value)[i] = value
+            update_cell(column_changes, "value", self.bits.value, i, value)
             return True
         return None
 
@@ -224,9 +241,9 @@ class PandABussesPart(Part):
                 else:
                     parsed_value = value
                 if self.positions:
-                    update_column(column_changes, column, self.positions.value)[
-                        i
-                    ] = parsed_value
+                    update_cell(
+                        column_changes, column, self.positions.value, i, parsed_value
+                    )
             # Grab scale and offset
             assert self.positions, "No positions"
             table_value = self.positions.value
@@ -234,8 +251,12 @@ class PandABussesPart(Part):
             offset = column_changes.get("offset", table_value.offset)[i]
 
             # It's a pos, update the value column with what we know
-            update_column(column_changes, "value", self.positions.value)[i] = (
-                self._pos_values[i] * scale + offset
+            update_cell(
+                column_changes,
+                "value",
+                self.positions.value,
+                i,
+                self._pos_values[i] * scale + offset,
             )
             return True
         return None
@@ -249,7 +270,7 @@ class PandABussesPart(Part):
         if indexes is not None:
             capture = value != "No"
             for i in indexes:
-                update_column(column_changes, "capture", self.bits.value)[i] = capture
+                update_cell(column_changes, "capture", self.bits.value, i, capture)
             return True
         return None
 
@@ -262,7 +283,8 @@ class PandABussesPart(Part):
                 or self._handle_pos(k, v, pos_column_changes)
                 or self._handle_pcap(k, v, bit_column_changes)
             ), ("Don't know how to handle %s" % k)
-        # Update the tables
+        # Update the tables, only making new Arrays for the columns that
+        # changed, the saving is in not copying the unchanged columns
         assert self.bits, "No bits"
         if bit_column_changes:
             new_value = make_updated_table(self.bits.value, bit_column_changes)
@@ -1,4 +1,4 @@
-from typing import Set
+from typing import Dict, Hashable, Set
 
 from malcolm.modules import builtin
 
@@ -6,6 +6,12 @@ from ..util import ABlockName, AClient
 
 ASvg = builtin.parts.ASvg
 
+# How many rendered icons to remember for each svg
+RENDERED_CACHE_SIZE = 256
+
+# {(icon_part_class, svg_text): {icon_key: svg_text}}
+_rendered_icons: Dict[Hashable, Dict[Hashable, str]] = {}
+
 
 class PandAIconPart(builtin.parts.IconPart):
     update_fields: Set = set()
@@ -17,3 +23,27 @@ class PandAIconPart(builtin.parts.IconPart):
 
     def update_icon(self, icon: builtin.util.SVGIcon, field_values: dict) -> None:
         """Update the icon using the given field values"""
+
+    def icon_key(self, field_values: dict) -> Hashable:
+        """Return a hashable key that captures everything update_icon uses"""
+        return tuple(sorted(field_values.items()))
+
+    def render_icon(self, field_values: dict) -> str:
+        """Return the svg text of the icon for the given field values,
+        reusing a previous render of the same icon state if there is one"""
+        # {icon_key: svg_text}, shared between all blocks with this svg
+        rendered: Dict[Hashable, str] = _rendered_icons.setdefault(
+            (type(self), self.svg_text), {}
+        )
+        key = self.icon_key(field_values)
+        try:
+            svg_text = rendered[key]
+        except KeyError:
+            icon = builtin.util.SVGIcon(self.svg_text)
+            self.update_icon(icon, field_values)
+            svg_text = str(icon)
+            if len(rendered) >= RENDERED_CACHE_SIZE:
+                # Dicts are ordered, so this drops the oldest render
+                del rendered[next(iter(rendered))]
+            rendered[key] = svg_text
+        return svg_text
@@ -82,9 +82,19 @@ def get_lut_icon_elements(fnum: int) -> Set[str]:
 class PandALutIconPart(PandAIconPart):
     update_fields = {"FUNC", "TYPEA", "TYPEB", "TYPEC", "TYPED", "TYPEE"}
 
+    def render_icon(self, field_values: dict) -> str:
+        # The icon depends on the raw function number, so fetch it once here
+        # so that it is part of the key for previously rendered icons
+        field_values = dict(field_values)
+        field_values["FUNC.RAW"] = self.client.get_field(self.block_name, "FUNC.RAW")
+        return super().render_icon(field_values)
+
     def update_icon(self, icon: builtin.util.SVGIcon, field_values: dict) -> None:
         """Update the icon using the given field values"""
-        fnum = int(self.client.get_field(self.block_name, "FUNC.RAW"), 0)
+        raw = field_values.get("FUNC.RAW", None)
+        if raw is None:
+            raw = self.client.get_field(self.block_name, "FUNC.RAW")
+        fnum = int(raw, 0)
         invis = get_lut_icon_elements(fnum)
         icon.remove_elements(invis)
         for inp in "ABCDE":
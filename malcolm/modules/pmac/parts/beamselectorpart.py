@@ -106,9 +106,9 @@ class BeamSelectorPart(PmacChildPart):
 
     def add_tail_off(self):
         # The current point
-        current_point = self.generator.get_point(self.steps_up_to - 1)
+        current_point = self.points_cache.get_point(self.steps_up_to - 1)
         # the next point is same as the previous
-        next_point = self.generator.get_point(self.steps_up_to - 2)
+        next_point = self.points_cache.get_point(self.steps_up_to - 2)
 
         # insert the turnaround points
         self.insert_gap(current_point, next_point, self.steps_up_to + 1)
@@ -1,6 +1,6 @@
 import re
 from enum import Enum
-from typing import Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 from annotypes import add_call_types
@@ -98,6 +98,10 @@ class PmacChildPart(builtin.parts.ChildPart):
         self.time_since_last_pvt = 0
         # Stored generator for positions
         self.generator: CompoundGenerator = None
+        self.points_cache: Optional[scanning.util.PointsCache] = None
+        # (key, state) of the profile calculated for the first run so rearm
+        # can reuse it if the key still matches
+        self.first_profile: Optional[Tuple[Tuple, Dict[str, Any]]] = None
 
     def setup(self, registrar: PartRegistrar) -> None:
         super().setup(registrar)
@@ -112,6 +116,7 @@ class PmacChildPart(builtin.parts.ChildPart):
             ),
             self.on_configure,
         )
+        registrar.hook(scanning.hooks.RearmHook, self.on_rearm)
         registrar.hook(scanning.hooks.RunHook, self.on_run)
         registrar.hook(
             (scanning.hooks.AbortHook, scanning.hooks.PauseHook), self.on_abort
@@ -184,7 +189,8 @@ class PmacChildPart(builtin.parts.ChildPart):
         assert match, "Cannot extract CS number from CS port '%s'" % cs_port
         move_async = child["moveCS%s_async" % match.group()]
         # Set all the axes to move to the start positions
-        first_point = self.generator.get_point(completed_steps)
+        assert self.points_cache, "No points cache"
+        first_point = self.points_cache.get_point(completed_steps)
         args = {}
         move_to_start_time = 0.0
         for axis_name, velocity in point_velocities(
@@ -219,6 +225,79 @@ class PmacChildPart(builtin.parts.ChildPart):
         part_info: scanning.hooks.APartInfo,
         generator: scanning.hooks.AGenerator,
         axesToMove: scanning.hooks.AAxesToMove,
+        points_cache: Optional[scanning.hooks.APointsCache] = None,
+    ) -> None:
+        self.do_configure(
+            context,
+            completed_steps,
+            steps_to_do,
+            part_info,
+            generator,
+            axesToMove,
+            points_cache=points_cache,
+        )
+
+    # Allow CamelCase as arguments will be serialized
+    # noinspection PyPep8Naming
+    @add_call_types
+    def on_rearm(
+        self,
+        context: scanning.hooks.AContext,
+        completed_steps: scanning.hooks.ACompletedSteps,
+        steps_to_do: scanning.hooks.AStepsToDo,
+        part_info: scanning.hooks.APartInfo,
+        generator: scanning.hooks.AGenerator,
+        axesToMove: scanning.hooks.AAxesToMove,
+        points_cache: Optional[scanning.hooks.APointsCache] = None,
+    ) -> None:
+        self.do_configure(
+            context,
+            completed_steps,
+            steps_to_do,
+            part_info,
+            generator,
+            axesToMove,
+            reuse_profile=True,
+            points_cache=points_cache,
+        )
+
+    def profile_key(self, completed_steps: int) -> Tuple:
+        """Everything that the profile calculated from completed_steps depends
+        on, apart from the current motor positions"""
+        motor_params = tuple(
+            (
+                name,
+                info.cs_axis,
+                info.cs_port,
+                info.acceleration,
+                info.resolution,
+                info.offset,
+                info.max_velocity,
+                info.velocity_settle,
+            )
+            for name, info in sorted(self.axis_mapping.items())
+        )
+        return (
+            self.generator,
+            completed_steps,
+            self.steps_up_to,
+            self.output_triggers,
+            self.min_turnaround,
+            self.min_interval,
+            motor_params,
+        )
+
+    # noinspection PyPep8Naming
+    def do_configure(
+        self,
+        context: scanning.hooks.AContext,
+        completed_steps: int,
+        steps_to_do: int,
+        part_info: scanning.hooks.APartInfo,
+        generator: CompoundGenerator,
+        axesToMove: scanning.hooks.AAxesToMove,
+        reuse_profile: bool = False,
+        points_cache: Optional[scanning.util.PointsCache] = None,
     ) -> None:
         context.unsubscribe_all()
         child = context.block_view(self.mri)
@@ -232,9 +311,13 @@ class PmacChildPart(builtin.parts.ChildPart):
         if motion_axes or need_gpio:
             # Taking part, so store generator
             self.generator = generator
+            self.points_cache = scanning.util.PointsCache.for_generator(
+                generator, points_cache
+            )
         else:
             # Flag as not taking part
             self.generator = None
+            self.points_cache = None
             return
 
         # See if there is a minimum turnaround
@@ -286,23 +369,46 @@ class PmacChildPart(builtin.parts.ChildPart):
             fs = self.move_to_start(child, cs_port, completed_steps)
         else:
             fs = []
-        # Set how far we should be going and the completed steps lookup
+        # Set how far we should be going
         self.steps_up_to = completed_steps + steps_to_do
-        self.completed_steps_lookup = []
-        # Reset the profiles that still need to be sent
-        self.profile = dict(
-            timeArray=[],
-            velocityMode=[],
-            userPrograms=[],
-        )
-        self.time_since_last_pvt = 0
-        for info in self.axis_mapping.values():
-            self.profile[info.cs_axis.lower()] = []
-        self.calculate_generator_profile(completed_steps, do_run_up=True)
+        key = self.profile_key(completed_steps)
+        if reuse_profile and self.first_profile and self.first_profile[0] == key:
+            # Nothing has changed since we calculated it, so reuse it
+            self.restore_profile_state(self.first_profile[1])
+        else:
+            # Reset the completed steps lookup and the profiles that still
+            # need to be sent
+            self.completed_steps_lookup = []
+            self.profile = dict(
+                timeArray=[],
+                velocityMode=[],
+                userPrograms=[],
+            )
+            self.time_since_last_pvt = 0
+            for info in self.axis_mapping.values():
+                self.profile[info.cs_axis.lower()] = []
+            self.calculate_generator_profile(completed_steps, do_run_up=True)
+            if completed_steps == 0:
+                self.first_profile = (key, self.profile_state())
         self.write_profile_points(child, cs_port)
         # Wait for the motors to have got to the start
         context.wait_all_futures(fs)
 
+    def profile_state(self) -> Dict[str, Any]:
+        """Copy of everything calculate_generator_profile has produced"""
+        return dict(
+            profile={k: list(v) for k, v in self.profile.items()},
+            completed_steps_lookup=list(self.completed_steps_lookup),
+            end_index=self.end_index,
+            time_since_last_pvt=self.time_since_last_pvt,
+        )
+
+    def restore_profile_state(self, state: Dict[str, Any]) -> None:
+        self.profile = {k: list(v) for k, v in state["profile"].items()}
+        self.completed_steps_lookup = list(state["completed_steps_lookup"])
+        self.end_index = state["end_index"]
+        self.time_since_last_pvt = state["time_since_last_pvt"]
+
     @add_call_types
     def on_run(self, context: scanning.hooks.AContext) -> None:
         if self.generator:
@@ -641,9 +747,9 @@ class PmacChildPart(builtin.parts.ChildPart):
             return None, None, None
         if self.steps_up_to - start_index > BATCH_POINTS:
             up_to = BATCH_POINTS + start_index + 1
-            points = self.generator.get_points(start_index, up_to)
+            points = self.points_cache.get_points(start_index, up_to)
         else:
-            points = self.generator.get_points(start_index, self.steps_up_to)
+            points = self.points_cache.get_points(start_index, self.steps_up_to)
 
         velocities = all_points_same_velocities(points)
         joined = all_points_joined(points)
@@ -654,7 +760,7 @@ class PmacChildPart(builtin.parts.ChildPart):
         # If we are doing the first build, do_run_up will be passed to flag
         # that we need a run up, else just continue from the previous point
         if do_run_up:
-            point = self.generator.get_point(start_index)
+            point = self.points_cache.get_point(start_index)
 
             # Calculate how long to leave for the run-up (at least MIN_TIME)
             run_up_time = self.min_interval
@@ -722,7 +828,7 @@ class PmacChildPart(builtin.parts.ChildPart):
 
     def add_tail_off(self):
         # Add the last tail off point
-        point = self.generator.get_point(self.steps_up_to - 1)
+        point = self.points_cache.get_point(self.steps_up_to - 1)
         # Calculate how long to leave for the tail-off
         # #(at least MIN_TIME)
         axis_points = {}
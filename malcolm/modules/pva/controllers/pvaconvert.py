@@ -110,6 +110,11 @@ def convert_from_type_spec(spec: str, val: Any) -> Any:
     #    # This currently fails because Array[np.float64] != Array[float]
     #    typ = specifier_types[spec[1]]
     #    return Array[typ](val)
+    elif val is None and spec[0] == "a":
+        # p4p can give None rather than an empty array when merging updates
+        if spec == "as":
+            return []
+        return np.array([], dtype=specifier_types[spec[1]])
     else:
         # Primitive
         return val
@@ -1,6 +1,14 @@
-from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type
-
-from annotypes import Anno, add_call_types, deserialize_object
+import inspect
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Type
+
+from annotypes import (
+    Anno,
+    add_call_types,
+    deserialize_object,
+    json_encode,
+    serialize_object,
+)
 from scanpointgenerator import CompoundGenerator
 
 from malcolm.compat import OrderedDict
@@ -9,11 +17,14 @@ from malcolm.core import (
     AbortedError,
     AMri,
     Context,
+    Info,
     NumberMeta,
     Part,
     Queue,
+    Spawned,
     TimeoutError,
     Widget,
+    sleep,
 )
 from malcolm.core.models import MethodMeta, TableMeta, VMeta
 from malcolm.modules import builtin
@@ -28,21 +39,35 @@ from ..hooks import (
     PostConfigureHook,
     PostRunArmedHook,
     PostRunReadyHook,
+    PrecomputeHook,
     PreConfigureHook,
     PreRunHook,
+    RearmHook,
     ReportStatusHook,
     RunHook,
     SeekHook,
     ValidateHook,
 )
 from ..infos import ConfigureParamsInfo, ParameterTweakInfo, RunProgressInfo
-from ..util import AGenerator, ConfigureParams, RunnableStates
+from ..util import (
+    AGenerator,
+    ConfigureParams,
+    PartProgressTable,
+    PointsCache,
+    ProgressTracker,
+    RunnableStates,
+)
 
 PartContextParams = Iterable[Tuple[Part, Context, Dict[str, Any]]]
 PartConfigureParams = Dict[Part, ConfigureParamsInfo]
 
 ss = RunnableStates
 
+# How many distinct sets of validated parameters to remember
+VALIDATE_CACHE_SIZE = 8
+# How many prepared generators to keep for configure() to reuse
+PREPARED_GENERATOR_CACHE_SIZE = 4
+
 with Anno("The validated configure parameters"):
     AConfigureParams = ConfigureParams
 with Anno("Step to mark as the last completed step, -1 for current"):
@@ -119,11 +144,22 @@ def update_configure_model(
     configure_model.set_defaults(defaults)
 
 
+def _info_args(info: Info) -> List[Any]:
+    # The class name followed by the arguments the Info was made with. Raises
+    # AttributeError if they are not stored under the same names
+    spec = inspect.getfullargspec(type(info).__init__)
+    return [type(info).__name__] + [getattr(info, x) for x in spec.args[1:]]
+
+
 class RunnableController(builtin.controllers.ManagerController):
     """RunnableDevice implementer that also exposes GUI for child parts"""
 
     # The state_set that this controller implements
     state_set = ss()
+    # Minimum time in seconds between completedSteps updates during a run
+    progress_interval = 0.1
+    # Maximum number of generator points kept in the cache shared by parts
+    points_cache_size = 100000
 
     def __init__(
         self,
@@ -148,8 +184,11 @@ class RunnableController(builtin.controllers.ManagerController):
         self.part_configure_params: PartConfigureParams = {}
         # Params passed to configure()
         self.configure_params: Optional[ConfigureParams] = None
-        # Progress reporting dict of completed_steps for each part
-        self.progress_updates: Optional[Dict[Part, int]] = None
+        # Progress reporting of completed_steps for each part
+        self.progress_tracker = ProgressTracker()
+        # When we last published progress, and any pending deferred publish
+        self._progress_published = 0.0
+        self._progress_flush: Optional[Spawned] = None
         # Queue so that do_run can wait to see why it was aborted and resume if
         # needed
         self.resume_queue: Optional[Queue] = None
@@ -163,6 +202,18 @@ class RunnableController(builtin.controllers.ManagerController):
         self.breakpoint_index: int = 0
         # Queue so we can wait for aborts to complete
         self.abort_queue: Optional[Queue] = None
+        # {serialized params and part status: [(parameter, serialized tweak)]}
+        # for the most recent successful validates
+        self._validate_cache: "OrderedDict[str, List[Tuple[str, Any]]]" = OrderedDict()
+        # (iteration, part name, parameter, serialized value) for each tweak
+        # made in the last validate that had to consult the parts
+        self.validate_history: List[Tuple[int, str, str, Any]] = []
+        # Windows of points from the configured generator shared between parts
+        self.points_cache: Optional[PointsCache] = None
+        # {serialized generator: prepared generator} for the most recently
+        # prepared generators, so precompute() doesn't replace the one that is
+        # currently configured
+        self._prepared_generators: "OrderedDict[str, CompoundGenerator]" = OrderedDict()
         # Create sometimes writeable attribute for the current completed scan
         # step
         self.completed_steps = NumberMeta(
@@ -188,8 +239,20 @@ class RunnableController(builtin.controllers.ManagerController):
             "int32", "Readback of number of scan steps", tags=[Widget.TEXTUPDATE.tag()]
         ).create_attribute_model(0)
         self.field_registry.add_attribute_model("totalSteps", self.total_steps)
+        # Create read-only attribute for the progress of each part
+        self.part_progress = TableMeta.from_table(
+            PartProgressTable,
+            "Number of steps each part has reported as complete",
+        ).create_attribute_model()
+        self.field_registry.add_attribute_model("partProgress", self.part_progress)
         # Create the method models
         self.field_registry.add_method_model(self.validate)
+        self.set_writeable_in(
+            self.field_registry.add_method_model(self.precompute),
+            ss.READY,
+            ss.ARMED,
+            ss.FINISHED,
+        )
         self.set_writeable_in(
             self.field_registry.add_method_model(self.configure), ss.READY, ss.FINISHED
         )
@@ -216,6 +279,9 @@ class RunnableController(builtin.controllers.ManagerController):
         self.set_writeable_in(
             self.field_registry.add_method_model(self.resume), ss.PAUSED
         )
+        self.set_writeable_in(
+            self.field_registry.add_method_model(self.rearm), ss.FINISHED
+        )
         # Override reset to work from aborted too
         self.set_writeable_in(
             self.field_registry.get_field("reset"),
@@ -292,16 +358,25 @@ class RunnableController(builtin.controllers.ManagerController):
 
     def do_reset(self):
         super().do_reset()
+        self.points_cache = None
         self.configured_steps.set_value(0)
         self.completed_steps.set_value(0)
         self.total_steps.set_value(0)
         self.breakpoint_index = 0
 
+    def update_modified(
+        self, part: Part = None, info: builtin.infos.PartModifiedInfo = None
+    ) -> None:
+        # A child or our layout has changed, so parts may validate differently
+        self._validate_cache.clear()
+        super().update_modified(part, info)
+
     def update_configure_params(
         self, part: Part = None, info: ConfigureParamsInfo = None
     ) -> None:
         """Tell controller part needs different things passed to Configure"""
         with self.changes_squashed:
+            self._validate_cache.clear()
             # Update the dict
             if part:
                 assert info, "No info for part"
@@ -319,19 +394,21 @@ class RunnableController(builtin.controllers.ManagerController):
                     part_configure_infos.append(info)
 
             # Update methods from the updated configure model
-            for method_name in ("configure", "validate"):
+            for method_name in ("configure", "validate", "precompute", "rearm"):
                 # Get the model of our configure method as the starting point
                 method_meta = MethodMeta.from_callable(self.configure)
                 # Update the configure model from the infos
                 update_configure_model(method_meta, part_configure_infos)
                 # Put the created metas onto our block meta
                 method = self._block[method_name]
-                method.meta.takes.set_elements(method_meta.takes.elements)
-                method.meta.takes.set_required(method_meta.takes.required)
+                if method_name != "rearm":
+                    # Rearm takes nothing, but returns what configure returns
+                    method.meta.takes.set_elements(method_meta.takes.elements)
+                    method.meta.takes.set_required(method_meta.takes.required)
+                    method.meta.set_defaults(method_meta.defaults)
+                    method.set_took()
                 method.meta.returns.set_elements(method_meta.returns.elements)
                 method.meta.returns.set_required(method_meta.returns.required)
-                method.meta.set_defaults(method_meta.defaults)
-                method.set_took()
                 method.set_returned()
 
     def update_block_endpoints(self):
@@ -378,28 +455,177 @@ class RunnableController(builtin.controllers.ManagerController):
         status_part_info = self.run_hooks(
             ReportStatusHook(p, c) for p, c in part_contexts.items()
         )
-        while iterations > 0:
+        # If we have validated these params against this status before then
+        # just apply the same tweaks again
+        cache_key = self._validate_cache_key(params, part_contexts, status_part_info)
+        if cache_key is None:
+            cached_tweaks = None
+        else:
+            cached_tweaks = self._validate_cache.get(cache_key, None)
+        if cached_tweaks is not None:
+            self._validate_cache.move_to_end(cache_key)
+            for parameter, value in cached_tweaks:
+                deserialized = self._block.configure.meta.takes.elements[
+                    parameter
+                ].validate(value)
+                setattr(params, parameter, deserialized)
+            self.log.debug("Reusing %d cached tweaks", len(cached_tweaks))
+            return params
+        applied_tweaks: List[Tuple[str, Any]] = []
+        self.validate_history = []
+        # Every part validates the first time round
+        validate_contexts = part_contexts
+        for iteration in range(1, iterations + 1):
             # Try up to 10 times to get a valid set of parameters
-            iterations -= 1
-            # Validate the params with all the parts
             validate_part_info = self.run_hooks(
                 ValidateHook(p, c, status_part_info, **kwargs)
-                for p, c, kwargs in self._part_params(part_contexts, params)
-            )
-            tweaks: List[ParameterTweakInfo] = ParameterTweakInfo.filter_values(
-                validate_part_info
+                for p, c, kwargs in self._part_params(validate_contexts, params)
             )
-            if tweaks:
+            part_tweaks: Dict[
+                str, List[ParameterTweakInfo]
+            ] = ParameterTweakInfo.filter_parts(validate_part_info)
+            changed = set()
+            for part_name, tweaks in part_tweaks.items():
                 for tweak in tweaks:
                     deserialized = self._block.configure.meta.takes.elements[
                         tweak.parameter
                     ].validate(tweak.value)
+                    # Store serialized so callers can't modify the cached value
+                    serialized = serialize_object(deserialized)
+                    if json_encode(serialized) != json_encode(
+                        getattr(params, tweak.parameter, None)
+                    ):
+                        changed.add(tweak.parameter)
                     setattr(params, tweak.parameter, deserialized)
-                    self.log.debug("Tweaking {tweak.parameter} to {deserialized}")
-            else:
-                # Consistent set, just return the params
+                    applied_tweaks.append((tweak.parameter, serialized))
+                    self.validate_history.append(
+                        (iteration, part_name, tweak.parameter, serialized)
+                    )
+                    self.log.debug(
+                        "%s tweaked %s to %s", part_name, tweak.parameter, deserialized
+                    )
+            # Only the parts that take a changed parameter need to validate again
+            validate_contexts = {
+                p: c
+                for p, c in part_contexts.items()
+                if changed.intersection(self._validate_inputs(p, params))
+            }
+            if not validate_contexts:
+                # Consistent set, remember the tweaks and return the params
+                if cache_key is not None:
+                    self._validate_cache[cache_key] = applied_tweaks
+                    while len(self._validate_cache) > VALIDATE_CACHE_SIZE:
+                        self._validate_cache.popitem(last=False)
                 return params
-        raise ValueError("Could not get a consistent set of parameters")
+        # Report the parts that were still tweaking at the end, looking at two
+        # iterations so we catch pairs of parts undoing each other's tweaks
+        last_tweaks = OrderedDict(
+            (f"{part_name} ({parameter})", True)
+            for i, part_name, parameter, _ in self.validate_history
+            if i >= iterations - 1
+        )
+        raise ValueError(
+            "Could not get a consistent set of parameters after "
+            f"{iterations} iterations, still being tweaked by " + ", ".join(last_tweaks)
+        )
+
+    def _validate_inputs(self, part: Part, params: ConfigureParams) -> Set[str]:
+        # The configure parameters that this part's ValidateHook function takes
+        try:
+            _, args_gen = (part.hooked or {})[ValidateHook]
+        except KeyError:
+            return set()
+        supplied = list(ValidateHook.call_types) + list(params.call_types)
+        return set(args_gen(supplied))
+
+    # This will be serialized, so maintain camelCase for axesToMove
+    # noinspection PyPep8Naming
+    @add_call_types
+    def precompute(
+        self,
+        generator: AGenerator,
+        axesToMove: AAxesToMove = None,
+        breakpoints: ABreakpoints = None,
+        **kwargs: Any,
+    ) -> AConfigureParams:
+        """Validate the parameters of a scan that will be configured later, and
+        calculate as much as possible in advance so that configure() is quicker.
+
+        Can be run while another scan is armed, so the next scan can be
+        precomputed before this one starts
+        """
+        params = self.validate(generator, axesToMove, breakpoints, **kwargs)
+        # configure() will reuse this if given an identical generator
+        self._prepare_generator(params)
+        part_contexts = self.create_part_contexts()
+        # Get any status from all parts
+        part_info = self.run_hooks(
+            ReportStatusHook(p, c) for p, c in part_contexts.items()
+        )
+        self.run_hooks(
+            PrecomputeHook(p, c, part_info, **kw)
+            for p, c, kw in self._part_params(part_contexts, params)
+        )
+        return params
+
+    def _validate_cache_key(
+        self,
+        params: ConfigureParams,
+        part_contexts: Dict[Part, Context],
+        status_part_info: Dict[str, List[Info]],
+    ) -> Optional[str]:
+        our_values = {k: v.value for k, v in self.our_config_attributes.items()}
+        # ValidateHooks may look at the live state of our children, so any
+        # change to a child Attribute needs to give a different key
+        child_changes = self._child_value_changes(part_contexts)
+        try:
+            # Info objects are not serializable, so serialize the arguments
+            # they were made with instead
+            status = [
+                (part_name, [_info_args(info) for info in infos or []])
+                for part_name, infos in status_part_info.items()
+            ]
+            return json_encode(
+                [
+                    params,
+                    [p.name for p in part_contexts],
+                    our_values,
+                    child_changes,
+                    status,
+                ]
+            )
+        except (AttributeError, TypeError, ValueError):
+            # Something in the status isn't serializable so we can't tell if it
+            # has changed, don't cache
+            return None
+
+    def _child_value_changes(
+        self, part_contexts: Dict[Part, Context]
+    ) -> List[Tuple[str, int]]:
+        assert self.process, "No process"
+        mri_list = self.process.mri_list
+        child_changes = []
+        for part in part_contexts:
+            mri = getattr(part, "mri", None)
+            if mri in mri_list:
+                controller = self.process.get_controller(mri)
+                child_changes.append((mri, controller.value_changes))
+        return child_changes
+
+    def _prepare_generator(self, params: ConfigureParams) -> None:
+        # Preparing a large generator is expensive, so if we are asked to
+        # prepare one identical to one we prepared recently then reuse it
+        serialized = json_encode(params.generator)
+        prepared = self._prepared_generators.get(serialized, None)
+        # Check it hasn't been modified since we prepared it
+        if prepared is not None and json_encode(prepared) == serialized:
+            params.generator = prepared
+        else:
+            params.generator.prepare()
+        self._prepared_generators[serialized] = params.generator
+        self._prepared_generators.move_to_end(serialized)
+        while len(self._prepared_generators) > PREPARED_GENERATOR_CACHE_SIZE:
+            self._prepared_generators.popitem(last=False)
 
     def abortable_transition(self, state):
         with self._lock:
@@ -467,7 +693,8 @@ class RunnableController(builtin.controllers.ManagerController):
         self.run_hooks(PreConfigureHook(p, c) for p, c in self.part_contexts.items())
         # This will calculate what we need from the generator, possibly a long
         # call
-        params.generator.prepare()
+        self._prepare_generator(params)
+        self.points_cache = PointsCache(params.generator, self.points_cache_size)
         # Set the steps attributes that we will do across many run() calls
         self.total_steps.set_value(params.generator.size)
         self.completed_steps.set_value(0)
@@ -487,7 +714,15 @@ class RunnableController(builtin.controllers.ManagerController):
         self.breakpoint_index = 0
         steps_to_do = self.steps_per_run[self.breakpoint_index]
         part_info = self.run_hooks(
-            ConfigureHook(p, c, completed_steps, steps_to_do, part_info, **kw)
+            ConfigureHook(
+                p,
+                c,
+                completed_steps,
+                steps_to_do,
+                part_info,
+                points_cache=self.points_cache,
+                **kw,
+            )
             for p, c, kw in self._part_params()
         )
         # Take configuration info and reflect it as attribute updates
@@ -498,7 +733,89 @@ class RunnableController(builtin.controllers.ManagerController):
         self.configured_steps.set_value(steps_to_do)
         self.completed_steps.meta.display.set_limitHigh(params.generator.size)
         # Reset the progress of all child parts
-        self.progress_updates = {}
+        self.reset_progress()
+        self.resume_queue = Queue()
+
+    @add_call_types
+    def rearm(self) -> AConfigureParams:
+        """Get ready to run the last configured scan again from the start.
+
+        This is quicker than configure() with the same parameters as parts
+        can reuse what they calculated last time. Parts that write files must
+        not overwrite the files of the previous run, so HDFWriterPart appends
+        a number to the file name for each rearm.
+
+        Normally it will return in Armed state. If the user aborts then it will
+        return in Aborted state. If something goes wrong it will return in Fault
+        state. If the user disables then it will return in Disabled state.
+        """
+        try:
+            self.transition(ss.CONFIGURING)
+            self.do_rearm()
+            self.abortable_transition(ss.ARMED)
+        except AbortedError:
+            assert self.abort_queue, "No abort queue"
+            self.abort_queue.put(None)
+            raise
+        except Exception as e:
+            self.go_to_error_state(e)
+            raise
+        else:
+            assert self.configure_params, "No configure params"
+            return self.configure_params
+
+    def do_rearm(self) -> None:
+        assert self.configure_params, "Cannot rearm before configure"
+        # Parts that can't rearm will be reset and configured again
+        part_contexts = self.create_part_contexts()
+        configure_parts = {
+            p for p in part_contexts if RearmHook not in (p.hooked or {})
+        }
+        self.run_hooks(
+            builtin.hooks.ResetHook(p, c)
+            for p, c in part_contexts.items()
+            if p in configure_parts
+        )
+        # Clear out any old part contexts now rather than letting gc do it
+        for context in self.part_contexts.values():
+            context.unsubscribe_all()
+        self.part_contexts = self.create_part_contexts()
+        assert self.process, "No attached process"
+        self.part_contexts[self] = Context(self.process)
+        # Parts that will be configured again need to get into the right state
+        # to configure, just as they do in do_configure()
+        self.run_hooks(
+            PreConfigureHook(p, c)
+            for p, c in self.part_contexts.items()
+            if p in configure_parts
+        )
+        # The generator was prepared and steps_per_run calculated by configure
+        self.completed_steps.set_value(0)
+        self.configured_steps.set_value(0)
+        part_info = self.run_hooks(
+            ReportStatusHook(p, c) for p, c in self.part_contexts.items()
+        )
+        completed_steps = 0
+        self.breakpoint_index = 0
+        steps_to_do = self.steps_per_run[self.breakpoint_index]
+        part_info = self.run_hooks(
+            (ConfigureHook if p in configure_parts else RearmHook)(
+                p,
+                c,
+                completed_steps,
+                steps_to_do,
+                part_info,
+                points_cache=self.points_cache,
+                **kw,
+            )
+            for p, c, kw in self._part_params()
+        )
+        self.run_hooks(
+            PostConfigureHook(p, c, part_info) for p, c in self.part_contexts.items()
+        )
+        self.configured_steps.set_value(steps_to_do)
+        # Reset the progress of all child parts
+        self.reset_progress()
         self.resume_queue = Queue()
 
     @add_call_types
@@ -553,6 +870,8 @@ class RunnableController(builtin.controllers.ManagerController):
 
     def do_run(self, hook: Type[ControllerHook]) -> None:
         self.run_hooks(hook(p, c) for p, c in self.part_contexts.items())
+        # Catch up with any progress that was held back
+        self.publish_progress()
         self.abortable_transition(ss.POSTRUN)
         completed_steps = self.configured_steps.value
         if completed_steps < self.total_steps.value:
@@ -565,7 +884,13 @@ class RunnableController(builtin.controllers.ManagerController):
             self.completed_steps.set_value(completed_steps)
             self.run_hooks(
                 PostRunArmedHook(
-                    p, c, completed_steps, steps_to_do, part_info, **kwargs
+                    p,
+                    c,
+                    completed_steps,
+                    steps_to_do,
+                    part_info,
+                    points_cache=self.points_cache,
+                    **kwargs,
                 )
                 for p, c, kwargs in self._part_params()
             )
@@ -576,16 +901,40 @@ class RunnableController(builtin.controllers.ManagerController):
                 PostRunReadyHook(p, c) for p, c in self.part_contexts.items()
             )
 
+    def reset_progress(self) -> None:
+        with self._lock:
+            self.progress_tracker.reset()
+            self.part_progress.set_value(self.progress_tracker.table())
+
     def update_completed_steps(
         self, part: Part, completed_steps: RunProgressInfo
     ) -> None:
+        # Only take the lock to publish, at most once every progress_interval
+        self.progress_tracker.update(part.name, completed_steps.steps)
+        delay = self._progress_published + self.progress_interval - time.time()
+        if delay <= 0:
+            self.publish_progress()
+        elif self._progress_flush is None:
+            # Make sure the last report in a burst is published
+            assert self.process, "No process"
+            self._progress_flush = self.process.spawn(
+                self._publish_progress_after, delay
+            )
+
+    def _publish_progress_after(self, delay: float) -> None:
+        sleep(delay)
+        self._progress_flush = None
+        self.publish_progress()
+
+    def publish_progress(self) -> None:
+        """Publish the progress reported by parts since the last publish"""
         with self._lock:
-            # Update
-            assert self.progress_updates is not None, "No progress updates"
-            self.progress_updates[part] = completed_steps.steps
-            min_completed_steps = min(self.progress_updates.values())
-            if min_completed_steps > self.completed_steps.value:
-                self.completed_steps.set_value(min_completed_steps)
+            self._progress_published = time.time()
+            minimum = self.progress_tracker.minimum
+            with self.changes_squashed:
+                if minimum is not None and minimum > self.completed_steps.value:
+                    self.completed_steps.set_value(minimum)
+                self.part_progress.set_value(self.progress_tracker.table())
 
     @add_call_types
     def abort(self) -> None:
@@ -665,6 +1014,7 @@ class RunnableController(builtin.controllers.ManagerController):
                 return
             # Otherwise set to number of completed steps
             else:
+                self.publish_progress()
                 lastGoodStep = self.completed_steps.value
         # Otherwise make sure we are bound to the total steps of the scan
         elif lastGoodStep >= total_steps:
@@ -701,9 +1051,19 @@ class RunnableController(builtin.controllers.ManagerController):
         part_info = self.run_hooks(
             ReportStatusHook(p, c) for p, c in self.part_contexts.items()
         )
+        # Parts will report their progress again from the new position
+        self.reset_progress()
         self.completed_steps.set_value(completed_steps)
         self.run_hooks(
-            SeekHook(p, c, completed_steps, steps_to_do, part_info, **kwargs)
+            SeekHook(
+                p,
+                c,
+                completed_steps,
+                steps_to_do,
+                part_info,
+                points_cache=self.points_cache,
+                **kwargs,
+            )
             for p, c, kwargs in self._part_params()
         )
         self.configured_steps.set_value(completed_steps + steps_to_do)
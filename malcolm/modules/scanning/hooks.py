@@ -1,14 +1,20 @@
-from typing import Any, Callable, Dict, Mapping, Sequence, TypeVar, Union
+from typing import Any, Callable, Dict, Mapping, Optional, Sequence, TypeVar, Union
 
-import numpy as np
 from annotypes import NO_DEFAULT, Anno, Array
-from scanpointgenerator import CompoundGenerator
 
 from malcolm.compat import OrderedDict
 from malcolm.core import VMeta
 from malcolm.modules import builtin
 
 from .infos import ConfigureParamsInfo, Info, ParameterTweakInfo
+from .util import (
+    AAxesToMove,
+    ABreakpoints,
+    AGenerator,
+    APointsCache,
+    UAxesToMove,
+    UBreakpoints,
+)
 
 T = TypeVar("T")
 
@@ -18,14 +24,6 @@ UPartInfo = Union[APartInfo, Mapping[str, Sequence[Info]]]
 with Anno("Infos about current Part status to be passed to other parts"):
     AInfos = Union[Array[Info]]
 
-with Anno("Generator instance providing specification for scan"):
-    AGenerator = Union[CompoundGenerator]
-with Anno("List of axes in inner dimension of generator that should be moved"):
-    AAxesToMove = Union[Array[str]]
-UAxesToMove = Union[AAxesToMove, Sequence[str]]
-with Anno("List of points at which the run will return in Armed state"):
-    ABreakpoints = Union[Array[np.int32]]
-UBreakpoints = Union[ABreakpoints, Sequence[int]]
 with Anno("Parameters that need to be changed to make them compatible"):
     AParameterTweakInfos = Union[Array[ParameterTweakInfo]]
 UInfos = Union[AInfos, Sequence[Info], Info, None]
@@ -45,9 +43,15 @@ Arguments are:
 with Anno("The demand exposure time of this scan, 0 for the maximum possible"):
     AExposure = float
 
+
 # Pull re-used annotypes into our namespace in case we are subclassed
 APart = builtin.hooks.APart
 AContext = builtin.hooks.AContext
+AGenerator = AGenerator
+AAxesToMove = AAxesToMove
+UAxesToMove = UAxesToMove
+ABreakpoints = ABreakpoints
+UBreakpoints = UBreakpoints
 # also bring in superclass which a subclasses may refer to
 ControllerHook = builtin.hooks.ControllerHook
 
@@ -96,6 +100,37 @@ class ValidateHook(ControllerHook[UParameterTweakInfos]):
         return check_array_info(AParameterTweakInfos, ret)
 
 
+class PrecomputeHook(ControllerHook[None]):
+    """Called at precompute() with the validated parameters of a scan that will
+    be configured later, possibly while another scan is running. Parts can use
+    this to calculate anything expensive in advance, but must not change the
+    state of any hardware"""
+
+    # Allow CamelCase for axesToMove as it must match ConfigureParams which
+    # will become a configure argument, so must be camelCase to match EPICS
+    # normative types conventions
+    # noinspection PyPep8Naming
+    def __init__(
+        self,
+        part: APart,
+        context: AContext,
+        part_info: UPartInfo,
+        generator: AGenerator,
+        axesToMove: AAxesToMove,
+        breakpoints: ABreakpoints,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(
+            part,
+            context,
+            part_info=part_info,
+            generator=generator,
+            axesToMove=axesToMove,
+            breakpoints=breakpoints,
+            **kwargs,
+        )
+
+
 class ReportStatusHook(ControllerHook[UInfos]):
     """Called before Validate, Configure, PostRunArmed and Seek hooks to report
     the current configuration of all parts"""
@@ -133,6 +168,7 @@ class ConfigureHook(ControllerHook[UInfos]):
         generator: AGenerator,
         axesToMove: AAxesToMove,
         breakpoints: ABreakpoints,
+        points_cache: Optional[APointsCache] = None,
         **kwargs: Any,
     ) -> None:
         super().__init__(
@@ -144,6 +180,7 @@ class ConfigureHook(ControllerHook[UInfos]):
             generator=generator,
             axesToMove=axesToMove,
             breakpoints=breakpoints,
+            points_cache=points_cache,
             **kwargs,
         )
 
@@ -170,6 +207,13 @@ class ConfigureHook(ControllerHook[UInfos]):
         return check_array_info(AInfos, ret)
 
 
+class RearmHook(ConfigureHook):
+    """Called at rearm() instead of ConfigureHook to get ready to run the
+    last configured scan again from the start. Parts that hook this can reuse
+    anything they calculated at configure, only rewinding counters. Parts that
+    don't will be configured again with the same parameters"""
+
+
 class PostConfigureHook(ControllerHook[None]):
     """Called at the end of configure() to store configuration info calculated
     in the Configure hook"""
@@ -202,6 +246,7 @@ class PostRunArmedHook(ControllerHook[None]):
         part_info: UPartInfo,
         generator: AGenerator,
         axesToMove: AAxesToMove,
+        points_cache: Optional[APointsCache] = None,
         **kwargs: Any,
     ) -> None:
         super().__init__(
@@ -212,6 +257,7 @@ class PostRunArmedHook(ControllerHook[None]):
             part_info=part_info,
             generator=generator,
             axesToMove=axesToMove,
+            points_cache=points_cache,
             **kwargs,
         )
 
@@ -241,6 +287,7 @@ class SeekHook(ControllerHook[None]):
         part_info: APartInfo,
         generator: AGenerator,
         axesToMove: AAxesToMove,
+        points_cache: Optional[APointsCache] = None,
         **kwargs: Any,
     ) -> None:
         super().__init__(
@@ -251,6 +298,7 @@ class SeekHook(ControllerHook[None]):
             part_info=part_info,
             generator=generator,
             axesToMove=axesToMove,
+            points_cache=points_cache,
             **kwargs,
         )
 
@@ -23,7 +23,9 @@ from ..hooks import (
     ConfigureHook,
     PostRunArmedHook,
     PostRunReadyHook,
+    PrecomputeHook,
     PreConfigureHook,
+    RearmHook,
     RunHook,
     SeekHook,
     UInfos,
@@ -73,8 +75,10 @@ class DetectorChildPart(builtin.parts.ChildPart):
         super().setup(registrar)
         # Hooks
         registrar.hook(ValidateHook, self.on_validate)
+        registrar.hook(PrecomputeHook, self.on_precompute)
         registrar.hook(PreConfigureHook, self.reload)
         registrar.hook(ConfigureHook, self.on_configure)
+        registrar.hook(RearmHook, self.on_rearm)
         registrar.hook(RunHook, self.on_run)
         registrar.hook((PostRunArmedHook, PostRunReadyHook), self.on_post_run)
         registrar.hook(SeekHook, self.on_seek)
@@ -331,6 +335,74 @@ class DetectorChildPart(builtin.parts.ChildPart):
         ):
             kwargs.pop("exposure")
         child.configure(**kwargs)
+        return self._dataset_infos(child)
+
+    # Must match those passed in configure() Method, so need to be camelCase
+    # noinspection PyPep8Naming
+    @add_call_types
+    def on_precompute(
+        self,
+        context: AContext,
+        generator: AGenerator,
+        fileDir: AFileDir,
+        detectors: ADetectorTable = None,
+        axesToMove: AAxesToMove = None,
+        breakpoints: ABreakpoints = None,
+        fileTemplate: AFileTemplate = "%s.h5",
+    ) -> None:
+        if self.faulty:
+            return
+        enable, _, kwargs = self._configure_args(
+            generator, fileDir, detectors, axesToMove, breakpoints, fileTemplate
+        )
+        child = context.block_view(self.mri)
+        if not enable or "precompute" not in child:
+            # Not taking part, or the child can't precompute
+            return
+        if (
+            "exposure" in kwargs
+            and "exposure" not in child.precompute.meta.takes.elements
+        ):
+            kwargs.pop("exposure")
+        child.precompute(**kwargs)
+
+    # Must match those passed in configure() Method, so need to be camelCase
+    # noinspection PyPep8Naming
+    @add_call_types
+    def on_rearm(
+        self,
+        context: AContext,
+        generator: AGenerator,
+        fileDir: AFileDir,
+        detectors: ADetectorTable = None,
+        axesToMove: AAxesToMove = None,
+        breakpoints: ABreakpoints = None,
+        fileTemplate: AFileTemplate = "%s.h5",
+    ) -> UInfos:
+        enable, frames_per_step, _ = self._configure_args(
+            generator, fileDir, detectors, axesToMove, breakpoints, fileTemplate
+        )
+        child = context.block_view(self.mri)
+        if (
+            frames_per_step != self.frames_per_step
+            or not enable
+            or child.state.value != ss.FINISHED
+            or "rearm" not in child
+        ):
+            # Can't reuse the child's configuration, so configure from scratch
+            return self.on_configure(
+                context,
+                generator,
+                fileDir,
+                detectors,
+                axesToMove,
+                breakpoints,
+                fileTemplate,
+            )
+        child.rearm()
+        return self._dataset_infos(child)
+
+    def _dataset_infos(self, child) -> UInfos:
         # Report back any datasets the child has to our parent
         assert hasattr(child, "datasets"), (
             "Detector %s doesn't have a dataset table, did you add a "
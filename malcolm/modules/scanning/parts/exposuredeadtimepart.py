@@ -8,6 +8,7 @@ from malcolm.core import (
     PartRegistrar,
     Widget,
     config_tag,
+    non_blocking,
 )
 
 from ..hooks import (
@@ -77,6 +78,7 @@ class ExposureDeadtimePart(Part):
         # Tell the controller to expose some extra configure parameters
         registrar.report(ConfigureHook.create_info(self.on_configure))
 
+    @non_blocking
     @add_call_types
     def on_report_status(self) -> UInfos:
         # Make an info so we can pass it to the detector
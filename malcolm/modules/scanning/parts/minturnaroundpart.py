@@ -8,6 +8,7 @@ from malcolm.core import (
     PartRegistrar,
     Widget,
     config_tag,
+    non_blocking,
 )
 
 from ..hooks import ReportStatusHook, UInfos
@@ -40,6 +41,7 @@ class MinTurnaroundPart(Part):
             display=Display(precision=6, units="s"),
         ).create_attribute_model(interval)
 
+    @non_blocking
     @add_call_types
     def on_report_status(self) -> UInfos:
         return MinTurnaroundInfo(self.gap.value, self.interval.value)
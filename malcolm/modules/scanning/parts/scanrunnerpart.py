@@ -1,7 +1,7 @@
 import os
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from annotypes import add_call_types
 from ruamel import yaml
@@ -9,6 +9,7 @@ from scanpointgenerator import CompoundGenerator, LineGenerator
 
 from malcolm.core import (
     AbortedError,
+    BooleanMeta,
     NotWriteableError,
     NumberMeta,
     PartRegistrar,
@@ -66,6 +67,24 @@ class Scan:
         self.repeats = repeats
 
 
+class QueuedScan:
+    """A single scan waiting to be run, with its precomputed parameters"""
+
+    def __init__(
+        self,
+        set_name: str,
+        set_directory: str,
+        scan_number: int,
+        generator: CompoundGenerator,
+    ) -> None:
+        self.set_name = set_name
+        self.set_directory = set_directory
+        self.scan_number = scan_number
+        self.generator = generator
+        self.scan_directory: Optional[str] = None
+        self.params: Optional[Dict[str, Any]] = None
+
+
 class ScanRunnerPart(ChildPart):
     """Used to run sets of scans defined in a YAML file with a scan block"""
 
@@ -103,6 +122,10 @@ class ScanRunnerPart(ChildPart):
             "Root output directory (will create a sub-directory inside)",
             tags=[config_tag(), Widget.TEXTINPUT.tag()],
         ).create_attribute_model()
+        self.pipeline_scans = BooleanMeta(
+            "Validate and precompute the next scan while the current one runs",
+            tags=[config_tag(), Widget.CHECKBOX.tag()],
+        ).create_attribute_model(False)
 
     def setup(self, registrar: PartRegistrar) -> None:
         super().setup(registrar)
@@ -137,6 +160,9 @@ class ScanRunnerPart(ChildPart):
         registrar.add_attribute_model(
             "outputDirectory", self.output_directory, self.output_directory.set_value
         )
+        registrar.add_attribute_model(
+            "pipelineScans", self.pipeline_scans, self.pipeline_scans.set_value
+        )
 
         # Methods
         registrar.add_method_model(self.loadFile)
@@ -303,10 +329,13 @@ class ScanRunnerPart(ChildPart):
         scan_block = self.context.block_view(self.mri)
 
         # Cycle through the scan sets
-        for key in self.scan_sets:
-            self.run_scan_set(
-                self.scan_sets[key], scan_block, sub_directory, report_filepath
-            )
+        if self.pipeline_scans.value:
+            self.run_scans_pipelined(scan_block, sub_directory, report_filepath)
+        else:
+            for key in self.scan_sets:
+                self.run_scan_set(
+                    self.scan_sets[key], scan_block, sub_directory, report_filepath
+                )
 
         self.set_runner_state(RunnerStates.FINISHED)
         self.current_scan_set.set_value("")
@@ -343,6 +372,51 @@ class ScanRunnerPart(ChildPart):
                 scan_set.generator,
             )
 
+    def run_scans_pipelined(
+        self, scan_block: Any, sub_directory: str, report_filepath: str
+    ) -> None:
+        # Make the list of every scan we will run
+        queue: List[QueuedScan] = []
+        for scan_set in self.scan_sets.values():
+            set_directory = self.create_and_get_set_directory(
+                sub_directory, scan_set.name
+            )
+            for scan_number in range(1, scan_set.repeats + 1):
+                queue.append(
+                    QueuedScan(
+                        scan_set.name, set_directory, scan_number, scan_set.generator
+                    )
+                )
+        # Run each scan, precomputing the one after it while it runs
+        for i, scan in enumerate(queue):
+            self.current_scan_set.set_value(scan.set_name)
+            next_scan = queue[i + 1] if i + 1 < len(queue) else None
+            self.run_scan(
+                scan.set_name,
+                scan_block,
+                scan.set_directory,
+                scan.scan_number,
+                report_filepath,
+                scan.generator,
+                queued_scan=scan,
+                next_scan=next_scan,
+            )
+
+    def precompute_scan(self, scan_block: Any, scan: QueuedScan) -> None:
+        scan.scan_directory = self.create_and_get_scan_directory(
+            scan.set_directory, scan.scan_number
+        )
+        try:
+            params = scan_block.precompute(scan.generator, fileDir=scan.scan_directory)
+        except Exception as e:
+            # Not fatal, configure will report the problem when we get to it
+            self.log.warning(
+                f"Could not precompute scan {scan.scan_number} in "
+                f"{scan.set_name}: ({type(e)}) {e}"
+            )
+        else:
+            scan.params = {k: params[k] for k in params}
+
     def create_and_get_scan_directory(
         self, set_directory: str, scan_number: int
     ) -> str:
@@ -356,6 +430,10 @@ class ScanRunnerPart(ChildPart):
     def scan_is_aborting(scan_block):
         return scan_block.state.value is RunnableStates.ABORTING
 
+    @staticmethod
+    def scan_state_is_not_aborting(state):
+        return state is not RunnableStates.ABORTING
+
     def run_scan(
         self,
         set_name: str,
@@ -364,6 +442,8 @@ class ScanRunnerPart(ChildPart):
         scan_number: int,
         report_filepath: str,
         generator: CompoundGenerator,
+        queued_scan: Optional[QueuedScan] = None,
+        next_scan: Optional[QueuedScan] = None,
     ) -> None:
         self.runner_status_message.set_value(
             "Running {set_name}: {scan_no}".format(
@@ -372,12 +452,17 @@ class ScanRunnerPart(ChildPart):
         )
         assert self.context, "No context found"
 
-        # Make individual scan directory
-        scan_directory = self.create_and_get_scan_directory(set_directory, scan_number)
+        # Make individual scan directory, unless done when it was precomputed
+        if queued_scan and queued_scan.scan_directory:
+            scan_directory = queued_scan.scan_directory
+        else:
+            scan_directory = self.create_and_get_scan_directory(
+                set_directory, scan_number
+            )
 
-        # Check if scan can be reset or run
-        while self.scan_is_aborting(scan_block):
-            self.context.sleep(0.1)
+        # Check if scan can be reset or run, waiting for any abort to finish
+        if self.scan_is_aborting(scan_block):
+            scan_block.when_value_matches("state", self.scan_state_is_not_aborting)
 
         # Run the scan and capture the outcome
         if scan_block.state.value is not RunnableStates.READY:
@@ -386,7 +471,11 @@ class ScanRunnerPart(ChildPart):
         # Configure first
         outcome = None
         try:
-            scan_block.configure(generator, fileDir=scan_directory)
+            if queued_scan and queued_scan.params:
+                # Already validated, and the generator prepared
+                scan_block.configure(**queued_scan.params)
+            else:
+                scan_block.configure(generator, fileDir=scan_directory)
         except AssertionError:
             outcome = ScanOutcome.MISCONFIGURED
         except Exception as e:
@@ -400,7 +489,13 @@ class ScanRunnerPart(ChildPart):
         start_time = self.get_current_datetime()
         if outcome is None:
             try:
-                scan_block.run()
+                if next_scan:
+                    # Precompute the next scan while this one runs
+                    future = scan_block.run_async()
+                    self.precompute_scan(scan_block, next_scan)
+                    self.context.wait_all_futures(future)
+                else:
+                    scan_block.run()
             except TimeoutError:
                 outcome = ScanOutcome.TIMEOUT
             except NotWriteableError:
@@ -1,16 +1,18 @@
 """ scanning.utils provides shared utility functions and classes.
 For consistency and to avoid circular dependencies, the following
 rules are applied:
-- All types required to initialize hook classes are in the hooks namespace
+- All types required to initialize hook classes are in the hooks namespace,
+  apart from those also needed by util, which hooks imports from here
 - All types required to initialize info classes are in the infos namespace
-- util depends on hooks and infos (not vice versa)"""
+- util depends on infos, hooks depends on util and infos (not vice versa)"""
 
-from typing import Any, Dict, Sequence, Union
+from typing import Any, Dict, Optional, Sequence, Tuple, Union
 
 import numpy as np
 from annotypes import Anno, Array, Serializable
-from scanpointgenerator import CompoundGenerator
+from scanpointgenerator import CompoundGenerator, Point, Points
 
+from malcolm.compat import OrderedDict
 from malcolm.core import (
     AttributeModel,
     Display,
@@ -22,9 +24,17 @@ from malcolm.core import (
 )
 from malcolm.modules import builtin
 
-from .hooks import AAxesToMove, ABreakpoints, AGenerator, UAxesToMove
 from .infos import DatasetType
 
+with Anno("Generator instance providing specification for scan"):
+    AGenerator = Union[CompoundGenerator]
+with Anno("List of axes in inner dimension of generator that should be moved"):
+    AAxesToMove = Union[Array[str]]
+UAxesToMove = Union[AAxesToMove, Sequence[str]]
+with Anno("List of points at which the run will return in Armed state"):
+    ABreakpoints = Union[Array[np.int32]]
+UBreakpoints = Union[ABreakpoints, Sequence[int]]
+
 
 def exposure_attribute(min_exposure: float) -> AttributeModel:
     meta = NumberMeta(
@@ -166,6 +176,128 @@ with Anno("The detectors that should be active and their exposures"):
     ADetectorTable = DetectorTable
 
 
+with Anno("Part names"):
+    APartNames = Union[Array[str]]
+with Anno("Number of steps each part has reported as complete"):
+    APartCompletedSteps = Union[Array[np.int32]]
+UPartNames = Union[APartNames, Sequence[str]]
+UPartCompletedSteps = Union[APartCompletedSteps, Sequence[np.int32]]
+
+
+class PartProgressTable(Table):
+    # Will be serialized so use camelCase
+    # noinspection PyPep8Naming
+    def __init__(self, part: UPartNames, completedSteps: UPartCompletedSteps) -> None:
+        self.part = APartNames(part)
+        self.completedSteps = APartCompletedSteps(completedSteps)
+
+
+class ProgressTracker:
+    """Track the minimum of the completed steps reported by a number of parts.
+
+    Parts normally only move forwards, so rather than searching all the parts
+    on every report we count how many are sitting at the minimum, and only
+    search again when the last of them moves past it"""
+
+    def __init__(self) -> None:
+        self.steps: Dict[str, int] = {}
+        self.minimum: Optional[int] = None
+        self._at_minimum = 0
+
+    def reset(self) -> None:
+        self.steps = {}
+        self.minimum = None
+        self._at_minimum = 0
+
+    def update(self, name: str, steps: int) -> int:
+        """Record the completed steps of a part, returning the new minimum"""
+        old = self.steps.get(name, None)
+        self.steps[name] = steps
+        if self.minimum is None or steps < self.minimum:
+            self.minimum = steps
+            self._at_minimum = 1
+            return steps
+        if old == self.minimum:
+            self._at_minimum -= 1
+        if steps == self.minimum:
+            self._at_minimum += 1
+        elif self._at_minimum == 0:
+            # The last part at the minimum moved forwards, so find the next one
+            self.minimum = min(self.steps.values())
+            self._at_minimum = sum(1 for v in self.steps.values() if v == self.minimum)
+        return self.minimum
+
+    def table(self) -> PartProgressTable:
+        return PartProgressTable(list(self.steps), list(self.steps.values()))
+
+
+class PointsCache:
+    """A cache of windows of Points from a prepared CompoundGenerator, shared
+    between the Parts of a RunnableController for the duration of a configure.
+
+    The least recently used windows are dropped when more than max_points
+    points are held. Points returned are shared, so must not be modified"""
+
+    def __init__(self, generator: CompoundGenerator, max_points: int = 100000):
+        self.generator = generator
+        self.max_points = max_points
+        # {(start, stop): Points}
+        self._windows: "OrderedDict[Tuple[int, int], Points]" = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def for_generator(
+        cls, generator: CompoundGenerator, points_cache: Optional["PointsCache"] = None
+    ) -> "PointsCache":
+        """Return points_cache if it caches generator, otherwise a new one"""
+        if points_cache is None or points_cache.generator is not generator:
+            points_cache = cls(generator)
+        return points_cache
+
+    def _find_window(self, start: int, stop: int) -> Union[Points, None]:
+        points = self._windows.get((start, stop), None)
+        if points is not None:
+            self._windows.move_to_end((start, stop))
+            return points
+        for (window_start, window_stop), points in self._windows.items():
+            if window_start <= start and stop <= window_stop:
+                self._windows.move_to_end((window_start, window_stop))
+                return points[start - window_start : stop - window_start]
+        return None
+
+    def get_points(self, start: int, stop: int) -> Points:
+        """Equivalent to generator.get_points(start, stop)"""
+        points = self._find_window(start, stop)
+        if points is not None:
+            self.hits += 1
+            return points
+        self.misses += 1
+        points = self.generator.get_points(start, stop)
+        if len(points) <= self.max_points:
+            self._windows[(start, stop)] = points
+            self._size += len(points)
+            while self._size > self.max_points:
+                _, dropped = self._windows.popitem(last=False)
+                self._size -= len(dropped)
+        return points
+
+    def get_point(self, index: int) -> Point:
+        """Equivalent to generator.get_point(index)"""
+        points = self._find_window(index, index + 1)
+        if points is not None:
+            self.hits += 1
+            return points[0]
+        # Not worth caching a window for a single point
+        self.misses += 1
+        return self.generator.get_point(index)
+
+
+with Anno("The points cache for the configured generator"):
+    APointsCache = PointsCache
+
+
 class RunnableStates(builtin.util.ManagerStates):
     """This state set covers controllers and parts that can be configured and
     then run, and have the ability to pause and rewind"""
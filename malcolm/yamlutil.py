@@ -1,21 +1,43 @@
+import hashlib
 import importlib
 import inspect
 import logging
 import os
-from collections.abc import MutableSequence
-from typing import Any, Callable, Dict, List, Tuple
+import pickle
+import weakref
+from collections.abc import Mapping, MutableSequence
+from typing import Any, Callable, Dict, List, MutableMapping, Optional, Tuple
 
 from annotypes import NO_DEFAULT, Anno
 from ruamel import yaml
 
 from malcolm.compat import OrderedDict, raise_with_traceback
-from malcolm.core import Controller, Define, MethodMeta, Part, YamlError
+from malcolm.core import Controller, Define, MapMeta, MethodMeta, Part, YamlError
 
 # Create a module level logger
 log = logging.getLogger(__name__)
 
 SECTION_NAMES = ["parameters", "controllers", "parts", "blocks", "includes", "defines"]
 
+# {callable: MapMeta} of the takes of everything instantiated from YAML, so the
+# annotation derived meta tree is only built once per class
+_takes_cache: MutableMapping[Callable, MapMeta] = weakref.WeakKeyDictionary()
+
+
+def takes_for_callable(ob: Callable) -> MapMeta:
+    """Return the takes MapMeta of a callable, caching it so that subsequent
+    calls with the same callable can reuse it to validate their arguments"""
+    try:
+        return _takes_cache[ob]
+    except (KeyError, TypeError):
+        takes = MethodMeta.from_callable(ob, returns=False).takes
+    try:
+        _takes_cache[ob] = takes
+    except TypeError:
+        # Can't weakref it, so don't cache
+        pass
+    return takes
+
 
 def _create_takes_arguments(sections: List["Section"]) -> List[Anno]:
     takes_arguments = []
@@ -89,7 +111,26 @@ def check_yaml_names(globals_d: (Dict[str, Any])) -> List[str]:
 def make_include_creator(
     yaml_path: str, filename: str = None
 ) -> Callable[..., Tuple[List[Controller], List[Part]]]:
-    sections, yamlname, docstring = Section.from_yaml(yaml_path, filename)
+    """Make a collection function that will create blocks and parts
+
+    The YAML file is not parsed until the function is called or its
+    signature is inspected
+
+    Args:
+        yaml_path (str): File path to YAML file, or a file in the same dir
+        filename (str): If give, use this filename as the last element in
+            the yaml_path (so yaml_path can be __file__)
+
+    Returns:
+        A collection function that returns (controllers, parts)
+    """
+    return LazyCreator(_make_include_creator, yaml_path, filename)
+
+
+def _make_include_creator(
+    yaml_path: str,
+) -> Callable[..., Tuple[List[Controller], List[Part]]]:
+    sections, yamlname, docstring = Section.from_yaml(yaml_path)
     yamldir = os.path.dirname(os.path.abspath(yaml_path))
 
     # Check we don't have any controllers
@@ -151,9 +192,15 @@ def make_block_creator(
         blocks or instantiated by the process. If the YAML text specified
         controllers or parts then a block instance with the given name will be
         instantiated. If there are any blocks listed then they will be called.
-        All created controllers by this or any sub collection will be returned
+        All created controllers by this or any sub collection will be returned.
+        The YAML file is not parsed until the function is called or its
+        signature is inspected
     """
-    sections, yamlname, docstring = Section.from_yaml(yaml_path, filename)
+    return LazyCreator(_make_block_creator, yaml_path, filename)
+
+
+def _make_block_creator(yaml_path: str) -> Callable[..., List[Controller]]:
+    sections, yamlname, docstring = Section.from_yaml(yaml_path)
     yamldir = os.path.dirname(os.path.abspath(yaml_path))
 
     # Check we have only one controller
@@ -180,6 +227,143 @@ def make_block_creator(
     return creator
 
 
+def _yaml_path(yaml_path: str, filename: str = None) -> str:
+    if filename:
+        # different filename to support passing __file__
+        yaml_path = os.path.join(os.path.dirname(yaml_path), filename)
+    assert yaml_path.endswith(".yaml"), (
+        "Expected a/path/to/<yamlname>.yaml, got %r" % yaml_path
+    )
+    return yaml_path
+
+
+class LazyCreator:
+    # A creator function made from a YAML file, parsed on first use so that
+    # importing a module doesn't parse every one of its YAML files
+
+    def __init__(
+        self, make_creator: Callable[[str], Callable], yaml_path: str, filename=None
+    ) -> None:
+        self.yaml_path = _yaml_path(yaml_path, filename)
+        self.yamlname = os.path.basename(self.yaml_path)[:-5]
+        self.__name__ = self.yamlname
+        self._make_creator = make_creator
+        self._creator: Optional[Callable] = None
+
+    @property
+    def __wrapped__(self) -> Any:
+        # The creator function, decorated so it has call_types and return_type
+        if self._creator is None:
+            self._creator = self._make_creator(self.yaml_path)
+        return self._creator
+
+    @property
+    def __doc__(self):
+        return self.__wrapped__.__doc__
+
+    @property
+    def call_types(self) -> Dict[str, Anno]:
+        return self.__wrapped__.call_types
+
+    @property
+    def return_type(self) -> Anno:
+        return self.__wrapped__.return_type
+
+    def __call__(self, *args, **kwargs):
+        return self.__wrapped__(*args, **kwargs)
+
+    def __repr__(self):
+        return "<LazyCreator %s>" % self.yaml_path
+
+
+def _plain(value: Any) -> Any:
+    # Turn ruamel's round trip types into builtins so they can be pickled
+    if isinstance(value, Mapping):
+        return {k: _plain(v) for k, v in value.items()}
+    elif isinstance(value, MutableSequence):
+        return [_plain(v) for v in value]
+    elif isinstance(value, bool) or value is None:
+        return value
+    for typ in (str, int, float):
+        if isinstance(value, typ):
+            return typ(value)
+    return value
+
+
+def yaml_cache_dir() -> str:
+    """The directory holding parsed YAML files, or "" if caching is disabled.
+    Caching is only done if $MALCOLM_YAML_CACHE is set to a directory"""
+    return os.environ.get("MALCOLM_YAML_CACHE", "")
+
+
+class ParsedYamlCache:
+    """On disk cache of parsed YAML sections, keyed by file mtime and size,
+    falling back to a hash of the contents if the file has been touched"""
+
+    # Bump this if the format of the cached entries changes
+    version = 1
+
+    def __init__(self, yaml_path: str, cache_dir: str) -> None:
+        self.yaml_path = os.path.abspath(yaml_path)
+        key = hashlib.sha1(self.yaml_path.encode()).hexdigest()
+        self.cache_path = os.path.join(cache_dir, key + ".pickle")
+        try:
+            stat = os.stat(self.yaml_path)
+        except OSError:
+            self.stamp = None
+        else:
+            self.stamp = (stat.st_mtime_ns, stat.st_size)
+        self.entry: Dict[str, Any] = {}
+        if self.stamp:
+            try:
+                with open(self.cache_path, "rb") as f:
+                    self.entry = pickle.load(f)
+            except Exception:
+                pass
+            if self.entry.get("version") != self.version:
+                self.entry = {}
+
+    def lookup_stamp(self) -> Any:
+        """Return the cached sections if the file is unchanged since they were
+        stored, otherwise None"""
+        if self.entry and self.entry["stamp"] == self.stamp:
+            return self.entry["parsed"]
+        return None
+
+    def lookup_text(self, text: str) -> Any:
+        """Return the cached sections if they were parsed from identical text,
+        updating the stored stamp so next time lookup_stamp will succeed"""
+        if self.entry and self.entry["hash"] == self._hash(text):
+            self.store(text, self.entry["parsed"])
+            return self.entry["parsed"]
+        return None
+
+    def store(self, text: str, parsed: Any) -> None:
+        if not self.stamp:
+            return
+        entry = dict(
+            version=self.version,
+            stamp=self.stamp,
+            hash=self._hash(text),
+            parsed=parsed,
+        )
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            # Write then rename so concurrent readers never see a partial file
+            tmp_path = "%s.%d" % (self.cache_path, os.getpid())
+            with open(tmp_path, "wb") as f:
+                pickle.dump(entry, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            log.debug("Cannot cache %s in %s: %s", self.yaml_path, self.cache_path, e)
+        else:
+            self.entry = entry
+
+    @staticmethod
+    def _hash(text: str) -> str:
+        return hashlib.sha1(text.encode()).hexdigest()
+
+
 class Section:
     def __init__(self, filename, lineno, name, param_dict=None):
         self.filename = filename
@@ -234,10 +418,12 @@ class Section:
                 )
             )
         try:
-            meta = MethodMeta.from_callable(ob, returns=False)
-            args = meta.takes.validate(param_dict)
+            args = takes_for_callable(ob).validate(param_dict)
             ret = ob(**args)
         except Exception as e:
+            if isinstance(ob, LazyCreator):
+                # Point at the function made from the YAML file
+                ob = ob.__wrapped__
             sourcefile = inspect.getsourcefile(ob)
             lineno = inspect.getsourcelines(ob)[1]
             raise_with_traceback(
@@ -262,29 +448,40 @@ class Section:
             tuple: (sections, yamlname, docstring) where sections is a
                 list of created sections
         """
-        if filename:
-            # different filename to support passing __file__
-            yaml_path = os.path.join(os.path.dirname(yaml_path), filename)
-        assert yaml_path.endswith(".yaml"), (
-            "Expected a/path/to/<yamlname>.yaml, got %r" % yaml_path
-        )
+        yaml_path = _yaml_path(yaml_path, filename)
         yamlname = os.path.basename(yaml_path)[:-5]
+        cache_dir = yaml_cache_dir()
+        cache = ParsedYamlCache(yaml_path, cache_dir) if cache_dir else None
+        parsed = cache.lookup_stamp() if cache else None
+        if parsed is None:
+            with open(yaml_path) as f:
+                text = f.read()
+            parsed = cache.lookup_text(text) if cache else None
+            if parsed is None:
+                parsed = cls._parse(yaml_path, text)
+                if cache:
+                    cache.store(text, parsed)
+        docstring = None
+        sections = []
+        for lineno, name, param_dict in parsed:
+            sections.append(cls(yaml_path, lineno, name, param_dict))
+            if name == "builtin.defines.docstring":
+                docstring = param_dict["value"]
+
+        return sections, yamlname, docstring
+
+    @staticmethod
+    def _parse(yaml_path: str, text: str) -> List[Tuple[int, str, Any]]:
         log.debug("Parsing %s", yaml_path)
-        with open(yaml_path) as f:
-            text = f.read()
         # First separate them into their relevant sections
         ds = yaml.load(text, Loader=yaml.RoundTripLoader)
-        docstring = None
-        sections = []
+        parsed = []
         for d in ds:
             assert len(d) == 1, "Expected section length 1, got %d" % len(d)
             lineno = d._yaml_line_col.line + 1
             name = list(d)[0]
-            sections.append(cls(yaml_path, lineno, name, d[name]))
-            if name == "builtin.defines.docstring":
-                docstring = d[name]["value"]
-
-        return sections, yamlname, docstring
+            parsed.append((lineno, name, _plain(d[name])))
+        return parsed
 
     def substitute_params(self, substitutions):
         """Substitute param values in our param_dict from params
@@ -146,6 +146,18 @@ class TestContext(unittest.TestCase):
         self.o.wait_all_futures(fs, 0.01)
         assert [f.done() for f in fs] == [True, True]
 
+    def test_many_puts_drained_together(self):
+        fs = [self.o.put_async(["block", "attr%d" % i, "value"], i) for i in range(100)]
+        for i in reversed(range(100)):
+            self.o._q.put(Return(i + 1, None))
+        # Something not for us that arrives after we are done stays queued
+        self.o._q.put(Update(1000, "ignored"))
+        self.o.wait_all_futures(fs, 0.01)
+        assert all(f.done() for f in fs)
+        assert self.o.last_wait_responses == 100
+        assert self.o.responses_serviced == 100
+        assert self.o._q.qsize() == 1
+
     def test_sleep(self):
         start = time.time()
         self.o.sleep(0.05)
@@ -237,3 +249,100 @@ class TestContext(unittest.TestCase):
         future = self.o.put_async(["block", "attr", "value"], 32)
         self.o._q.put(Return(1))
         self.o.wait_all_futures(future, event_timeout=0.01)
+
+    def test_wait_any_futures(self):
+        fs = [
+            self.o.put_async(["block", "attr", "value"], 32),
+            self.o.put_async(["block", "attr2", "value"], 33),
+        ]
+        self.o._q.put(Return(2))
+        done = self.o.wait_any_futures(fs, timeout=0.01)
+        assert done == [fs[1]]
+        assert not fs[0].done()
+        # Already done futures return immediately
+        assert self.o.wait_any_futures(fs, timeout=0) == [fs[1]]
+
+    def test_wait_any_futures_timeout(self):
+        future = self.o.put_async(["block", "attr", "value"], 32)
+        with self.assertRaises(TimeoutError):
+            self.o.wait_any_futures([future], timeout=0.01)
+
+    def test_wait_any_futures_event_timeout(self):
+        future = self.o.put_async(["block", "attr", "value"], 32)
+        func = MagicMock()
+        timer = self.o.call_every(0.01, func)
+        start = time.time()
+        with self.assertRaises(TimeoutError):
+            self.o.wait_any_futures([future], timeout=1, event_timeout=0.05)
+        timer.cancel()
+        # The timer doesn't stop the event timeout from firing here either
+        assert func.call_count >= 3
+        self.assertAlmostEqual(time.time() - start, 0.05, delta=0.03)
+
+    def test_call_every(self):
+        func = MagicMock()
+        timer = self.o.call_every(0.01, func, "arg")
+        self.o.sleep(0.055)
+        assert func.call_count == 5
+        func.assert_called_with("arg")
+        timer.cancel()
+        self.o.sleep(0.025)
+        assert func.call_count == 5
+        assert self.o._timers == []
+
+    def test_call_every_returns_as_soon_as_done(self):
+        future = self.o.put_async(["block", "attr", "value"], 32)
+        calls = []
+
+        def side_action():
+            calls.append(time.time())
+            if len(calls) == 2:
+                self.o._q.put(Return(1))
+
+        start = time.time()
+        timer = self.o.call_every(0.01, side_action)
+        self.o.wait_all_futures(future, timeout=1)
+        timer.cancel()
+        assert future.done()
+        assert len(calls) == 2
+        self.assertAlmostEqual(time.time() - start, 0.02, delta=0.01)
+
+    def test_call_every_does_not_reset_event_timeout(self):
+        future = self.o.put_async(["block", "attr", "value"], 32)
+        func = MagicMock()
+        timer = self.o.call_every(0.01, func)
+        start = time.time()
+        with self.assertRaises(TimeoutError):
+            self.o.wait_all_futures(future, timeout=1, event_timeout=0.05)
+        timer.cancel()
+        # The timer ran, but didn't stop the event timeout from firing
+        assert func.call_count >= 3
+        self.assertAlmostEqual(time.time() - start, 0.05, delta=0.03)
+
+    def test_event_timeout_reset_by_response(self):
+        futures = [
+            self.o.put_async(["block", "attr", "value"], 32),
+            self.o.put_async(["block", "attr2", "value"], 33),
+        ]
+        calls = []
+
+        def side_action():
+            # Each response is well within the event timeout of the last one
+            if len(calls) < 2:
+                self.o._q.put(Return(len(calls) + 1))
+            calls.append(None)
+
+        timer = self.o.call_every(0.03, side_action)
+        self.o.wait_all_futures(futures, timeout=1, event_timeout=0.05)
+        timer.cancel()
+        assert all(f.done() for f in futures)
+
+    def test_call_every_raises(self):
+        future = self.o.put_async(["block", "attr", "value"], 32)
+
+        def side_action():
+            raise MyWarning("Stalled")
+
+        self.o.call_every(0.01, side_action)
+        with self.assertRaises(MyWarning):
+            self.o.wait_all_futures(future, timeout=1)
@@ -7,6 +7,7 @@ from malcolm.core import (
     Controller,
     Error,
     Get,
+    Hook,
     Part,
     PartRegistrar,
     Post,
@@ -14,11 +15,14 @@ from malcolm.core import (
     Put,
     Queue,
     Return,
+    Spawned,
     StringMeta,
     Subscribe,
     Unsubscribe,
     Update,
+    non_blocking,
 )
+from malcolm.core.hook import RanInline
 
 with Anno("The return value"):
     AWorld = str
@@ -43,6 +47,32 @@ class MyPart(Part):
         registrar.add_method_model(self.method)
 
 
+class MyHook(Hook):
+    def validate_return(self, ret):
+        return ret
+
+    def stop(self):
+        pass
+
+
+class HookedPart(Part):
+    exception = None
+
+    def setup(self, registrar: PartRegistrar) -> None:
+        registrar.hook(MyHook, self.on_hook_func)
+
+    @non_blocking
+    def on_hook_func(self):
+        if self.exception:
+            raise self.exception
+        return self.name
+
+
+class SpawnedHookedPart(HookedPart):
+    def on_hook_func(self):
+        return self.name
+
+
 class TestController(unittest.TestCase):
     maxDiff = None
 
@@ -144,3 +174,26 @@ class TestController(unittest.TestCase):
         response = q.get(timeout=0.1)
         self.assertIsInstance(response, Return)
         assert response.id == 44
+
+    def test_non_blocking_hooks_run_inline(self):
+        inline = HookedPart("inline")
+        spawned = SpawnedHookedPart("spawned")
+        self.o.add_part(inline)
+        self.o.add_part(spawned)
+        hook_queue, hook_spawned = self.o.start_hooks(
+            MyHook(p) for p in (self.part, inline, spawned)
+        )
+        # The inline one has already run, the other is still to be scheduled
+        assert [type(h.spawned) for h in hook_spawned] == [RanInline, Spawned]
+        assert hook_queue.qsize() == 1
+        assert self.o.wait_hooks(hook_queue, hook_spawned) == dict(
+            inline="inline", spawned="spawned"
+        )
+
+    def test_non_blocking_hook_raises(self):
+        inline = HookedPart("inline")
+        inline.exception = ValueError("Bad")
+        self.o.add_part(inline)
+        self.o.add_part(SpawnedHookedPart("spawned"))
+        with self.assertRaises(ValueError):
+            self.o.run_hooks(MyHook(p) for p in self.o.parts.values())
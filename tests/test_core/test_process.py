@@ -1,12 +1,61 @@
 import unittest
+from typing import List
 
 from mock import MagicMock
 
-from malcolm.core import Process, ProcessStartHook
+from malcolm.core import Context, Part, Process, ProcessStartHook
+from malcolm.core.concurrency import sleep
 from malcolm.core.controller import Controller
+from malcolm.modules.builtin.controllers import StatefulController
+from malcolm.modules.builtin.controllers.proxycontroller import AComms, AMri
+from malcolm.modules.builtin.util import wait_for_stateful_block_init
 from malcolm.testutil import PublishController, UnpublishableController
 
 
+class SlowStartController(Controller):
+    running: List[str] = []
+    started: List[str] = []
+    max_running = 0
+
+    def on_hook(self, hook):
+        if isinstance(hook, ProcessStartHook):
+            hook(self.on_start)
+
+    def on_start(self):
+        cls = type(self)
+        cls.running.append(self.mri)
+        cls.max_running = max(cls.max_running, len(cls.running))
+        sleep(0.01)
+        cls.running.remove(self.mri)
+        cls.started.append(self.mri)
+
+
+def slow_start_controller(mri, *child_mris):
+    controller = SlowStartController(mri)
+    for child_mri in child_mris:
+        part = Part(child_mri)
+        part.mri = child_mri
+        controller.add_part(part)
+    return controller
+
+
+class WaitingStartController(Controller):
+    """Like a ProxyController, waits for comms to be ready while starting"""
+
+    def __init__(self, mri: AMri, comms: AComms) -> None:
+        super().__init__(mri)
+        self.comms = comms
+        self.comms_ready = False
+
+    def on_hook(self, hook):
+        if isinstance(hook, ProcessStartHook):
+            hook(self.on_start)
+
+    def on_start(self):
+        wait_for_stateful_block_init(Context(self.process), self.comms, timeout=2)
+        self.comms_ready = True
+
+
 class TestProcess(unittest.TestCase):
     def setUp(self):
         self.o = Process("proc")
@@ -43,3 +92,60 @@ class TestProcess(unittest.TestCase):
         assert c.published == ["mri", "mri2"]
         self.o.add_controller(UnpublishableController("mri3"))
         assert c.published == ["mri", "mri2"]
+
+    def test_start_children_first(self):
+        process = Process("proc2")
+        process.max_concurrent_starts = 2
+        SlowStartController.started = []
+        SlowStartController.max_running = 0
+        process.add_controllers(
+            [
+                slow_start_controller("top", "mid1", "mid2"),
+                slow_start_controller("mid1", "leaf1", "leaf2"),
+                slow_start_controller("mid2", "leaf3"),
+                slow_start_controller("leaf1"),
+                slow_start_controller("leaf2"),
+                slow_start_controller("leaf3"),
+            ]
+        )
+        process.start()
+        try:
+            started = SlowStartController.started
+            assert len(started) == 6
+            for parent, child in [
+                ("top", "mid1"),
+                ("top", "mid2"),
+                ("mid1", "leaf1"),
+                ("mid1", "leaf2"),
+                ("mid2", "leaf3"),
+            ]:
+                assert started.index(child) < started.index(parent)
+            assert SlowStartController.max_running == 2
+            assert sorted(process.start_durations) == sorted(started)
+            assert all(t >= 0.01 for t in process.start_durations.values())
+        finally:
+            process.stop(timeout=1)
+
+    def test_start_waiting_before_their_comms(self):
+        process = Process("proc2")
+        n = process.max_concurrent_starts + 2
+        controllers = [WaitingStartController("p%d" % i, "comms") for i in range(n)]
+        process.add_controllers(controllers + [StatefulController("comms")])
+        process.start(timeout=5)
+        try:
+            assert list(process.start_durations)[0] == "comms"
+            assert all(c.comms_ready for c in controllers)
+        finally:
+            process.stop(timeout=1)
+
+    def test_start_circular_children(self):
+        process = Process("proc2")
+        SlowStartController.started = []
+        process.add_controllers(
+            [slow_start_controller("a", "b"), slow_start_controller("b", "a")]
+        )
+        process.start()
+        try:
+            assert sorted(SlowStartController.started) == ["a", "b"]
+        finally:
+            process.stop(timeout=1)
@@ -0,0 +1,73 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from malcolm.core import Process, ProcessSnapshot, TimeoutError
+from malcolm.core.concurrency import sleep
+
+
+class TestProcessSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.dir_name = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir_name, "snapshot")
+
+    def tearDown(self):
+        shutil.rmtree(self.dir_name)
+
+    def test_save_load(self):
+        o = ProcessSnapshot(self.path)
+        o.load()
+        assert o.get("key", "v1") is None
+        o.put("key", "v1", dict(blocks=[1, 2]))
+        assert o.get("key", "v1") == dict(blocks=[1, 2])
+        o.save()
+        o = ProcessSnapshot(self.path)
+        o.load()
+        assert o.get("key", "v1") == dict(blocks=[1, 2])
+        # A different stamp means the device has changed
+        assert o.get("key", "v2") is None
+
+    def test_unchanged_not_saved(self):
+        o = ProcessSnapshot(self.path)
+        o.load()
+        o.save()
+        assert not os.path.exists(self.path)
+
+    def test_unreadable_ignored(self):
+        with open(self.path, "wb") as f:
+            f.write(b"rubbish")
+        o = ProcessSnapshot(self.path)
+        o.load()
+        assert o.get("key", "v1") is None
+
+    def test_no_path(self):
+        o = ProcessSnapshot()
+        o.load()
+        o.put("key", "v1", 32)
+        o.save()
+        assert o.get("key", "v1") == 32
+        assert os.listdir(self.dir_name) == []
+
+    def test_process_saves_at_stop(self):
+        p = Process("proc", snapshot_path=self.path)
+        p.start()
+        p.snapshot.put("key", "v1", 32)
+        p.stop(timeout=1)
+        p = Process("proc", snapshot_path=self.path)
+        p.start()
+        try:
+            assert p.snapshot.get("key", "v1") == 32
+        finally:
+            p.stop(timeout=1)
+
+    def test_process_saves_when_stop_times_out(self):
+        p = Process("proc", snapshot_path=self.path)
+        p.start()
+        p.snapshot.put("key", "v1", 32)
+        p.spawn(sleep, 0.5)
+        with self.assertRaises(TimeoutError):
+            p.stop(timeout=0.01)
+        o = ProcessSnapshot(self.path)
+        o.load()
+        assert o.get("key", "v1") == 32
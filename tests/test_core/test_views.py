@@ -64,6 +64,26 @@ class TestBlock(unittest.TestCase):
         assert hasattr(self.o, "method")
         assert hasattr(self.o, "method_async")
 
+    def test_view_class_cached(self):
+        data = BlockModel()
+        data.set_endpoint_data("attr", StringMeta().create_attribute_model())
+        data.set_endpoint_data("method", MethodModel())
+        o2 = make_view(self.controller, self.context, data)
+        assert type(o2) is type(self.o)
+        assert o2 is not self.o
+        # Adding an endpoint needs a new class
+        data.set_endpoint_data("attr2", StringMeta().create_attribute_model())
+        o3 = make_view(self.controller, self.context, data)
+        assert type(o3) is not type(self.o)
+        assert hasattr(type(o3), "attr2")
+        assert not hasattr(type(self.o), "attr2")
+        # Replacing an attribute with a method changes the _async methods
+        data.remove_endpoint("attr2")
+        data.set_endpoint_data("attr2", MethodModel())
+        o4 = make_view(self.controller, self.context, data)
+        assert type(o4) is not type(o3)
+        assert hasattr(type(o4), "attr2_async")
+
     def test_put_attribute_values(self):
         self.o.put_attribute_values(dict(attr=43))
         self.context.put_async.assert_called_once_with(["block", "attr", "value"], 43)
@@ -36,3 +36,42 @@ class TestIMalcolm(unittest.TestCase):
             str(MyHandler.emitted[0])
             == '<LogRecord: root, 30, %s, 32, "Bad things happen">' % __file__
         )
+
+    def test_startup_profile(self):
+        import json
+        import os
+
+        from malcolm.core import Process
+        from malcolm.imalcolm import StartupProfile
+        from malcolm.modules.demo.blocks import motion_block
+
+        startup_profile = StartupProfile("/tmp/startup.yaml")
+        process = Process("startup")
+        with startup_profile.phase("construct"):
+            controllers = motion_block(mri="MOTION", config_dir="/tmp")
+        process.add_controllers(controllers)
+        process.start()
+        try:
+            filename = startup_profile.write("/tmp", process, "profile.plop")
+        finally:
+            process.stop(timeout=1)
+        assert filename.endswith("-startup-startup.json")
+        with open(os.path.join("/tmp", filename)) as f:
+            report = json.load(f)
+        assert report["process"] == "startup"
+        assert report["yaml"] == "/tmp/startup.yaml"
+        assert report["profile"] == "profile.plop"
+        assert list(report["phases"]) == [
+            "construct",
+            "ProcessStartHook",
+            "ProcessPublishHook",
+        ]
+        assert sorted(report["controllers"]) == [
+            "MOTION",
+            "MOTION:COUNTERX",
+            "MOTION:COUNTERY",
+        ]
+        motion = report["controllers"]["MOTION"]
+        assert motion["start"] > 0
+        assert sorted(motion["parts"]) == ["x", "y"]
+        assert report["controllers"]["MOTION:COUNTERX"]["parts"] == {}
@@ -3,7 +3,7 @@ import shutil
 from xml.etree import ElementTree
 
 import cothread
-from mock import MagicMock, call
+from mock import MagicMock, call, patch
 from scanpointgenerator import CompoundGenerator, LineGenerator, SpiralGenerator
 
 from malcolm.core import Context, Future, Process
@@ -15,7 +15,10 @@ from malcolm.modules.ADCore.infos import (
     NDAttributeDatasetInfo,
 )
 from malcolm.modules.ADCore.parts import HDFWriterPart
-from malcolm.modules.ADCore.parts.hdfwriterpart import greater_than_zero
+from malcolm.modules.ADCore.parts.hdfwriterpart import (
+    greater_than_zero,
+    make_layout_xml,
+)
 from malcolm.modules.ADCore.util import AttributeDatasetType
 from malcolm.modules.builtin.defines import tmp_dir
 from malcolm.modules.scanning.controllers import RunnableController
@@ -401,6 +404,87 @@ class TestHDFWriterPart(ChildTestCase):
         assert self.o.registrar.report.call_args_list[0][0][0].steps == 0
         assert self.o.registrar.report.call_args_list[1][0][0].steps == 38
 
+    def rearm(self, part_info, configure=False):
+        generator = CompoundGenerator([LineGenerator("x", "mm", 0, 1, 5)], [], [], 0.1)
+        generator.prepare()
+        func = self.o.on_configure if configure else self.o.on_rearm
+        return func(
+            self.context, 0, 5, part_info, generator, self.config_dir.value, "xspress3"
+        )
+
+    def test_rearm(self):
+        self.mock_when_value_matches(self.child)
+        self.o = HDFWriterPart(name="m", mri="BLOCK:HDF5")
+        self.mock_xml_is_valid_check(self.o)
+        self.context.set_notify_dispatch_request(self.o.notify_dispatch_request)
+        part_info = {"DET": [NDArrayDatasetInfo(2)]}
+        infos = self.rearm(part_info, configure=True)
+        self.o.start_future.result(timeout=1)
+        assert call.put("fileName", "xspress3") in (
+            self.child.handled_requests.mock_calls
+        )
+        assert infos[0].filename == "xspress3.h5"
+        # Pretend the detector wrote the first run's file
+        first_file = os.path.join(self.config_dir.value, "xspress3.h5")
+        with open(first_file, "w") as f:
+            f.write("first run")
+        self.o.done_when_reaches = 3
+        self.child.handled_requests.reset_mock()
+        # Now it should just rewind the counters and start a new file
+        infos = self.rearm(part_info)
+        self.o.start_future.result(timeout=1)
+        assert self.o.done_when_reaches == 5
+        assert self.child.handled_requests.mock_calls == [
+            call.put("arrayCounter", 0),
+            call.put("fileName", "xspress3_1"),
+            call.put("numCapture", 0),
+            call.post("start"),
+            call.when_value_matches("arrayCounterReadback", greater_than_zero, None),
+        ]
+        assert [i.name for i in infos] == ["xspress3.data", "x.value_set"]
+        assert {i.filename for i in infos} == {"xspress3_1.h5"}
+        # The first run's file is left alone
+        with open(first_file) as f:
+            assert f.read() == "first run"
+        # If the datasets change it should configure from scratch again, still
+        # with a new file
+        self.child.handled_requests.reset_mock()
+        infos = self.rearm({"DET": [NDArrayDatasetInfo(1)]})
+        self.o.start_future.result(timeout=1)
+        assert len(self.child.handled_requests.mock_calls) > 4
+        assert call.put("fileName", "xspress3_2") in (
+            self.child.handled_requests.mock_calls
+        )
+        assert {i.filename for i in infos} == {"xspress3_2.h5"}
+        os.remove(self.o.layout_filename)
+
+    def test_precompute(self):
+        self.mock_when_value_matches(self.child)
+        self.o = HDFWriterPart(name="m", mri="BLOCK:HDF5")
+        self.mock_xml_is_valid_check(self.o)
+        self.context.set_notify_dispatch_request(self.o.notify_dispatch_request)
+        part_info = {"DET": [NDArrayDatasetInfo(2)]}
+        generator = CompoundGenerator([LineGenerator("x", "mm", 0, 1, 5)], [], [], 0.1)
+        generator.prepare()
+        self.o.on_precompute(part_info, generator)
+        assert len(self.o.layout_cache) == 1
+        xml = list(self.o.layout_cache.values())[0]
+        # Precompute doesn't touch the hardware
+        assert self.child.handled_requests.mock_calls == []
+        with patch(
+            "malcolm.modules.ADCore.parts.hdfwriterpart.make_layout_xml",
+            wraps=make_layout_xml,
+        ) as mock_make_layout_xml:
+            self.rearm(part_info, configure=True)
+            # An identical scan reuses the precomputed layout
+            mock_make_layout_xml.assert_not_called()
+            assert self.o.layout_xml is xml
+            # A different one has to make it again
+            self.rearm({"DET": [NDArrayDatasetInfo(1)]}, configure=True)
+            mock_make_layout_xml.assert_called_once()
+        self.o.start_future.result(timeout=1)
+        os.remove(self.o.layout_filename)
+
     def test_seek(self):
         self.mock_when_value_matches(self.child)
         self.o = HDFWriterPart(name="m", mri="BLOCK:HDF5")
@@ -1,7 +1,11 @@
 import os
 import shutil
+import threading
+import time
 import unittest
 
+import cothread
+from annotypes import json_decode
 from mock import MagicMock, call, patch
 
 from malcolm.compat import OrderedDict
@@ -15,6 +19,9 @@ from malcolm.core import (
     config_tag,
 )
 from malcolm.modules.builtin.controllers import (
+    DesignCache,
+    DesignIndex,
+    GitCommitter,
     ManagerController,
     StatefulController,
     check_git_version,
@@ -74,6 +81,76 @@ class MyPart(Part):
         registrar.add_attribute_model("attr", self.attr, self.attr.set_value)
 
 
+class TestDesignFiles(unittest.TestCase):
+    def setUp(self):
+        self.dir_name = tmp_dir("designs").value
+
+    def tearDown(self):
+        shutil.rmtree(self.dir_name)
+
+    def write(self, name, text, age=10):
+        filename = os.path.join(self.dir_name, name)
+        with open(filename, "w") as f:
+            f.write(text)
+        # Make the file and dir look old enough for their mtimes to be trusted
+        for path in (filename, self.dir_name):
+            t = os.stat(path).st_mtime - age
+            os.utime(path, (t, t))
+        return filename
+
+    def test_index_only_lists_when_dir_changes(self):
+        index = DesignIndex(self.dir_name)
+        self.write("b.json", "{}")
+        self.write("notes.txt", "")
+        self.write("a.json", "{}")
+        with patch("os.listdir", side_effect=os.listdir) as listdir:
+            assert index.names() == ["a", "b"]
+            assert index.names() == ["a", "b"]
+            assert index.entries() == ["a.json", "b.json", "notes.txt"]
+            assert listdir.call_count == 1
+            os.remove(os.path.join(self.dir_name, "a.json"))
+            assert index.names() == ["b"]
+            assert listdir.call_count == 2
+
+    def test_index_relists_recently_changed_dir(self):
+        index = DesignIndex(self.dir_name)
+        self.write("a.json", "{}", age=0)
+        with patch("os.listdir", side_effect=os.listdir) as listdir:
+            assert index.names() == ["a"]
+            assert index.names() == ["a"]
+            assert listdir.call_count == 2
+
+    def test_index_missing_dir(self):
+        index = DesignIndex(os.path.join(self.dir_name, "missing"))
+        assert index.names() == []
+
+    def test_cache_parses_identical_contents_once(self):
+        cache = DesignCache()
+        f1 = self.write("a.json", '{"attributes": {"x": 1}}')
+        f2 = self.write("b.json", '{"attributes": {"x": 1}}')
+        module = "malcolm.modules.builtin.controllers.managercontroller"
+        with patch(module + ".json_decode", side_effect=json_decode) as decode:
+            s1 = cache.load(f1)
+            assert s1 == dict(attributes=dict(x=1))
+            assert cache.load(f2) is s1
+            assert decode.call_count == 1
+            with patch("builtins.open", side_effect=open) as mock_open:
+                assert cache.load(f1) is s1
+                mock_open.assert_not_called()
+            self.write("a.json", '{"attributes": {"x": 22}}')
+            assert cache.load(f1) == dict(attributes=dict(x=22))
+            assert decode.call_count == 2
+
+    def test_cache_evicts_oldest(self):
+        cache = DesignCache(max_structures=1)
+        f1 = self.write("a.json", '{"x": 1}')
+        f2 = self.write("b.json", '{"x": 2}')
+        s1 = cache.load(f1)
+        cache.load(f2)
+        assert cache.load(f1) is not s1
+        assert cache.load(f1) == s1
+
+
 class TestManagerController(unittest.TestCase):
     maxDiff = None
 
@@ -104,6 +181,20 @@ class TestManagerController(unittest.TestCase):
         self.p.stop(timeout=1)
         shutil.rmtree(self.config_dir.value)
 
+    def test_template_designs_checked(self):
+        template_dir = os.path.join(self.config_dir.value, "templates")
+        os.mkdir(template_dir)
+        self.c.template_designs = template_dir
+        with open(os.path.join(template_dir, "template_a.json"), "w") as f:
+            f.write("{}")
+        self.c._set_layout_names()
+        assert "template_a" in self.c.design.meta.choices
+        # Anything else in the template dir is an error
+        with open(os.path.join(template_dir, "notes.txt"), "w") as f:
+            f.write("")
+        with self.assertRaises(AssertionError):
+            self.c._set_layout_names()
+
     def test_init(self):
         assert self.c.layout.value.name == ["part2"]
         assert self.c.layout.value.mri == ["childBlock"]
@@ -130,6 +221,50 @@ class TestManagerController(unittest.TestCase):
         assert self.b.mri.value == "mainBlock"
         assert self.b.mri.meta.tags == ["sourcePort:block:mainBlock"]
 
+    def test_hook_timings(self):
+        self.c.hook_timings_publish_period = 0
+        self.c._run_git_cmd = MagicMock()
+        before = len(self.c.hook_timings.value.hook)
+        self.c.save(designName="testSaveLayout")
+        timings = self.c.hook_timings.value
+        new_rows = list(timings.rows())[before:]
+        assert ["SaveHook", "part2"] in [row[:2] for row in new_rows]
+        assert all(row[2] >= 0 for row in new_rows)
+        histogram = {
+            tuple(row[:2]): row[2:] for row in self.c.hook_histogram.value.rows()
+        }
+        count, total, maximum = histogram[("SaveHook", "part2")][:3]
+        assert count == 1
+        assert total == maximum
+        # Only one run so it should be in exactly one bin
+        assert sum(histogram[("SaveHook", "part2")][3:]) == 1
+
+    def test_hook_timings_ring_buffer(self):
+        hook = MagicMock(duration=0.5)
+        hook.name = "MyHook"
+        hook.child.name = "part1"
+        for _ in range(self.c.hook_timings_length + 5):
+            self.c.record_hook_timings([hook])
+        self.c.publish_hook_timings()
+        assert len(self.c.hook_timings.value.hook) == self.c.hook_timings_length
+        row = list(self.c.hook_histogram.value.rows())[-1]
+        n = self.c.hook_timings_length + 5
+        assert row[:5] == ["MyHook", "part1", n, 0.5 * n, 0.5]
+        assert row[5:] == [0, 0, n, 0, 0]
+
+    def test_hook_timings_rate_limited(self):
+        hook = MagicMock(duration=0.5)
+        hook.name = "MyHook"
+        hook.child.name = "part1"
+        self.c.publish_hook_timings()
+        self.c.record_hook_timings([hook])
+        self.c.record_hook_timings([hook])
+        # Both recorded, but not published until the period is up
+        assert "MyHook" not in self.c.hook_timings.value.hook
+        context = Context(self.p)
+        context.sleep(self.c.hook_timings_publish_period + 0.1)
+        assert list(self.c.hook_timings.value.hook[-2:]) == ["MyHook", "MyHook"]
+
     def _get_design_filename(self, block_name, design_name):
         return f"{self.config_dir.value}/{block_name}/{design_name}.json"
 
@@ -178,6 +313,7 @@ class TestManagerController(unittest.TestCase):
         b = c.block_view("mainBlock")
         design_name = "testSaveLayout"
         b.save(designName=design_name)
+        self.c.git_committer.wait(timeout=5)
         assert len(li) == 3
         assert li[0]["writeable"] is False
         assert li[1]["choices"] == ["", design_name]
@@ -194,6 +330,7 @@ class TestManagerController(unittest.TestCase):
             self.c.modified.alarm.message == "part2.attr.value = 'newv' not 'defaultv'"
         )
         self.c.save(designName="")
+        self.c.git_committer.wait(timeout=5)
         self.check_expected_save(design_name, attr="newv")
         design_filename = self._get_design_filename(self.main_block_name, design_name)
         assert self.c.design.value == "testSaveLayout"
@@ -216,6 +353,73 @@ class TestManagerController(unittest.TestCase):
             ),
         ]
 
+    def test_save_unchanged(self):
+        self.c._run_git_cmd = MagicMock()
+        design_name = "testSaveUnchanged"
+        design_filename = self._get_design_filename(self.main_block_name, design_name)
+        self.c.save(designName=design_name)
+        self.c.git_committer.wait(timeout=5)
+        assert self.c._run_git_cmd.call_count == 2
+        mtime = os.stat(design_filename).st_mtime_ns
+        # Nothing has changed, so neither the file nor git should be touched
+        self.c.save(designName=design_name)
+        self.c.git_committer.wait(timeout=5)
+        assert self.c._run_git_cmd.call_count == 2
+        assert os.stat(design_filename).st_mtime_ns == mtime
+        assert self.c.design.value == design_name
+        assert self.c.modified.value is False
+        os.remove(design_filename)
+
+    def test_git_commits_batched(self):
+        run_git_cmd = MagicMock()
+        committer = GitCommitter(run_git_cmd)
+        # Hold the lock so the background thread can't start committing until
+        # all the saves are queued
+        with committer._lock:
+            committer._pending["/tmp/a.json"] = ["Saved A a"]
+            committer._pending["/tmp/b.json"] = ["Saved B b"]
+        committer.commit("/tmp/a.json", "Saved A a")
+        committer.wait(timeout=5)
+        assert run_git_cmd.call_args_list == [
+            call("add", "/tmp/a.json", "/tmp/b.json"),
+            call(
+                "commit",
+                "--allow-empty",
+                "-m",
+                "Saved A a\nSaved B b",
+                "/tmp/a.json",
+                "/tmp/b.json",
+            ),
+        ]
+
+    def test_git_commit_wait_lets_cothreads_run(self):
+        committed = threading.Event()
+        run_git_cmd = MagicMock(side_effect=lambda *args: committed.wait(5))
+        committer = GitCommitter(run_git_cmd)
+        committer.commit("/tmp/a.json", "Saved A a")
+        # The commit can only finish if this cothread runs during the wait
+        cothread.Spawn(committed.set)
+        start = time.time()
+        committer.wait(timeout=5)
+        assert time.time() - start < 1
+        assert committer._thread is None
+        assert run_git_cmd.call_count == 2
+
+    def test_git_commit_failure_does_not_stop_later_commits(self):
+        run_git_cmd = MagicMock(side_effect=[OSError("No git"), None, None])
+        committer = GitCommitter(run_git_cmd)
+        committer.commit("/tmp/a.json", "Saved A a")
+        committer.wait(timeout=5)
+        assert committer._thread is None
+        # A later save still gets committed
+        committer.commit("/tmp/b.json", "Saved B b")
+        committer.wait(timeout=5)
+        assert run_git_cmd.call_args_list == [
+            call("add", "/tmp/a.json"),
+            call("add", "/tmp/b.json"),
+            call("commit", "--allow-empty", "-m", "Saved B b", "/tmp/b.json"),
+        ]
+
     def move_child_block(self):
         new_layout = dict(
             name=["part2"], mri=["anything"], x=[10], y=[20], visible=[True]
@@ -243,10 +447,49 @@ class TestManagerController(unittest.TestCase):
         self.b.save(designName=design_name)
         assert self.c.modified.value is False
         self.check_expected_save(design_name, 10.0, 20.0, "false")
-        self.c.parts["part2"].x = 30
+        self.c.set_layout(
+            LayoutTable(name=["part2"], mri=[""], x=[30], y=[20], visible=[False])
+        )
+        assert self.c.parts["part2"].x == 30
+        changes = self.c.design_changes(design_name)
+        assert [(c.name, c.current, c.saved) for c in changes] == [
+            ("layout.part2", (30, 20, False), (10, 20, False))
+        ]
         self.c.set_design(design_name)
         assert self.c.parts["part2"].x == 10
 
+    def test_load_only_puts_changes(self):
+        self.c._run_git_cmd = MagicMock()
+        design_name = "testLoadChanges"
+        self.c.save(designName=design_name)
+        self.c_part.attr.set_value("newv")
+        changes = self.c.design_changes(design_name)
+        assert [(c.name, c.current, c.saved) for c in changes] == [
+            ("part2.attr", "newv", "defaultv")
+        ]
+        # The same is available as a Method on the block, when design is
+        assert self.b.designChanges.meta.writeable is True
+        table = self.b.designChanges(design_name)
+        assert list(table.name) == ["part2.attr"]
+        assert list(table.current) == ['"newv"']
+        assert list(table.saved) == ['"defaultv"']
+        # Dry run changes nothing
+        assert self.c_part.attr.value == "newv"
+        assert self.c.modified.value is True
+        with patch.object(
+            self.c, "set_layout", wraps=self.c.set_layout
+        ) as set_layout, patch.object(
+            self.c, "block_view", wraps=self.c.block_view
+        ) as block_view:
+            self.c.set_design(design_name)
+        # Layout and our attributes are unchanged, so not set
+        set_layout.assert_not_called()
+        block_view.assert_not_called()
+        assert self.c_part.attr.value == "defaultv"
+        assert self.c.modified.value is False
+        assert self.c.design_changes(design_name) == []
+        self.c.git_committer.wait(timeout=5)
+
     def test_set_export_parts(self):
         context = Context(self.p)
         b = context.block_view("mainBlock")
@@ -261,7 +504,10 @@ class TestManagerController(unittest.TestCase):
             "design",
             "exports",
             "modified",
+            "hookTimings",
+            "hookHistogram",
             "save",
+            "designChanges",
             "attr",
         ]
         assert b.attr.meta.tags == ["widget:textinput"]
@@ -286,7 +532,10 @@ class TestManagerController(unittest.TestCase):
             "design",
             "exports",
             "modified",
+            "hookTimings",
+            "hookHistogram",
             "save",
+            "designChanges",
             "attr",
             "childAttr",
             "childReset",
@@ -326,3 +575,34 @@ class TestManagerController(unittest.TestCase):
         # block has changed, get a new view
         b = context.block_view("mainBlock")
         assert "childAttr" not in b
+
+    def test_set_export_parts_incremental(self):
+        self.c.set_exports(ExportTable.from_rows([("part2.attr", "childAttr")]))
+        child_attr = self.c._block.childAttr
+        subscription = self.c._export_fields[("childBlock", "attr", "childAttr")][2]
+        self.c.set_exports(
+            ExportTable.from_rows(
+                [("part2.attr", "childAttr"), ("part2.reset", "childReset")]
+            )
+        )
+        # The existing export should be neither rebuilt nor resubscribed
+        assert self.c._block.childAttr is child_attr
+        assert (
+            self.c._export_fields[("childBlock", "attr", "childAttr")][2]
+            is subscription
+        )
+        assert list(self.c._block)[-2:] == ["childAttr", "childReset"]
+        self.c_part.attr.set_value("newv")
+        assert self.c._block.childAttr.value == "newv"
+
+    def test_modified_not_reset_if_unchanged(self):
+        self.c_part.attr.set_value("newv")
+        assert self.c.modified.value is True
+        alarm = self.c.modified.alarm
+        part = self.c.parts["part2"]
+        self.c.modified.set_value = MagicMock()
+        # The same info again, so there is nothing to publish
+        self.c.update_modified(part, self.c.part_modified[part])
+        self.c.update_modified()
+        self.c.modified.set_value.assert_not_called()
+        assert self.c.modified.alarm is alarm
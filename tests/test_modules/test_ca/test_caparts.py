@@ -284,11 +284,13 @@ class TestCAParts(unittest.TestCase):
         callback = catools.camonitor.call_args[0][1]
         callback(Initial(8.7))
         callback(Initial(8.8))
-        assert b.attrname.value == 8.8
+        # Second update is within min_delta so is held back, not slept on
+        assert b.attrname.value == 8.7
 
         # TODO: why does this seg fault on travis VMs when cothread is
         # stack sharing?
         b._context.sleep(0.1)
+        assert b.attrname.value == 8.8
         assert li == [5.2, 8.7, 8.8]
 
         c = self.create_block(
@@ -301,6 +303,41 @@ class TestCAParts(unittest.TestCase):
         assert c.attrname.meta.display.precision == 99
         assert c.attrname.meta.display.units == "tests"
 
+    def test_monitor_conflation(self, catools):
+        from malcolm.modules.ca.parts import CALongPart
+
+        class Initial(int):
+            ok = True
+            severity = 0
+
+        class Disconnected(int):
+            ok = False
+            severity = 0
+
+        catools.caget.side_effect = [[Initial(0)]]
+        p = CALongPart(name="attrname", description="desc", rbv="pv", min_delta=0.2)
+        b = self.create_block(p)
+        li = []
+        b.attrname.subscribe_value(li.append)
+        b._context.sleep(0.05)
+        callback = catools.camonitor.call_args[0][1]
+        for i in range(1, 5):
+            callback(Initial(i))
+        # First goes straight through, the rest are conflated to the last
+        b._context.sleep(0.05)
+        assert li == [0, 1]
+        assert p.caa.dropped_updates == 2
+        b._context.sleep(0.3)
+        assert li == [0, 1, 4]
+        # A disconnect doesn't wait for the window
+        callback(Initial(5))
+        callback(Disconnected(5))
+        assert not b.attrname.alarm.is_ok()
+        assert b.attrname.value == 4
+        # And the pending update it replaced is never sent
+        b._context.sleep(0.3)
+        assert li == [0, 1, 4, 4]
+
     def test_calongarray(self, catools):
         from malcolm.modules.ca.parts import CALongArrayPart
 
@@ -360,6 +397,64 @@ class TestCAParts(unittest.TestCase):
             ["pv"], datatype=catools.DBR_LONG, format=catools.FORMAT_CTRL, throw=True
         )
 
+    def test_calong_rbv_wait(self, catools):
+        from malcolm.modules.ca.parts import CALongPart
+
+        class Initial(int):
+            ok = True
+            severity = 0
+
+        catools.caget.side_effect = [[Initial(3)]]
+        b = self.create_block(
+            CALongPart(name="attrname", description="desc", pv="pv", rbv_wait=0.5)
+        )
+        callback = catools.camonitor.call_args[0][1]
+        catools.caget.reset_mock()
+
+        # Monitor reports the new value just after the put completes
+        catools.caput.side_effect = lambda *args, **kwargs: self.process.spawn(
+            callback, Initial(5)
+        )
+        b.attrname.put_value(5)
+        assert b.attrname.value == 5
+        catools.caget.assert_not_called()
+
+        # Monitor never matches, so fall back to a caget
+        catools.caput.side_effect = None
+        catools.caget.side_effect = [Initial(6)]
+        b.attrname.put_value(7)
+        assert b.attrname.value == 6
+        catools.caget.assert_called_once_with(
+            "pv", datatype=catools.DBR_LONG, format=catools.FORMAT_TIME, throw=True
+        )
+
+    def test_calongarray_rbv_wait(self, catools):
+        from malcolm.modules.ca.parts import CALongArrayPart
+
+        class Update(np.ndarray):
+            ok = True
+            severity = 0
+
+        def update(*values):
+            ret = Update(dtype=np.int32, shape=(len(values),))
+            ret[:] = values
+            return ret
+
+        catools.caget.side_effect = [[update(5, 6)]]
+        part = CALongArrayPart(name="attrname", description="desc", pv="pv")
+        part.caa.rbv_wait = 0.5
+        b = self.create_block(part)
+        callback = catools.camonitor.call_args[0][1]
+        catools.caget.reset_mock()
+
+        # Monitor reports the new array just after the put completes
+        catools.caput.side_effect = lambda *args, **kwargs: self.process.spawn(
+            callback, update(7, 8)
+        )
+        b.attrname.put_value([7, 8])
+        assert list(b.attrname.value) == [7, 8]
+        catools.caget.assert_not_called()
+
     def test_castring(self, catools):
         from malcolm.modules.ca.parts import CAStringPart
 
@@ -378,6 +473,48 @@ class TestCAParts(unittest.TestCase):
             ["pv"], datatype=catools.DBR_STRING, format=catools.FORMAT_CTRL, throw=True
         )
 
+    def test_batched_connect(self, catools):
+        from malcolm.modules.ca.parts import CALongPart, CAStringPart
+        from malcolm.modules.ca.util import connector
+
+        class Initial(int):
+            ok = True
+            severity = 0
+
+        class InitialStr(str):
+            ok = True
+            severity = 0
+
+        catools.caget.side_effect = [
+            [Initial(3), Initial(4), Initial(5)],
+            [InitialStr("thing")],
+        ]
+        c = StatefulController("mri")
+        c.add_part(CALongPart(name="a1", description="desc", pv="pv1"))
+        c.add_part(CAStringPart(name="s", description="desc", rbv="pvs"))
+        c.add_part(CALongPart(name="a2", description="desc", pv="pv2", rbv="rbv2"))
+        self.process.add_controller(c)
+        b = self.process.block_view("mri")
+        assert b.a1.value == 3
+        assert b.a2.value == 4
+        assert b.s.value == "thing"
+        # One caget per datatype, not throwing so one bad pv can't fail the others
+        assert catools.caget.call_count == 2
+        catools.caget.assert_any_call(
+            ["pv1", "rbv2", "pv2"],
+            datatype=catools.DBR_LONG,
+            format=catools.FORMAT_CTRL,
+            throw=False,
+        )
+        catools.caget.assert_any_call(
+            ["pvs"],
+            datatype=catools.DBR_STRING,
+            format=catools.FORMAT_CTRL,
+            throw=True,
+        )
+        batch_sizes = [n for n, _ in list(connector.batch_times)[-2:]]
+        assert sorted(batch_sizes) == [1, 3]
+
     def test_init_no_pv_no_rbv(self, catools):
         from malcolm.modules.ca.parts import CABooleanPart
 
@@ -41,16 +41,22 @@ class TestDetectorBlock(unittest.TestCase):
             "design",
             "exports",
             "modified",
+            "hookTimings",
+            "hookHistogram",
             "save",
+            "designChanges",
             "completedSteps",
             "configuredSteps",
             "totalSteps",
+            "partProgress",
             "validate",
+            "precompute",
             "configure",
             "run",
             "abort",
             "pause",
             "resume",
+            "rearm",
             "label",
             "datasets",
             "readoutTime",
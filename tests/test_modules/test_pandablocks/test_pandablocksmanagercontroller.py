@@ -1,3 +1,4 @@
+import os
 import shutil
 import unittest
 from collections import OrderedDict
@@ -17,8 +18,10 @@ class PandABlocksManagerControllerTest(unittest.TestCase):
         "pandamanagercontroller.PandABlocksClient"
     )
     def setUp(self, mock_client):
-        self.process = Process()
         self.config_dir = tmp_dir("config_dir")
+        self.process = Process(
+            snapshot_path=os.path.join(self.config_dir.value, "snapshot")
+        )
         self.o = PandAManagerController(
             mri="P", config_dir=self.config_dir.value, poll_period=1000
         )
@@ -81,6 +84,42 @@ class PandABlocksManagerControllerTest(unittest.TestCase):
         )
         assert health.alarm.severity == AlarmSeverity.MAJOR_ALARM
 
+    def test_introspect_from_snapshot(self):
+        # setUp introspected the PandA and put it in the snapshot
+        blocks_data = self.client.get_blocks_data.return_value
+        self.client.get_blocks_data.reset_mock()
+        assert self.o._introspect()[0] is blocks_data
+        # Then checked it in the background
+        self.o._reconcile_spawned.wait()
+        self.client.get_blocks_data.assert_called_once_with()
+
+    def test_introspect_without_snapshot_path(self):
+        self.process.snapshot.path = ""
+        self.client.get_idn.reset_mock()
+        blocks_data = self.client.get_blocks_data.return_value
+        assert self.o._introspect()[0] is blocks_data
+        # No snapshot to use, so don't ask the PandA who it is
+        self.client.get_idn.assert_not_called()
+
+    def test_introspect_without_idn(self):
+        self.client.get_idn.side_effect = ValueError("Unknown command")
+        self.client.get_blocks_data.reset_mock()
+        blocks_data = self.client.get_blocks_data.return_value
+        assert self.o._introspect()[0] is blocks_data
+        self.client.get_blocks_data.assert_called_once_with()
+
+    def test_introspect_snapshot_differs(self):
+        key = "PandAManagerController:%s:%s" % (
+            self.client.hostname,
+            self.client.port,
+        )
+        stamp = self.client.get_idn.return_value
+        live = self.process.snapshot.get(key, stamp)
+        self.process.snapshot.put(key, stamp, (OrderedDict(), {}))
+        assert self.o._introspect() == (OrderedDict(), {})
+        self.o._reconcile_spawned.wait()
+        assert self.process.snapshot.get(key, stamp) == live
+
     def test_initial_changes(self):
         assert self.process.mri_list == [
             "P",
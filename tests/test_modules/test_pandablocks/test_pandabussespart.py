@@ -160,6 +160,29 @@ class PandABussesPartTest(unittest.TestCase):
         assert list(self.o.bits.value.rows())[2] == ["B1.B2", False, False]
         assert list(self.o.bits.value.rows())[3] == ["B1.B3", True, False]
 
+    def test_bits_unchanged(self):
+        ts = TimeStamp()
+        self.o.handle_changes({"B1.B1": True}, ts)
+        old_value = self.o.bits.value
+        # Reporting the same value again doesn't make a new table
+        self.o.handle_changes({"B1.B1": True, "B1.B2": False}, TimeStamp())
+        assert self.o.bits.value is old_value
+        assert self.o.bits.timeStamp is ts
+        # A real change only replaces the changed column
+        self.o.handle_changes({"B1.B2": True}, TimeStamp())
+        assert self.o.bits.value is not old_value
+        assert self.o.bits.value.value == [False, True, True] + [False] * 6
+        assert self.o.bits.value.name is old_value.name
+        assert self.o.bits.value.capture is old_value.capture
+
+    def test_pos_unchanged(self):
+        ts = TimeStamp()
+        self.o.handle_changes({"B1.P0": "100", "B1.P0.SCALE": "2"}, ts)
+        old_value = self.o.positions.value
+        self.o.handle_changes({"B1.P0": "100", "B1.P0.SCALE": "2"}, TimeStamp())
+        assert self.o.positions.value is old_value
+        assert self.o.positions.timeStamp is ts
+
     def test_bit_capture_change(self):
         ts = TimeStamp()
         changes = {"PCAP.BITS0.CAPTURE": "Value"}
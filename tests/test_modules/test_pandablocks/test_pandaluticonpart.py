@@ -138,3 +138,20 @@ class PandABLutIconTest(unittest.TestCase):
         assert len(root.findall(".//*[@id='edgeD']")) == 1
         assert len(root.findall(".//*[@id='edgeE']")) == 0
         assert root[-1].text == "~A&~B&~C&~D"
+
+    def test_render_icon_memoized(self):
+        self.o.client.get_field.return_value = "0x00000003"
+        field_values = dict(FUNC="~A&~B&~C&~D", TYPEA="level", TYPEB="rising")
+        svg_text = self.o.render_icon(field_values)
+        root = ET.fromstring(svg_text)
+        assert len(root.findall(".//*[@id='OR']")) == 0
+        assert len(root.findall(".//*[@id='edgeA']")) == 0
+        # Rendering the same state again gives the same text without
+        # modifying the template
+        assert self.o.render_icon(field_values) == svg_text
+        assert self.o.client.get_field.call_count == 2
+        fresh = ET.fromstring(str(SVGIcon(self.o.svg_text)))
+        assert len(list(fresh.iter())) > len(list(root.iter()))
+        # A different function gives a different icon
+        self.o.client.get_field.return_value = "0"
+        assert self.o.render_icon(field_values) != svg_text
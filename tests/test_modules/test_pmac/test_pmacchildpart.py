@@ -639,6 +639,28 @@ class TestPMACChildPart(ChildTestCase):
             ),
         ]
 
+    def test_rearm_reuses_profile(self):
+        self.do_configure(axes_to_scan=["x"])
+        # The profile is sent as numpy arrays, so compare their reprs
+        expected_calls = repr(self.child.handled_requests.mock_calls)
+        expected_lookup = list(self.o.completed_steps_lookup)
+        # Pretend the first run consumed some of the profile
+        self.o.completed_steps_lookup.append(4)
+        self.o.profile["timeArray"] = []
+        self.child.handled_requests.reset_mock()
+        with patch.object(self.o, "calculate_generator_profile") as calculate:
+            self.o.on_rearm(self.context, 0, 3, {"part": None}, self.o.generator, ["x"])
+        calculate.assert_not_called()
+        assert repr(self.child.handled_requests.mock_calls) == expected_calls
+        assert self.o.completed_steps_lookup == expected_lookup
+
+    def test_rearm_recalculates_when_motors_change(self):
+        self.do_configure(axes_to_scan=["x"])
+        self.set_attributes(self.child_x, maxVelocityPercent=50)
+        with patch.object(self.o, "calculate_generator_profile") as calculate:
+            self.o.on_rearm(self.context, 0, 3, {"part": None}, self.o.generator, ["x"])
+        calculate.assert_called_once_with(0, do_run_up=True)
+
     def test_long_steps_lookup(self):
         self.do_configure(
             axes_to_scan=["x"], completed_steps=3, x_pos=0.62506, duration=14.0
@@ -0,0 +1,23 @@
+import unittest
+
+import numpy as np
+
+from malcolm.modules.pva.controllers.pvaconvert import convert_from_type_spec
+
+
+class TestConvertFromTypeSpec(unittest.TestCase):
+    def test_none_string_array(self):
+        assert convert_from_type_spec("as", None) == []
+
+    def test_none_numeric_array(self):
+        for spec, dtype in (("ad", np.float64), ("ai", np.int32), ("a?", np.bool_)):
+            ret = convert_from_type_spec(spec, None)
+            assert isinstance(ret, np.ndarray)
+            assert ret.dtype == dtype
+            assert ret.shape == (0,)
+
+    def test_primitives_unchanged(self):
+        assert convert_from_type_spec("d", None) is None
+        assert convert_from_type_spec("s", "hello") == "hello"
+        arr = np.array([1.0, 2.0])
+        assert convert_from_type_spec("ad", arr) is arr
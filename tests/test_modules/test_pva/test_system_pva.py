@@ -192,7 +192,10 @@ class TestSystemMotionPVA(unittest.TestCase):
             "design",
             "exports",
             "modified",
+            "hookTimings",
+            "hookHistogram",
             "save",
+            "designChanges",
             "xMove",
             "yMove",
         ]
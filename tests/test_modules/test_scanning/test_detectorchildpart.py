@@ -522,6 +522,48 @@ class TestDetectorChildPart(unittest.TestCase):
     def checkState(self, block, state):
         assert block.state.value == state
 
+    def test_rearm(self):
+        self.b.configure(
+            generator=self.make_generator(),
+            fileDir=self.tmpdir,
+            detectors=DetectorTable.from_rows(
+                [[False, "SLOW", "slow", 0.0, 1], [True, "FAST", "fast", 0.0, 1]]
+            ),
+        )
+        self.b.run()
+        assert self.b.state.value == "Finished"
+        assert self.bf.state.value == "Finished"
+        fast = self.p.get_controller("fast")._block
+        configure_took = fast.configure.took.timeStamp.to_time()
+        self.b.rearm()
+        self.checkSteps(self.b, 6, 0, 6)
+        self.checkSteps(self.bf, 6, 0, 6)
+        assert self.b.state.value == "Armed"
+        assert self.bs.state.value == "Ready"
+        assert self.bf.state.value == "Armed"
+        # The child was rearmed rather than configured again
+        assert fast.configure.took.timeStamp.to_time() == configure_took
+        assert fast.rearm.took.timeStamp.to_time() > configure_took
+        self.b.run()
+        assert self.b.state.value == "Finished"
+        assert self.bf.state.value == "Finished"
+
+    def test_precompute(self):
+        fast = self.p.get_controller("fast")
+        slow = self.p.get_controller("slow")
+        self.b.precompute(
+            generator=self.make_generator(),
+            fileDir=self.tmpdir,
+            detectors=DetectorTable.from_rows(
+                [[False, "SLOW", "slow", 0.0, 1], [True, "FAST", "fast", 0.0, 1]]
+            ),
+        )
+        # Only the enabled detector is asked to precompute, and it stays Ready
+        assert fast._block.precompute.took.timeStamp.to_time() > 0
+        assert slow._block.precompute.took.timeStamp.to_time() == 0
+        assert self.bf.state.value == "Ready"
+        assert len(fast._prepared_generators) == 1
+
     def test_breakpoints_tomo(self):
         breakpoints = [2, 3, 10, 2]
         # Configure RunnableController(mri='top')
@@ -0,0 +1,56 @@
+import unittest
+
+from scanpointgenerator import CompoundGenerator, LineGenerator
+
+from malcolm.modules.scanning.util import PointsCache
+
+
+class TestPointsCache(unittest.TestCase):
+    def setUp(self):
+        xs = LineGenerator("x", "mm", 0.0, 0.5, 6, alternate=True)
+        ys = LineGenerator("y", "mm", 0.0, 0.1, 4)
+        self.generator = CompoundGenerator([ys, xs], [], [], 0.1)
+        self.generator.prepare()
+        self.o = PointsCache(self.generator, max_points=10)
+
+    def assert_points_equal(self, points, start, stop):
+        expected = self.generator.get_points(start, stop)
+        assert list(points.positions["x"]) == list(expected.positions["x"])
+        assert list(points.positions["y"]) == list(expected.positions["y"])
+        assert points.indexes.tolist() == expected.indexes.tolist()
+
+    def test_get_points_cached(self):
+        points = self.o.get_points(2, 8)
+        self.assert_points_equal(points, 2, 8)
+        assert self.o.get_points(2, 8) is points
+        assert (self.o.hits, self.o.misses) == (1, 1)
+
+    def test_get_points_inside_window(self):
+        self.o.get_points(2, 8)
+        self.assert_points_equal(self.o.get_points(3, 5), 3, 5)
+        point = self.o.get_point(7)
+        assert point.positions == self.generator.get_point(7).positions
+        assert (self.o.hits, self.o.misses) == (2, 1)
+
+    def test_get_point_not_cached(self):
+        point = self.o.get_point(7)
+        assert point.positions == self.generator.get_point(7).positions
+        self.o.get_point(7)
+        assert (self.o.hits, self.o.misses) == (0, 2)
+
+    def test_least_recently_used_dropped(self):
+        self.o.get_points(0, 4)
+        self.o.get_points(4, 8)
+        # Touch the first window so the second is dropped next
+        self.o.get_points(0, 4)
+        self.o.get_points(8, 12)
+        assert list(self.o._windows) == [(0, 4), (8, 12)]
+        # Windows bigger than the cache are never stored
+        self.assert_points_equal(self.o.get_points(0, 24), 0, 24)
+        assert list(self.o._windows) == [(0, 4), (8, 12)]
+
+    def test_for_generator(self):
+        assert PointsCache.for_generator(self.generator, self.o) is self.o
+        other = PointsCache.for_generator(self.generator)
+        assert other is not self.o
+        assert other.generator is self.generator
@@ -1,8 +1,11 @@
 import shutil
 import unittest
+from typing import Optional
 
 import cothread
+import numpy
 from annotypes import add_call_types
+from mock import ANY
 from scanpointgenerator import (
     CompoundGenerator,
     ConcatGenerator,
@@ -16,6 +19,9 @@ from malcolm.core import (
     AlarmSeverity,
     AlarmStatus,
     Context,
+    Info,
+    NotWriteableError,
+    Part,
     PartRegistrar,
     Process,
 )
@@ -31,12 +37,13 @@ from malcolm.modules.scanning.hooks import (
     ACompletedSteps,
     AContext,
     AGenerator,
+    APointsCache,
     AStepsToDo,
     UInfos,
     ValidateHook,
 )
-from malcolm.modules.scanning.infos import ParameterTweakInfo
-from malcolm.modules.scanning.util import RunnableStates
+from malcolm.modules.scanning.infos import ParameterTweakInfo, RunProgressInfo
+from malcolm.modules.scanning.util import ProgressTracker, RunnableStates
 
 
 class MisbehavingPauseException(Exception):
@@ -71,9 +78,16 @@ class MisbehavingPart(MotionChildPart):
         axesToMove: AAxesToMove,
         breakpoints: ABreakpoints,
         exceptionStep: AExceptionStep = 0,
+        points_cache: Optional[APointsCache] = None,
     ) -> None:
         super(MisbehavingPart, self).on_configure(
-            context, completed_steps, steps_to_do, generator, axesToMove, exceptionStep
+            context,
+            completed_steps,
+            steps_to_do,
+            generator,
+            axesToMove,
+            exceptionStep,
+            points_cache,
         )
         if completed_steps == 3:
             raise MisbehavingPauseException(
@@ -181,6 +195,30 @@ class TestRunnableStates(unittest.TestCase):
         assert self.o.possible_states == possible_states
 
 
+class TestProgressTracker(unittest.TestCase):
+    def setUp(self):
+        self.o = ProgressTracker()
+
+    def test_minimum(self):
+        assert self.o.minimum is None
+        assert self.o.update("a", 2) == 2
+        assert self.o.update("b", 2) == 2
+        assert self.o.update("c", 5) == 2
+        # b still at the minimum
+        assert self.o.update("a", 4) == 2
+        # Last part at the minimum moves on
+        assert self.o.update("b", 6) == 4
+        # Going backwards always sets the minimum
+        assert self.o.update("c", 1) == 1
+        assert self.o.update("c", 7) == 4
+        table = self.o.table()
+        assert table.part == ["a", "b", "c"]
+        assert list(table.completedSteps) == [4, 6, 7]
+        self.o.reset()
+        assert self.o.minimum is None
+        assert self.o.table().part == []
+
+
 class TestRunnableController(unittest.TestCase):
     def setUp(self):
         self.p = Process("process")
@@ -309,6 +347,156 @@ class TestRunnableController(unittest.TestCase):
         assert actual["generator"].to_dict() == compound.to_dict()
         assert actual["axesToMove"] == ["x"]
 
+    def _hook_count(self, hook_name):
+        self.c.publish_hook_timings()
+        for row in self.c.hook_histogram.value.rows():
+            if row[:2] == [hook_name, "part"]:
+                return row[2]
+        return 0
+
+    def test_validate_cached(self):
+        self.b_child.save("init_child")
+        self.b.save("init_parent")
+        line1 = LineGenerator("y", "mm", 0, 2, 3)
+        line2 = LineGenerator("x", "mm", 0, 2, 2)
+        compound = CompoundGenerator([line1, line2], [], [], duration=0.001)
+        first = self.b.validate(generator=compound, axesToMove=["x"])
+        validates = self._hook_count("ValidateHook")
+        # Modifying the returned generator should not affect the cached tweak
+        first["generator"].duration = 0.5
+        second = self.b.validate(generator=compound, axesToMove=["x"])
+        assert self._hook_count("ValidateHook") == validates
+        assert second["generator"].duration == 0.1
+        # Different params should validate again
+        self.b.validate(generator=compound, axesToMove=["x", "y"])
+        assert self._hook_count("ValidateHook") > validates
+        # As should a change in the child
+        validates = self._hook_count("ValidateHook")
+        self.b_child.save("new_child")
+        assert self.b.modified.value is True
+        self.b.validate(generator=compound, axesToMove=["x"])
+        assert self._hook_count("ValidateHook") > validates
+        # Or any other child attribute that a part might look at
+        self.b.validate(generator=compound, axesToMove=["x"])
+        validates = self._hook_count("ValidateHook")
+        self.p.get_controller("childBlock").health.set_value("Changed")
+        self.b.validate(generator=compound, axesToMove=["x"])
+        assert self._hook_count("ValidateHook") > validates
+
+    def test_validate_cache_key_large_arrays(self):
+        class ArrayInfo(Info):
+            def __init__(self, data):
+                self.data = data
+
+        a = numpy.zeros(10000)
+        b = a.copy()
+        b[5000] = 1
+        # numpy would repr these identically as the middle is elided
+        assert repr(a) == repr(b)
+        params = dict(axesToMove=["x"])
+        contexts = self.c.create_part_contexts()
+        key_a = self.c._validate_cache_key(params, contexts, dict(p=[ArrayInfo(a)]))
+        key_b = self.c._validate_cache_key(params, contexts, dict(p=[ArrayInfo(b)]))
+        assert key_a != key_b
+        # Unserializable status can't be cached
+        key = self.c._validate_cache_key(
+            params, contexts, dict(p=[ArrayInfo(object())])
+        )
+        assert key is None
+
+    def test_validate_cache_key_unknown_info_args(self):
+        class RenamedInfo(Info):
+            def __init__(self, data):
+                self.renamed = data
+
+        params = dict(axesToMove=["x"])
+        contexts = self.c.create_part_contexts()
+        # Can't tell what the Info was made with, so can't be cached
+        key = self.c._validate_cache_key(params, contexts, dict(p=[RenamedInfo(1)]))
+        assert key is None
+
+    def test_prepare_cached(self):
+        self.prepare_half_run()
+        generator = self.c.configure_params.generator
+        self.b.reset()
+        self.prepare_half_run()
+        assert self.c.configure_params.generator is generator
+        self.b.reset()
+        self.prepare_half_run(duration=0.2)
+        assert self.c.configure_params.generator is not generator
+
+    def test_precompute(self):
+        assert self.b.precompute.meta.writeable is True
+        line1 = LineGenerator("y", "mm", 0, 2, 3)
+        line2 = LineGenerator("x", "mm", 0, 2, 2, alternate=True)
+        compound = CompoundGenerator([line1, line2], [], [], 0.01)
+        params = self.b.precompute(generator=compound, axesToMove=["x"])
+        assert params["generator"].duration == 0.1
+        # Precompute the next scan while this one is armed
+        self.prepare_half_run(duration=0.2)
+        self.checkState(self.ss.ARMED)
+        running = self.c.configure_params.generator
+        assert self.b.precompute.meta.writeable is True
+        params = self.b.precompute(generator=compound, axesToMove=["x"])
+        generator = list(self.c._prepared_generators.values())[-1]
+        assert generator is not running
+        self.checkState(self.ss.ARMED)
+        # Then configure with the result to reuse the prepared generator
+        self.b.reset()
+        self.b.configure(**{k: params[k] for k in params})
+        self.checkState(self.ss.ARMED)
+        assert self.c.configure_params.generator is generator
+        # The prepared generator of the previous scan is still there to reuse
+        self.b.reset()
+        self.prepare_half_run(duration=0.2)
+        assert self.c.configure_params.generator is running
+
+    def test_precompute_not_while_running(self):
+        line1 = LineGenerator("y", "mm", 0, 2, 3)
+        line2 = LineGenerator("x", "mm", 0, 2, 2, alternate=True)
+        compound = CompoundGenerator([line1, line2], [], [], 0.01)
+        self.prepare_half_run(duration=0.5)
+        f = self.b.run_async()
+        self.context.sleep(0.1)
+        self.checkState(self.ss.RUNNING)
+        assert self.b.precompute.meta.writeable is False
+        with self.assertRaises(NotWriteableError):
+            self.b.precompute(generator=compound, axesToMove=["x"])
+        self.context.wait_all_futures(f, timeout=2)
+        self.checkState(self.ss.ARMED)
+        assert self.b.precompute.meta.writeable is True
+
+    def test_update_completed_steps_coalesced(self):
+        self.prepare_half_run()
+        self.c.progress_interval = 0.2
+        part = self.c.parts["part"]
+        self.c.update_completed_steps(part, RunProgressInfo(1))
+        # The first report is published straight away
+        assert self.c.completed_steps.value == 1
+        for steps in range(2, 6):
+            self.c.update_completed_steps(part, RunProgressInfo(steps))
+        # The rest are held back until the interval is up
+        assert self.c.completed_steps.value == 1
+        cothread.Sleep(0.3)
+        assert self.c.completed_steps.value == 5
+        assert self.b.partProgress.value.part == ["part"]
+        assert list(self.b.partProgress.value.completedSteps) == [5]
+
+    def test_points_cache_shared(self):
+        self.prepare_half_run()
+        cache = self.c.points_cache
+        assert cache.generator is self.c.configure_params.generator
+        part = self.c.parts["part"]
+        assert part._points_cache is cache
+        self.b.run()
+        # Seeking back and rerunning the same steps reuses the points
+        hits = cache.hits
+        self.b.pause(lastGoodStep=0)
+        self.b.run()
+        assert cache.hits == hits + 2
+        self.b.reset()
+        assert self.c.points_cache is None
+
     def prepare_half_run(self, duration=0.01, exception=0):
         line1 = LineGenerator("y", "mm", 0, 2, 3)
         line2 = LineGenerator("x", "mm", 0, 2, 2, alternate=True)
@@ -339,6 +527,28 @@ class TestRunnableController(unittest.TestCase):
         self.b.run()
         self.checkState(self.ss.FINISHED)
 
+    def test_rearm(self):
+        assert self.b.rearm.meta.writeable is False
+        self.prepare_half_run()
+        params = self.c.configure_params
+        for _ in range(3):
+            self.b.run()
+        self.checkState(self.ss.FINISHED)
+        assert self.b.rearm.meta.writeable is True
+        configures = self._hook_count("ConfigureHook")
+        pre_configures = self._hook_count("PreConfigureHook")
+        self.b.rearm()
+        self.checkState(self.ss.ARMED)
+        self.checkSteps(2, 0, 6)
+        assert self.c.configure_params is params
+        # MisbehavingPart doesn't hook RearmHook so it is configured again,
+        # including its PreConfigureHook
+        assert self._hook_count("ConfigureHook") == configures + 1
+        assert self._hook_count("PreConfigureHook") == pre_configures + 1
+        for _ in range(3):
+            self.b.run()
+        self.checkState(self.ss.FINISHED)
+
     def test_abort_during_run(self):
         self.prepare_half_run()
         self.b.run()
@@ -558,6 +768,89 @@ class TestRunnableController(unittest.TestCase):
             f.result()
 
 
+class DurationPart(Part):
+    """Part that wants the duration to be a multiple of step, which can never
+    be satisfied if another part wants a different multiple"""
+
+    step = 0.1
+
+    def setup(self, registrar):
+        super().setup(registrar)
+        registrar.hook(ValidateHook, self.on_validate)
+
+    @add_call_types
+    def on_validate(self, generator: AGenerator) -> UInfos:
+        steps = round(generator.duration / self.step, 6)
+        if steps != int(steps):
+            new_generator = CompoundGenerator.from_dict(generator.to_dict())
+            new_generator.duration = (int(steps) + 1) * self.step
+            return ParameterTweakInfo("generator", new_generator)
+        return None
+
+
+class AxesPart(Part):
+    """Part that only looks at axesToMove"""
+
+    def setup(self, registrar):
+        super().setup(registrar)
+        registrar.hook(ValidateHook, self.on_validate)
+
+    @add_call_types
+    def on_validate(self, axesToMove: AAxesToMove) -> None:
+        pass
+
+
+class TestRunnableControllerValidate(unittest.TestCase):
+    def setUp(self):
+        self.p = Process("process")
+        self.config_dir = tmp_dir("config_dir")
+        self.c = RunnableController(mri="mainBlock", config_dir=self.config_dir.value)
+        self.c.add_part(AxesPart("axes"))
+        self.p.add_controller(self.c)
+        self.generator = CompoundGenerator(
+            [LineGenerator("x", "mm", 0, 2, 3)], [], [], 0.25
+        )
+
+    def tearDown(self):
+        self.p.stop(timeout=1)
+        shutil.rmtree(self.config_dir.value)
+
+    def validate_counts(self):
+        counts = {}
+        self.c.publish_hook_timings()
+        for row in self.c.hook_histogram.value.rows():
+            if row[0] == "ValidateHook":
+                counts[row[1]] = row[2]
+        return counts
+
+    def add_duration_part(self, name, step):
+        part = DurationPart(name)
+        part.step = step
+        self.c.add_part(part)
+
+    def test_only_dependent_parts_revalidate(self):
+        self.add_duration_part("tenth", 0.1)
+        self.p.start()
+        params = self.c.validate(self.generator, ["x"])
+        self.assertAlmostEqual(params.generator.duration, 0.3)
+        # The axes part doesn't take generator so only needed to run once
+        assert self.validate_counts() == dict(axes=1, tenth=2)
+        assert self.c.validate_history == [(1, "tenth", "generator", ANY)]
+
+    def test_non_converging_parts_reported(self):
+        self.add_duration_part("tenth", 0.1)
+        self.add_duration_part("seventh", 1 / 7.0)
+        self.p.start()
+        with self.assertRaises(ValueError) as cm:
+            self.c.validate(self.generator, ["x"])
+        message = str(cm.exception)
+        assert "after 10 iterations, still being tweaked by " in message
+        assert "tenth (generator)" in message
+        assert "seventh (generator)" in message
+        assert self.validate_counts() == dict(axes=1, tenth=10, seventh=10)
+        assert len(self.c.validate_history) > 10
+
+
 class TestRunnableControllerBreakpoints(unittest.TestCase):
     def setUp(self):
         self.p = Process("process1")
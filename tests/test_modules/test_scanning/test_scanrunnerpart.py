@@ -8,6 +8,7 @@ from scanpointgenerator import CompoundGenerator, LineGenerator
 
 from malcolm.core import AbortedError, NotWriteableError, TimeoutError
 from malcolm.modules.scanning.parts.scanrunnerpart import (
+    QueuedScan,
     RunnerStates,
     ScanOutcome,
     ScanRunnerPart,
@@ -898,6 +899,51 @@ class TestScanRunnerPart(unittest.TestCase):
             )
         run_scan_mock.assert_has_calls(calls)
 
+    def test_run_scans_pipelined(self):
+        scan_runner_part = ScanRunnerPart(self.name, self.mri)
+        scan_runner_part.setup(Mock())
+        scan_runner_part.get_file_contents = Mock()
+        scan_runner_part.get_file_contents.return_value = self.two_scan_yaml
+        scan_runner_part.loadFile()
+        scan_runner_part.pipeline_scans.set_value(True)
+        scan_block_mock = Mock(name="scan_block_mock")
+        run_scan_mock = Mock(name="run_scan_mock")
+        scan_runner_part.run_scan = run_scan_mock
+        scan_runner_part.create_and_get_set_directory = Mock(
+            side_effect=lambda sub, name: sub + "/" + name
+        )
+
+        sub_directory = "/test/sub/directory"
+        report_filepath = sub_directory + "/report.txt"
+        scan_runner_part.run_scans_pipelined(
+            scan_block_mock, sub_directory, report_filepath
+        )
+
+        # Every scan should be given the one after it to precompute
+        queued = []
+        for scan_set in scan_runner_part.scan_sets.values():
+            for scan_number in range(1, scan_set.repeats + 1):
+                queued.append((scan_set, scan_number))
+        self.assertEqual(len(queued), run_scan_mock.call_count)
+        for i, (args, kwargs) in enumerate(run_scan_mock.call_args_list):
+            scan_set, scan_number = queued[i]
+            self.assertEqual(
+                args,
+                (
+                    scan_set.name,
+                    scan_block_mock,
+                    sub_directory + "/" + scan_set.name,
+                    scan_number,
+                    report_filepath,
+                    scan_set.generator,
+                ),
+            )
+            assert kwargs["queued_scan"].scan_number == scan_number
+            if i + 1 < len(queued):
+                assert kwargs["next_scan"].scan_number == queued[i + 1][1]
+            else:
+                assert kwargs["next_scan"] is None
+
     def test_abort_calls_context_abort(self):
         scan_runner_part = ScanRunnerPart(self.name, self.mri)
         scan_runner_part.context = Mock(name="context_mock")
@@ -1578,7 +1624,7 @@ class TestScanRunnerPartRunScanMethod(unittest.TestCase):
         # Check the outcome calls
         self.increment_scan_failures_mock.assert_called_once()
 
-    def test_run_scan_sleeps_if_scan_block_is_ABORTING(self):
+    def test_run_scan_waits_if_scan_block_is_ABORTING(self):
         # Our mocked scan block will return nicely for a success
         self.scan_block_mock.run.return_value = None
 
@@ -1601,8 +1647,11 @@ class TestScanRunnerPartRunScanMethod(unittest.TestCase):
             self.generator_mock,
         )
 
-        # Check we slept
-        context_mock.sleep.assert_called_once_with(0.1)
+        # Check we waited for the abort to finish rather than polling
+        self.scan_block_mock.when_value_matches.assert_called_once_with(
+            "state", self.scan_runner_part.scan_state_is_not_aborting
+        )
+        context_mock.sleep.assert_not_called()
 
         # Check the standard method calls
         self.create_and_get_scan_directory_mock.assert_called_once_with(
@@ -1666,3 +1715,87 @@ class TestScanRunnerPartRunScanMethod(unittest.TestCase):
 
         # Check the outcome calls
         self.increment_scan_successes_mock.assert_called_once()
+
+    def test_run_scan_precomputes_next_scan_while_running(self):
+        self.scan_block_mock.precompute.return_value = dict(
+            generator=self.generator_mock, fileDir="/next/directory"
+        )
+        self.scan_runner_part.context = Mock(name="context_mock")
+        next_scan = QueuedScan(
+            self.set_name, self.set_directory, self.scan_number + 1, self.generator_mock
+        )
+
+        # Call the run_scan method
+        self.scan_runner_part.run_scan(
+            self.set_name,
+            self.scan_block_mock,
+            self.set_directory,
+            self.scan_number,
+            self.report_filepath,
+            self.generator_mock,
+            next_scan=next_scan,
+        )
+
+        # Check we ran asynchronously and precomputed in the meantime
+        self.scan_block_mock.run.assert_not_called()
+        self.scan_block_mock.run_async.assert_called_once_with()
+        self.scan_block_mock.precompute.assert_called_once_with(
+            self.generator_mock, fileDir=self.scan_directory
+        )
+        self.scan_runner_part.context.wait_all_futures.assert_called_once_with(
+            self.scan_block_mock.run_async.return_value
+        )
+        assert next_scan.scan_directory == self.scan_directory
+        assert next_scan.params == dict(
+            generator=self.generator_mock, fileDir="/next/directory"
+        )
+        self.increment_scan_successes_mock.assert_called_once()
+
+    def test_run_scan_still_runs_when_precompute_fails(self):
+        self.scan_block_mock.precompute.side_effect = ValueError("Bad")
+        self.scan_runner_part.context = Mock(name="context_mock")
+        next_scan = QueuedScan(
+            self.set_name, self.set_directory, self.scan_number + 1, self.generator_mock
+        )
+
+        self.scan_runner_part.run_scan(
+            self.set_name,
+            self.scan_block_mock,
+            self.set_directory,
+            self.scan_number,
+            self.report_filepath,
+            self.generator_mock,
+            next_scan=next_scan,
+        )
+
+        assert next_scan.params is None
+        self.logger_mock.warning.assert_called_once()
+        self.increment_scan_successes_mock.assert_called_once()
+
+    def test_run_scan_configures_with_precomputed_params(self):
+        self.scan_runner_part.context = Mock(name="context_mock")
+        queued_scan = QueuedScan(
+            self.set_name, self.set_directory, self.scan_number, self.generator_mock
+        )
+        queued_scan.scan_directory = "/precomputed/directory"
+        queued_scan.params = dict(
+            generator=self.generator_mock, fileDir="/precomputed/directory"
+        )
+
+        self.scan_runner_part.run_scan(
+            self.set_name,
+            self.scan_block_mock,
+            self.set_directory,
+            self.scan_number,
+            self.report_filepath,
+            self.generator_mock,
+            queued_scan=queued_scan,
+        )
+
+        # Directory was made at precompute, so don't make it again
+        self.create_and_get_scan_directory_mock.assert_not_called()
+        self.scan_block_mock.configure.assert_called_once_with(
+            generator=self.generator_mock, fileDir="/precomputed/directory"
+        )
+        self.scan_block_mock.run.assert_called_once()
+        self.increment_scan_successes_mock.assert_called_once()
@@ -1,17 +1,23 @@
 import os
+import shutil
 import sys
+import tempfile
 import unittest
 
 from annotypes import Anno, Any, add_call_types
 from mock import ANY, Mock, mock_open, patch
 
+from malcolm.core import MethodMeta
 from malcolm.modules.builtin.controllers import BasicController
 from malcolm.modules.builtin.parts import StringPart
 from malcolm.yamlutil import (
+    ParsedYamlCache,
     Section,
     check_yaml_names,
     make_block_creator,
     make_include_creator,
+    takes_for_callable,
+    yaml_cache_dir,
 )
 
 sys.path.append(os.path.dirname(__file__))
@@ -63,7 +69,10 @@ class TestYamlUtil(unittest.TestCase):
             "malcolm.yamlutil.open", mock_open(read_data=include_yaml), create=True
         ) as m:
             include_creator = make_include_creator("/tmp/__init__.py", "include.yaml")
-        assert include_creator.__name__ == "include"
+            assert include_creator.__name__ == "include"
+            # Not parsed until we need it
+            m.assert_not_called()
+            assert list(include_creator.call_types) == ["something"]
         m.assert_called_once_with("/tmp/include.yaml")
         controllers, parts = include_creator()
         assert len(controllers) == 0
@@ -78,9 +87,11 @@ class TestYamlUtil(unittest.TestCase):
             "malcolm.yamlutil.open", mock_open(read_data=block_yaml), create=True
         ) as m:
             block_creator = make_block_creator("/tmp/__init__.py", "block.yaml")
-        assert block_creator.__name__ == "block"
+            assert block_creator.__name__ == "block"
+            assert block_creator.yamlname == "block"
+            m.assert_not_called()
+            controllers = block_creator(something="blah")
         m.assert_called_once_with("/tmp/block.yaml")
-        controllers = block_creator(something="blah")
         assert len(controllers) == 1
         parts = controllers[0].parts
         assert len(parts) == 1
@@ -118,6 +129,23 @@ class TestYamlUtil(unittest.TestCase):
         mock_import.assert_called_once_with("malcolm.modules.mymodule.parts")
         assert result == (2, "my name", "thing")
 
+    @patch("importlib.import_module")
+    def test_instantiate_caches_takes(self, mock_import):
+        @add_call_types
+        def f(desc: ADesc, foo: AThing = "thing") -> Any:
+            return 2, desc, foo
+
+        mock_import.return_value = Mock(MyPart=f)
+        section1 = Section("f", 1, "mymodule.parts.MyPart", dict(desc="one"))
+        section2 = Section("f", 2, "mymodule.parts.MyPart", dict(desc="two"))
+        with patch.object(
+            MethodMeta, "from_callable", wraps=MethodMeta.from_callable
+        ) as from_callable:
+            assert section1.instantiate({}) == (2, "one", "thing")
+            assert section2.instantiate({}) == (2, "two", "thing")
+        from_callable.assert_called_once_with(f, returns=False)
+        assert takes_for_callable(f) is takes_for_callable(f)
+
     def test_split_into_sections(self):
         filename = "/tmp/yamltest.yaml"
         with open(filename, "w") as f:
@@ -142,6 +170,60 @@ class TestYamlUtil(unittest.TestCase):
         assert sections[0][2].name == "builtin.defines.docstring"
         assert sections[0][2].param_dict == dict(value="My special docstring")
 
+    def test_parsed_yaml_cached(self):
+        cache_dir = tempfile.mkdtemp()
+        filename = os.path.join(cache_dir, "cachetest.yaml")
+        with open(filename, "w") as f:
+            f.write(block_yaml)
+        with patch.dict(os.environ, MALCOLM_YAML_CACHE=cache_dir):
+            with patch.object(Section, "_parse", wraps=Section._parse) as parse:
+                first = Section.from_yaml(filename)
+                assert parse.call_count == 1
+                # Unchanged, so comes from the cache without parsing
+                second = Section.from_yaml(filename)
+                assert parse.call_count == 1
+                # Touched but unchanged contents still come from the cache
+                os.utime(filename, (0, 0))
+                Section.from_yaml(filename)
+                assert parse.call_count == 1
+                # Changed contents are parsed again
+                with open(filename, "w") as f:
+                    f.write(include_yaml)
+                third = Section.from_yaml(filename)
+                assert parse.call_count == 2
+        assert [s.name for s in second[0]] == [s.name for s in first[0]]
+        assert second[0][2].param_dict == dict(
+            name="scannable",
+            description="Scannable name for motor",
+            value="$(something)",
+        )
+        assert second[0][2].lineno == first[0][2].lineno == 9
+        assert [s.section for s in third[0]] == ["parameters", "parts"]
+        shutil.rmtree(cache_dir)
+
+    def test_parsed_yaml_cache_disabled(self):
+        filename = "/tmp/nocachetest.yaml"
+        with open(filename, "w") as f:
+            f.write(include_yaml)
+        with patch.dict(os.environ, MALCOLM_YAML_CACHE=""):
+            with patch.object(ParsedYamlCache, "store") as store:
+                sections, yamlname, _ = Section.from_yaml(filename)
+        store.assert_not_called()
+        assert yamlname == "nocachetest"
+        assert len(sections) == 2
+
+    def test_parsed_yaml_cache_off_by_default(self):
+        filename = "/tmp/nocachetest.yaml"
+        with open(filename, "w") as f:
+            f.write(include_yaml)
+        with patch.dict(os.environ):
+            os.environ.pop("MALCOLM_YAML_CACHE", None)
+            assert yaml_cache_dir() == ""
+            with patch.object(ParsedYamlCache, "store") as store:
+                sections, _, _ = Section.from_yaml(filename)
+        store.assert_not_called()
+        assert len(sections) == 2
+
     def test_substitute_params(self):
         section = Section(
             "f", 1, "module.parts.name", {"name": "$(name):pos", "exposure": 1.0}